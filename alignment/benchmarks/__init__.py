@@ -0,0 +1,8 @@
+"""This package contains scripts that measure the performance of the
+alignment code. Each module is a script that should be run from the
+"alignment" folder, e.g.:
+
+	python -m benchmarks.parsing bfn
+	python -m benchmarks.loaders --sizes 100 1000
+
+"""
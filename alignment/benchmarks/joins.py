@@ -0,0 +1,97 @@
+"""Measures ID and name matching on synthetic FrameNets of growing size, to
+show that their hash joins scale linearly with the number of frames.
+
+	python -m benchmarks.joins --frames 1000 2500 5000 10000
+
+BFN and an l2 database of ``--schema`` with the same number of frames are
+written by :mod:`benchmarks.synthetic` and aligned. Times are the best of
+``--repeat`` runs and include building the per-side arrays. The time per
+frame stays about the same when scaling is linear, and the growth column
+compares the time growth with the growth in the number of frames since the
+previous size. The number of matches is the number of stored non-zero scores.
+
+"""
+
+import time
+import argparse
+import tempfile
+
+from fnalign.loaders import load
+from fnalign.models import Alignment
+from fnalign.alignment import attribute
+from benchmarks.synthetic import SCHEMAS, generate
+
+TECHNIQUES = {
+	"id_matching": attribute.id_matching,
+	"name_matching": attribute.name_matching,
+}
+
+
+def measure(alignment, func, repeat):
+	"""Runs ``func`` ``repeat`` times on ``alignment`` and returns the best
+	time in seconds and the number of matches of the last run.
+	"""
+	best = None
+
+	for _ in range(repeat):
+		start_time = time.perf_counter()
+		func(alignment)
+		elapsed = time.perf_counter() - start_time
+		best = elapsed if best is None else min(best, elapsed)
+		matches = alignment.scores.pop()["matrix"].nnz
+
+	return best, matches
+
+
+def benchmark(schema, sizes, repeat=3):
+	"""Aligns synthetic BFN and ``schema`` databases of each size in ``sizes``
+	and prints the time of each technique.
+
+	:param schema: The l2 database schema, as in :data:`benchmarks.synthetic.SCHEMAS`.
+	:type schema: str
+	:param sizes: Numbers of frames of the generated databases.
+	:type sizes: list[int]
+	:param repeat: Number of runs, the best one is reported.
+	:type repeat: int
+	"""
+	print(
+		f'{"technique":<16}{"frames":>16}{"time (s)":>12}{"us/frame":>10}'
+		f'{"growth":>14}{"matches":>10}')
+	previous = {}
+
+	for size in sorted(sizes):
+		with tempfile.TemporaryDirectory() as data_dir:
+			# Techniques only read frames, so LUs and FEs are kept few
+			generate("bfn", data_dir, frames=size, lus=1, fes=1, annotations=0, seed=0)
+			generate(schema, data_dir, frames=size, lus=1, fes=1, annotations=0, seed=1)
+
+			en_fn = load("bfn", "en", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+			l2_fn = load(schema, "xx", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+
+		alignment = Alignment(en_fn, l2_fn)
+		n_en, n_l2 = alignment.shape
+		frames = n_en + n_l2
+
+		for name, func in TECHNIQUES.items():
+			seconds, matches = measure(alignment, func, repeat)
+
+			if name in previous:
+				prev_frames, prev_seconds = previous[name]
+				growth = f'{seconds / prev_seconds:.1f}/{frames / prev_frames:.1f}x'
+			else:
+				growth = "-"
+			previous[name] = (frames, seconds)
+
+			print(
+				f'{name:<16}{f"{n_en} x {n_l2}":>16}{seconds:>12.4f}'
+				f'{seconds / frames * 1e6:>10.2f}{growth:>14}{matches:>10}')
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('--schema', choices=SCHEMAS.keys(), default="fnbrasil")
+	parser.add_argument('--frames', nargs='+', type=int, default=[1000, 2500, 5000, 10000])
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args()
+
+	benchmark(args.schema, args.frames, repeat=args.repeat)
@@ -0,0 +1,91 @@
+"""Checks that :func:`fnalign.languages.preclassify` agrees with
+:func:`langdetect.detect` on the FE definitions of FrameNet databases.
+
+	python -m benchmarks.languages --dbs bfn:en fnbrasil:pt japanesefn:ja
+	python -m benchmarks.languages --synthetic bfn fnbrasil
+
+Databases are read from ``--data-dir`` or, with ``--synthetic``, written by
+:mod:`benchmarks.synthetic` to a temporary folder. The text of each frame is
+built as in :meth:`fnalign.models.FrameNet.detect_langs` and every text
+decided by the pre-classifier is also given to the detection model. Texts on
+which they disagree are printed, and any disagreement is an error.
+
+"""
+
+import sys
+import argparse
+import tempfile
+from collections import Counter
+from langdetect import detect
+
+from fnalign.loaders import load
+from fnalign.languages import preclassify
+from benchmarks.synthetic import SCHEMAS, generate
+
+
+def frame_texts(fn):
+	"""Returns the joined FE definitions of each frame of ``fn`` that has any."""
+	texts = (
+		' '.join(sorted(fe.definition for fe in frm.fes if fe.definition is not None))
+		for frm in fn.frames
+	)
+	return [text for text in texts if text]
+
+
+def check(name, fn, show=5):
+	"""Compares the pre-classifier and the detection model on the texts of
+	``fn``, prints a summary line and up to ``show`` disagreements.
+
+	:returns: The number of disagreements.
+	:rtype: int
+	"""
+	texts = frame_texts(fn)
+	decided = Counter()
+	disagreements = []
+
+	for text in texts:
+		lang = preclassify(text)
+		if lang is None:
+			continue
+
+		decided[lang] += 1
+		expected = detect(text)
+		if expected != lang:
+			disagreements.append((lang, expected, text))
+
+	langs = ", ".join(f'{lang}: {count}' for lang, count in decided.most_common()) or "-"
+	print(f'{name:<16}{len(texts):>8}{sum(decided.values()):>10}{len(disagreements):>10}   {langs}')
+
+	for lang, expected, text in disagreements[:show]:
+		print(f'    {lang} != {expected}: {text[:100]!r}')
+
+	return len(disagreements)
+
+
+def main(dbs, synthetic, data_dir, frames):
+	print(f'{"database":<16}{"texts":>8}{"decided":>10}{"wrong":>10}   languages')
+	wrong = 0
+
+	for db in dbs:
+		db_name, _, lang = db.partition(":")
+		fn = load(db_name, lang or "xx", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+		wrong += check(db_name, fn)
+
+	for seed, schema in enumerate(synthetic):
+		with tempfile.TemporaryDirectory() as tmp_dir:
+			generate(schema, tmp_dir, frames=frames, annotations=0, seed=seed)
+			fn = load(schema, "en" if schema == "bfn" else "xx", snapshot=False, lazy_annotations=True, data_dir=tmp_dir)
+		wrong += check(f'{schema} (syn.)', fn)
+
+	return wrong
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('--dbs', nargs='*', default=[], help="Databases as name:lang, e.g., salsa:de")
+	parser.add_argument('--synthetic', nargs='*', choices=SCHEMAS.keys(), default=[])
+	parser.add_argument('--data-dir', default="data")
+	parser.add_argument('--frames', type=int, default=1000)
+	args = parser.parse_args()
+
+	sys.exit(1 if main(args.dbs, args.synthetic, args.data_dir, args.frames) else 0)
@@ -0,0 +1,105 @@
+"""Measures :func:`fnalign.loaders.load` on synthetic databases of growing
+sizes for each schema, reporting frames and LUs loaded per second and the
+peak memory allocated while loading.
+
+	python -m benchmarks.loaders --schemas bfn fnbrasil --sizes 100 1000 10000
+
+Databases are written by :mod:`benchmarks.synthetic` to a temporary folder
+and loaded without snapshots. Times are the best of ``--repeat`` runs, so
+language detections are usually read from the cache. Peak memory is measured
+by :mod:`tracemalloc` in a separate run, which only accounts for the main
+process when ``--workers`` is given.
+
+"""
+
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from fnalign.loaders import load
+from benchmarks.synthetic import SCHEMAS, generate
+
+
+def load_synthetic(schema, data_dir, workers, lazy):
+	return load(
+		schema, "en" if schema == "bfn" else "xx", workers=workers, snapshot=False,
+		lazy_annotations=lazy, data_dir=data_dir)
+
+
+def measure(schema, data_dir, workers=None, lazy=False, repeat=3):
+	"""Loads the database ``schema`` from ``data_dir`` and returns the number of
+	frames and LUs loaded, the best loading time in seconds and the peak
+	allocated memory in bytes.
+	"""
+	best = None
+
+	for _ in range(repeat):
+		start_time = time.perf_counter()
+		fn = load_synthetic(schema, data_dir, workers, lazy)
+		elapsed = time.perf_counter() - start_time
+		best = elapsed if best is None else min(best, elapsed)
+
+	n_frames = len(fn.frames)
+	n_lus = sum(len(frm.lus) for frm in fn.frames)
+	del fn
+
+	tracemalloc.start()
+	load_synthetic(schema, data_dir, workers, lazy)
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	return n_frames, n_lus, best, peak
+
+
+def benchmark(schemas, sizes, lus=10, fes=8, annotations=5, workers=None, lazy=False, repeat=3):
+	"""Generates a database of each schema in ``schemas`` and size in ``sizes``
+	and prints the loading measurements of each one.
+
+	:param schemas: The database schemas, as in :data:`benchmarks.synthetic.SCHEMAS`.
+	:type schemas: list[str]
+	:param sizes: Numbers of frames of the generated databases.
+	:type sizes: list[int]
+	:param lus: Mean number of LUs per frame.
+	:type lus: int
+	:param fes: Mean number of FEs per frame.
+	:type fes: int
+	:param annotations: Mean number of annotated sentences per LU.
+	:type annotations: int
+	:param workers: Number of processes given to :func:`fnalign.loaders.load`.
+	:type workers: int
+	:param lazy: Whether annotations are loaded on demand.
+	:type lazy: bool
+	:param repeat: Number of runs, the best one is reported.
+	:type repeat: int
+	"""
+	print(
+		f'{"schema":<12}{"frames":>9}{"LUs":>10}{"seconds":>10}'
+		f'{"frames/s":>12}{"LUs/s":>12}{"peak (MB)":>12}')
+
+	for schema in schemas:
+		for size in sizes:
+			with tempfile.TemporaryDirectory() as data_dir:
+				generate(schema, data_dir, frames=size, lus=lus, fes=fes, annotations=annotations)
+				n_frames, n_lus, elapsed, peak = measure(schema, data_dir, workers, lazy, repeat)
+
+			print(
+				f'{schema:<12}{n_frames:>9}{n_lus:>10}{elapsed:>10.3f}'
+				f'{n_frames / elapsed:>12.0f}{n_lus / elapsed:>12.0f}{peak / 2**20:>12.1f}')
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('--schemas', nargs='+', choices=SCHEMAS.keys(), default=list(SCHEMAS.keys()))
+	parser.add_argument('--sizes', nargs='+', type=int, default=[100, 1000])
+	parser.add_argument('--lus', type=int, default=10)
+	parser.add_argument('--fes', type=int, default=8)
+	parser.add_argument('--annotations', type=int, default=5)
+	parser.add_argument('--workers', type=int, default=None)
+	parser.add_argument('--lazy', action='store_true')
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args()
+
+	benchmark(
+		args.schemas, args.sizes, lus=args.lus, fes=args.fes, annotations=args.annotations,
+		workers=args.workers, lazy=args.lazy, repeat=args.repeat)
@@ -0,0 +1,98 @@
+"""Measures the recall and speedup of MinHash LSH core FE matching against the
+exact one on synthetic FrameNets.
+
+	python -m benchmarks.lsh --frames 1000 5000 --thresholds 0.5 0.8
+
+BFN and an l2 database of ``--schema`` are written by
+:mod:`benchmarks.synthetic` and aligned. For each threshold, the exact scores
+are those of :func:`fnalign.alignment.attribute.fe_matching` of at least the
+threshold, and recall is the fraction of them that LSH finds. LSH never
+reports pairs below the threshold, since candidates are scored exactly. Times
+are the best of ``--repeat`` runs.
+
+"""
+
+import time
+import argparse
+import tempfile
+import numpy as np
+
+from fnalign.loaders import load
+from fnalign.models import Alignment
+from fnalign.alignment import attribute
+from fnalign.alignment.matrix import to_dense
+from benchmarks.synthetic import CORE_FE_SCHEMAS, generate
+
+
+def measure(alignment, threshold, repeat):
+	"""Runs core FE matching ``repeat`` times and returns the best time in
+	seconds and the score matrix of the last run.
+	"""
+	best = None
+
+	for _ in range(repeat):
+		start_time = time.perf_counter()
+		attribute.fe_matching(alignment, threshold=threshold)
+		elapsed = time.perf_counter() - start_time
+		best = elapsed if best is None else min(best, elapsed)
+		matrix = to_dense(alignment.scores.pop()["matrix"])
+
+	return best, matrix
+
+
+def benchmark(schema, sizes, thresholds, lus=10, fes=8, repeat=3):
+	"""Aligns synthetic BFN and ``schema`` databases of each size in ``sizes``
+	and prints the recall and speedup of LSH at each threshold.
+
+	:param schema: The l2 database schema, as in :data:`benchmarks.synthetic.CORE_FE_SCHEMAS`.
+	:type schema: str
+	:param sizes: Numbers of frames of the generated databases.
+	:type sizes: list[int]
+	:param thresholds: Jaccard thresholds.
+	:type thresholds: list[float]
+	:param lus: Mean number of LUs per frame.
+	:type lus: int
+	:param fes: Mean number of FEs per frame.
+	:type fes: int
+	:param repeat: Number of runs, the best one is reported.
+	:type repeat: int
+	"""
+	print(
+		f'{"frames":>16}{"threshold":>11}{"exact (s)":>11}{"lsh (s)":>10}'
+		f'{"speedup":>9}{"pairs":>10}{"found":>10}{"recall":>8}')
+
+	for size in sizes:
+		with tempfile.TemporaryDirectory() as data_dir:
+			generate("bfn", data_dir, frames=size, lus=lus, fes=fes, annotations=0, seed=0)
+			generate(schema, data_dir, frames=size, lus=lus, fes=fes, annotations=0, seed=1)
+
+			en_fn = load("bfn", "en", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+			l2_fn = load(schema, "xx", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+
+		alignment = Alignment(en_fn, l2_fn)
+		n_en, n_l2 = alignment.shape
+		exact_time, exact = measure(alignment, None, repeat)
+
+		for threshold in thresholds:
+			lsh_time, lsh = measure(alignment, threshold, repeat)
+
+			expected = np.count_nonzero(exact >= threshold)
+			found = np.count_nonzero(lsh)
+			recall = np.count_nonzero((lsh > 0) & (exact >= threshold)) / expected if expected else 1.0
+
+			print(
+				f'{f"{n_en} x {n_l2}":>16}{threshold:>11.2f}{exact_time:>11.3f}{lsh_time:>10.3f}'
+				f'{exact_time / max(lsh_time, 1e-9):>9.1f}{expected:>10}{found:>10}{recall:>8.3f}')
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('--schema', choices=CORE_FE_SCHEMAS, default="fnbrasil")
+	parser.add_argument('--frames', nargs='+', type=int, default=[1000, 5000])
+	parser.add_argument('--thresholds', nargs='+', type=float, default=[0.5, 0.8])
+	parser.add_argument('--lus', type=int, default=2)
+	parser.add_argument('--fes', type=int, default=8)
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args()
+
+	benchmark(args.schema, args.frames, args.thresholds, lus=args.lus, fes=args.fes, repeat=args.repeat)
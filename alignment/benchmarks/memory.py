@@ -0,0 +1,117 @@
+"""Measures the memory held by FrameNet objects when BFN and all L2 databases
+aligned by main.py are loaded together.
+
+	python -m benchmarks.memory
+	python -m benchmarks.memory --synthetic 1000
+
+With ``--synthetic``, databases of the given number of frames are generated
+by :mod:`benchmarks.synthetic` in the schema of each database instead of read
+from ``--data-dir``. The reported memory is the one allocated by loading, as
+traced by :mod:`tracemalloc`, and the average size of frame, LU and FE
+objects, including their ``__dict__`` when they have one.
+
+"""
+
+import sys
+import argparse
+import tempfile
+import tracemalloc
+
+from fnalign.loaders import load, loaders
+from fnalign.languages import get_cache
+from benchmarks.synthetic import generate
+
+DATABASES = [
+	('bfn', 'en'),
+	('chinesefn', 'zh'),
+	('japanesefn', 'ja'),
+	('frenchfn', 'fr'),
+	('spanishfn', 'es'),
+	('fnbrasil', 'pt'),
+	('swedishfn', 'sv'),
+	('salsa', 'de'),
+	('dutchfn', 'nl'),
+]
+
+
+def object_size(obj):
+	"""Returns the size in bytes of ``obj`` and its ``__dict__``, not counting
+	the attribute values.
+	"""
+	size = sys.getsizeof(obj)
+	if hasattr(obj, '__dict__'):
+		size += sys.getsizeof(obj.__dict__)
+	return size
+
+
+def load_all(data_dir, lazy):
+	"""Loads all :data:`DATABASES` from ``data_dir`` and returns the FrameNets
+	and the memory allocated while loading them.
+	"""
+	# The language detection cache is not part of the loaded data
+	get_cache()
+
+	tracemalloc.start()
+	fns = [
+		load(db_name, lang, snapshot=False, lazy_annotations=lazy, data_dir=data_dir)
+		for db_name, lang in DATABASES
+	]
+	current, _ = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+
+	return fns, current
+
+
+def report(fns, allocated):
+	"""Prints the number and average size of the objects of ``fns``."""
+	objects = {"Frame": [], "LexUnit": [], "FrameElement": []}
+
+	for fn in fns:
+		for frm in fn.frames:
+			objects["Frame"].append(frm)
+			objects["LexUnit"].extend(frm.lus)
+			objects["FrameElement"].extend(frm.fes)
+
+	print(f'{"class":<14}{"objects":>10}{"bytes/object":>15}{"total (MB)":>12}')
+
+	for name, objs in objects.items():
+		total = sum(object_size(obj) for obj in objs)
+		print(f'{name:<14}{len(objs):>10}{total / max(len(objs), 1):>15.1f}{total / 2**20:>12.1f}')
+
+	sentences = sum(fn.annotations.sentence_count for fn in fns)
+	annotations = sum(len(fn.annotations) for fn in fns)
+	print(f'Annotations: {annotations} of {sentences} unique sentences')
+	print(f'Allocated by loading: {allocated / 2**20:.1f} MB')
+
+
+def benchmark(data_dir="data", synthetic=None, lazy=False):
+	"""Loads all databases and prints their memory usage.
+
+	:param data_dir: The folder containing all databases.
+	:type data_dir: str
+	:param synthetic: Number of frames of generated databases, which are used
+		instead of the ones in ``data_dir``.
+	:type synthetic: int
+	:param lazy: Whether annotations are loaded on demand.
+	:type lazy: bool
+	"""
+	if synthetic is None:
+		report(*load_all(data_dir, lazy))
+		return
+
+	with tempfile.TemporaryDirectory() as tmp_dir:
+		for seed, (db_name, _) in enumerate(DATABASES):
+			schema = next(l for l in loaders if db_name in l.supported_db()).supported_db()[0]
+			generate(schema, tmp_dir, frames=synthetic, seed=seed, name=db_name)
+
+		report(*load_all(tmp_dir, lazy))
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('--data-dir', default="data")
+	parser.add_argument('--synthetic', type=int, default=None)
+	parser.add_argument('--lazy', action='store_true')
+	args = parser.parse_args()
+
+	benchmark(data_dir=args.data_dir, synthetic=args.synthetic, lazy=args.lazy)
@@ -0,0 +1,84 @@
+"""Measures the time spent parsing each frame and LU file of a FrameNet
+database with every available XML backend of :mod:`fnalign.loaders`.
+
+	python -m benchmarks.parsing bfn --repeat 3
+
+"""
+
+import os
+import time
+import argparse
+
+from fnalign.loaders import LET, loaders
+
+
+def time_files(loader, files, parse, repeat):
+	"""Returns the best time, in seconds per file, of ``repeat`` runs of
+	``parse`` over all ``files``.
+	"""
+	best = None
+
+	for _ in range(repeat):
+		start_time = time.perf_counter()
+		for filename in files:
+			parse(filename)
+		elapsed = (time.perf_counter() - start_time) / max(len(files), 1)
+		best = elapsed if best is None else min(best, elapsed)
+
+	return best
+
+
+def benchmark(db_name, repeat=3, limit=None, data_dir="data"):
+	"""Times frame and LU file parsing of ``db_name`` for each backend and
+	prints the results.
+
+	:param db_name: The name of the database inside ``data_dir``.
+	:type db_name: str
+	:param repeat: Number of runs, the best one is reported.
+	:type repeat: int
+	:param limit: Maximum number of files of each kind to be parsed.
+	:type limit: int
+	:param data_dir: The folder containing all databases.
+	:type data_dir: str
+	"""
+	backends = ['etree'] + (['lxml'] if LET is not None else [])
+	results = {}
+
+	for backend in backends:
+		loader = next(
+			l(db_name, backend=backend, data_dir=data_dir)
+			for l in loaders if db_name in l.supported_db()
+		)
+		frame_files = loader.frame_files()[:limit]
+		lu_ids = [
+			p[2:-4] for p in loader.source.listdir(os.path.join(loader.base_path, 'lu'))
+			if p.startswith('lu') and p.endswith('.xml')
+		][:limit] if loader.lu_files else []
+
+		results[backend] = (
+			time_files(loader, frame_files, lambda f: loader.read_frame(loader.parse_file(f)), repeat),
+			time_files(loader, lu_ids, loader.parse_annotations, repeat) if lu_ids else None,
+		)
+
+	print(f'{db_name}: {len(frame_files)} frame files, {len(lu_ids)} LU files')
+	print(f'{"backend":<10}{"frame (ms/file)":>18}{"LU (ms/file)":>18}')
+
+	for backend, (frame_time, lu_time) in results.items():
+		lu_str = f'{lu_time * 1000:.3f}' if lu_time is not None else '-'
+		print(f'{backend:<10}{frame_time * 1000:>18.3f}{lu_str:>18}')
+
+	if 'lxml' in results:
+		(etree_frame, etree_lu), (lxml_frame, lxml_lu) = results['etree'], results['lxml']
+		lu_str = f'{etree_lu / lxml_lu:.2f}x' if lu_ids else '-'
+		print(f'{"speedup":<10}{etree_frame / lxml_frame:>17.2f}x{lu_str:>18}')
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('db_name')
+	parser.add_argument('--repeat', type=int, default=3)
+	parser.add_argument('--limit', type=int, default=None)
+	parser.add_argument('--data-dir', default="data")
+	args = parser.parse_args()
+
+	benchmark(args.db_name, repeat=args.repeat, limit=args.limit, data_dir=args.data_dir)
@@ -0,0 +1,126 @@
+"""Compares the runtime and memory estimated by :mod:`fnalign.planner` with
+the ones measured running each technique on synthetic FrameNets.
+
+	python -m benchmarks.planner --frames 1000 5000
+
+BFN and an l2 database of ``--schema`` are written by
+:mod:`benchmarks.synthetic` and aligned, and WordNet techniques run on the
+synthetic synsets of :func:`benchmarks.scoring.wordnet_resources`. Constants
+are measured once by :func:`fnalign.planner.calibrate`. Times are the best of
+``--repeat`` runs and the peak memory allocated by a technique is measured by
+:mod:`tracemalloc` in a separate run. The ratio columns are the estimate
+divided by the measure, so a plan is accurate when they are close to 1.
+
+"""
+
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+from fnalign import planner
+from fnalign.loaders import load
+from fnalign.models import Alignment
+from fnalign.alignment import attribute
+from benchmarks.scoring import wordnet_resources
+from benchmarks.synthetic import SCHEMAS, CORE_FE_SCHEMAS, generate
+
+
+def techniques(alignment, core_fes=True):
+	"""Returns the techniques with a cost model that can run on synthetic data
+	as (name, function) pairs, where names are the ones of
+	:data:`fnalign.planner.MODELS`. Core FE matching is skipped unless
+	``core_fes`` is True.
+	"""
+	yield 'id_matching', lambda: attribute.id_matching(alignment)
+	yield 'name_matching', lambda: attribute.name_matching(alignment)
+	yield 'fuzzy_name_matching', lambda: attribute.fuzzy_name_matching(alignment)
+	if core_fes:
+		yield 'core_fe_matching', lambda: attribute.fe_matching(alignment)
+	yield 'all_fe_matching', lambda: attribute.fe_matching(alignment, core_only=False)
+
+	try:
+		from fnalign.alignment import wordnet
+	except (ImportError, LookupError) as e:
+		print(f'Skipping WordNet techniques: {e}')
+	else:
+		yield 'synset', lambda: wordnet.synset_matching(alignment)
+		yield 'lu_wordnet', lambda: wordnet.lu_matching(alignment)
+
+
+def measure(alignment, func, repeat):
+	"""Runs ``func`` ``repeat`` times and returns the best time in seconds and
+	the peak memory in bytes allocated by one more run.
+	"""
+	first_score = len(alignment.scores)
+	best = None
+
+	for _ in range(repeat):
+		start_time = time.perf_counter()
+		func()
+		elapsed = time.perf_counter() - start_time
+		best = elapsed if best is None else min(best, elapsed)
+		del alignment.scores[first_score:]
+
+	tracemalloc.start()
+	func()
+	_, peak = tracemalloc.get_traced_memory()
+	tracemalloc.stop()
+	del alignment.scores[first_score:]
+
+	return best, peak
+
+
+def benchmark(schema, sizes, lus=10, fes=8, repeat=3):
+	"""Aligns synthetic BFN and ``schema`` databases of each size in ``sizes``
+	and prints the estimated and measured costs of each technique.
+
+	:param schema: The l2 database schema, as in :data:`benchmarks.synthetic.SCHEMAS`.
+	:type schema: str
+	:param sizes: Numbers of frames of the generated databases.
+	:type sizes: list[int]
+	:param lus: Mean number of LUs per frame.
+	:type lus: int
+	:param fes: Mean number of FEs per frame.
+	:type fes: int
+	:param repeat: Number of runs, the best one is reported.
+	:type repeat: int
+	"""
+	constants = planner.calibrate()
+
+	for size in sizes:
+		with tempfile.TemporaryDirectory() as data_dir:
+			generate("bfn", data_dir, frames=size, lus=lus, fes=fes, annotations=0, seed=0)
+			generate(schema, data_dir, frames=size, lus=lus, fes=fes, annotations=0, seed=1)
+
+			en_fn = load("bfn", "en", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+			l2_fn = load(schema, "xx", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+
+		alignment = Alignment(en_fn, l2_fn)
+		wordnet_resources(alignment, synsets=len(alignment.frm) * 5)
+		funcs = dict(techniques(alignment, core_fes=schema in CORE_FE_SCHEMAS))
+		plan = planner.estimate(alignment, list(funcs), constants)
+
+		n_en, n_l2 = alignment.shape
+		print(f'{n_en} english x {n_l2} l2 frames ({schema})')
+		print(
+			f'{"technique":<22}{"estimate (s)":>14}{"measure (s)":>13}{"ratio":>8}'
+			f'{"estimate (MB)":>15}{"measure (MB)":>14}{"ratio":>8}')
+
+		for est in plan.estimates:
+			seconds, peak = measure(alignment, funcs[est.name], repeat)
+			print(
+				f'{est.name:<22}{est.seconds:>14.4f}{seconds:>13.4f}{est.seconds / max(seconds, 1e-9):>8.2f}'
+				f'{est.memory / 2**20:>15.2f}{peak / 2**20:>14.2f}{est.memory / max(peak, 1):>8.2f}')
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('--schema', choices=SCHEMAS.keys(), default="fnbrasil")
+	parser.add_argument('--frames', nargs='+', type=int, default=[1000, 5000])
+	parser.add_argument('--lus', type=int, default=10)
+	parser.add_argument('--fes', type=int, default=8)
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args()
+
+	benchmark(args.schema, args.frames, lus=args.lus, fes=args.fes, repeat=args.repeat)
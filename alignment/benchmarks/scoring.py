@@ -0,0 +1,203 @@
+"""Measures alignment techniques on synthetic FrameNets, comparing the score
+matrices computed at once with the ones computed iterating over
+:func:`fnalign.models.Alignment.pairs`.
+
+	python -m benchmarks.scoring --frames 300 1000
+
+BFN and an l2 database of ``--schema`` are written by
+:mod:`benchmarks.synthetic` and aligned. WordNet and vector techniques run on
+synthetic synsets and embeddings, so neither the WordNet corpus nor embedding
+files are needed, but they are skipped when their modules can't be imported.
+Times are the best of ``--repeat`` runs and resources shared by both paths,
+such as FE vectors, are computed before timing. The size of each stored score
+matrix, dense or sparse as chosen by :func:`fnalign.models.Alignment.add_scores`,
+is reported as well.
+
+"""
+
+import time
+import zlib
+import argparse
+import tempfile
+import numpy as np
+from scipy import sparse
+
+from fnalign.loaders import load
+from fnalign.models import Alignment
+from fnalign.alignment import attribute
+from fnalign.alignment.matrix import to_dense
+from benchmarks.synthetic import SCHEMAS, CORE_FE_SCHEMAS, generate
+
+
+class SyntheticEmbedding():
+	"""An embedding that gives each text a pseudo-random vector derived from
+	its content. It implements the methods used by vector techniques.
+
+	:param dim: The vectors dimension.
+	:type dim: int
+	"""
+
+	def __init__(self, dim=64):
+		self.dim = dim
+
+	def infer_vector(self, text, ignore_unk=False):
+		rng = np.random.RandomState(zlib.crc32(text.encode('utf-8')))
+		return rng.standard_normal(self.dim).astype(np.float32)
+
+	def get_word_emb(self, word):
+		return self.infer_vector(word)
+
+
+def wordnet_resources(alignment, synsets, seed=0):
+	"""Associates each LU of ``alignment`` to random synsets of a pool of
+	``synsets`` names, as :func:`fnalign.alignment.wordnet.get_mappings` does
+	with the WordNet ones.
+	"""
+	rng = np.random.RandomState(seed)
+	lu_to_syn, frm_to_syn = {}, {}
+
+	for frm in alignment.frm["obj"]:
+		frm_to_syn[frm.gid] = set()
+		for lu in frm.lus:
+			lu_to_syn[lu.gid] = {f'syn.{s}' for s in rng.randint(synsets, size=rng.randint(4))}
+			frm_to_syn[frm.gid] |= lu_to_syn[lu.gid]
+
+	alignment.resources.update({"lu_to_syn": lu_to_syn, "frm_to_syn": frm_to_syn, "syn_to_lu": {}})
+
+
+def lu_neighbors(alignment, K, seed=0):
+	"""Returns random nearest neighbors of each LU in the format used by
+	:func:`fnalign.alignment.vector.lu_scores`: a single neighbor for l2 LUs,
+	their own id, and ``K`` neighbors for english LUs.
+	"""
+	rng = np.random.RandomState(seed)
+	l2_lus = [lu.gid for frm in alignment.l2_frm["obj"] for lu in frm.lus]
+	lu_nn = {gid: [(1, i)] for i, gid in enumerate(l2_lus)}
+
+	for frm in alignment.en_frm["obj"]:
+		for lu in frm.lus:
+			lu_nn[lu.gid] = list(zip(rng.random_sample(K), rng.randint(len(l2_lus), size=K)))
+
+	return lu_nn
+
+
+def techniques(alignment, core_fes=True):
+	"""Returns the techniques to be measured as (name, function) pairs, where
+	function receives ``vectorized`` and adds the scores to ``alignment``.
+	Techniques that use core FEs are skipped unless ``core_fes`` is True.
+	"""
+	yield 'id_matching', lambda v: attribute.id_matching(alignment, vectorized=v)
+	yield 'name_matching', lambda v: attribute.name_matching(alignment, vectorized=v)
+
+	if core_fes:
+		yield 'core_fe_matching', lambda v: attribute.fe_matching(alignment, vectorized=v)
+
+	yield 'all_fe_matching', lambda v: attribute.fe_matching(alignment, core_only=False, vectorized=v)
+
+	try:
+		from fnalign.alignment import wordnet
+	except (ImportError, LookupError) as e:
+		print(f'Skipping WordNet techniques: {e}')
+	else:
+		wordnet_resources(alignment, synsets=len(alignment.frm) * 5)
+		yield 'synset', lambda v: wordnet.synset_matching(alignment, vectorized=v)
+		yield 'lu_wordnet', lambda v: wordnet.lu_matching(alignment, vectorized=v)
+
+	try:
+		from fnalign.alignment import vector
+	except ImportError as e:
+		print(f'Skipping vector techniques: {e}')
+	else:
+		emb = SyntheticEmbedding()
+		lu_nn = lu_neighbors(alignment, K=10)
+
+		yield 'lu_muse', lambda v: alignment.add_scores(
+			'lu_muse', 'lu_muse', vector.lu_scores(alignment, lu_nn, 10, 0.5, vectorized=v))
+		yield 'lu_mean_muse', lambda v: vector.lu_mean_matching(alignment, emb, emb, vectorized=v)
+		yield 'frame_def_muse', lambda v: vector.def_matching(alignment, emb, emb, vectorized=v)
+
+		# FE vectors are only computed for core FEs
+		if core_fes:
+			vector.set_fe_vecs(alignment, emb, emb, name_vecs=True)
+			yield 'muse_exact_fe_match', lambda v: vector.fe_exact_matching(alignment, emb, emb, vectorized=v)
+			yield 'muse_fe_match', lambda v: vector.fe_matching(alignment, emb, emb, vectorized=v)
+			yield 'muse_mixed_fe_match', lambda v: vector.fe_mixed_matching(alignment, vectorized=v)
+
+
+def matrix_size(matrix):
+	"""Returns the size in bytes of the arrays of a dense or sparse matrix."""
+	if sparse.issparse(matrix):
+		return matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes
+	return matrix.nbytes
+
+
+def measure(alignment, func, vectorized, repeat):
+	"""Runs ``func`` ``repeat`` times and returns the best time in seconds and
+	the last score matrix added to ``alignment``.
+	"""
+	best = None
+
+	for _ in range(repeat):
+		start_time = time.perf_counter()
+		func(vectorized)
+		elapsed = time.perf_counter() - start_time
+		best = elapsed if best is None else min(best, elapsed)
+
+	return best, alignment.scores[-1]["matrix"]
+
+
+def benchmark(schema, sizes, lus=10, fes=8, repeat=3):
+	"""Aligns synthetic BFN and ``schema`` databases of each size in ``sizes``
+	and prints the time of both scoring paths of each technique, whether their
+	scores are equal and the format and size of the stored matrix.
+
+	:param schema: The l2 database schema, as in :data:`benchmarks.synthetic.SCHEMAS`.
+	:type schema: str
+	:param sizes: Numbers of frames of the generated databases.
+	:type sizes: list[int]
+	:param lus: Mean number of LUs per frame.
+	:type lus: int
+	:param fes: Mean number of FEs per frame.
+	:type fes: int
+	:param repeat: Number of runs, the best one is reported.
+	:type repeat: int
+	"""
+	for size in sizes:
+		with tempfile.TemporaryDirectory() as data_dir:
+			generate("bfn", data_dir, frames=size, lus=lus, fes=fes, annotations=1, seed=0)
+			generate(schema, data_dir, frames=size, lus=lus, fes=fes, annotations=1, seed=1)
+
+			en_fn = load("bfn", "en", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+			l2_fn = load(schema, "xx", snapshot=False, lazy_annotations=True, data_dir=data_dir)
+
+		alignment = Alignment(en_fn, l2_fn)
+		n_en, n_l2 = alignment.shape
+
+		print(f'{n_en} english x {n_l2} l2 frames ({schema})')
+		print(
+			f'{"technique":<22}{"pairs (s)":>12}{"matrix (s)":>12}{"speedup":>10}{"equal":>8}'
+			f'{"format":>8}{"size (KB)":>12}')
+
+		for name, func in techniques(alignment, core_fes=schema in CORE_FE_SCHEMAS):
+			list_time, list_scores = measure(alignment, func, False, repeat)
+			matrix_time, matrix_scores = measure(alignment, func, True, repeat)
+			equal = np.allclose(
+				to_dense(list_scores).astype(float), to_dense(matrix_scores).astype(float), equal_nan=True)
+			layout = "sparse" if sparse.issparse(matrix_scores) else "dense"
+
+			print(
+				f'{name:<22}{list_time:>12.4f}{matrix_time:>12.4f}'
+				f'{list_time / max(matrix_time, 1e-9):>10.1f}{str(equal):>8}'
+				f'{layout:>8}{matrix_size(matrix_scores) / 2**10:>12.1f}')
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('--schema', choices=SCHEMAS.keys(), default="fnbrasil")
+	parser.add_argument('--frames', nargs='+', type=int, default=[300, 1000])
+	parser.add_argument('--lus', type=int, default=10)
+	parser.add_argument('--fes', type=int, default=8)
+	parser.add_argument('--repeat', type=int, default=3)
+	args = parser.parse_args()
+
+	benchmark(args.schema, args.frames, lus=args.lus, fes=args.fes, repeat=args.repeat)
@@ -0,0 +1,328 @@
+"""Generates synthetic FrameNet databases in each XML schema read by
+:mod:`fnalign.loaders`, so that loading can be measured at any size without
+the original releases. The number of frames, LUs, FEs and annotated sentences
+is configurable and the output of a given seed is always the same.
+
+	python -m benchmarks.synthetic bfn /tmp/synthetic --frames 1000
+
+The database is written to a folder named after the schema inside the output
+folder, which can then be given as ``data_dir`` to :func:`fnalign.loaders.load`.
+
+"""
+
+import os
+import random
+import argparse
+from xml.sax.saxutils import escape, quoteattr
+
+NS = "http://framenet.icsi.berkeley.edu"
+
+ONSETS = ["b", "c", "d", "f", "g", "l", "m", "n", "p", "r", "s", "t", "v", "br", "tr", "st", "pl"]
+VOWELS = ["a", "e", "i", "o", "u", "ai", "ou"]
+CODAS = ["", "", "", "n", "r", "s", "l", "t"]
+
+# FE names are shared by many frames in real databases, the first ones are
+# drawn far more often than the last ones
+FE_NAMES = [
+	"Agent", "Theme", "Time", "Place", "Manner", "Degree", "Means", "Purpose",
+	"Explanation", "Duration", "Frequency", "Goal", "Source", "Path", "Cause",
+	"Instrument", "Patient", "Experiencer", "Entity", "Event", "Speaker",
+	"Addressee", "Message", "Topic", "Recipient", "Donor", "Buyer", "Seller",
+	"Goods", "Money", "Victim", "Perpetrator", "Result", "Circumstances",
+	"Depictive", "Area", "Direction", "Distance", "Speed", "Co-participant",
+]
+
+POS = ["v", "n", "a", "adv", "prep"]
+POS_WEIGHTS = [40, 40, 15, 4, 1]
+
+CORE_TYPES = ["Core", "Peripheral", "Extra-Thematic", "Core-Unexpressed"]
+CORE_WEIGHTS = [40, 45, 14, 1]
+
+EN_FILLERS = [
+	"the", "of", "and", "that", "which", "with", "this", "is", "by", "an", "or",
+	"from", "who", "its", "has", "to", "for", "at", "on", "is", "such", "other",
+]
+PT_FILLERS = ["o", "a", "de", "que", "com", "em", "um", "uma", "do", "da", "para", "por"]
+ZH_RANGE = (0x4e00, 0x62ff)
+
+
+class Generator():
+	"""Draws the names and texts of a synthetic database. All random choices are
+	made by a :class:`random.Random` seeded with ``seed``.
+
+	:param seed: Seed of the random number generator.
+	:type seed: int
+	"""
+
+	def __init__(self, seed=0):
+		self.rng = random.Random(seed)
+		self.used_names = set()
+
+	def word(self):
+		"""Returns a random pronounceable word."""
+		syllables = self.rng.randint(1, 3)
+		return "".join(
+			self.rng.choice(ONSETS) + self.rng.choice(VOWELS) + self.rng.choice(CODAS)
+			for _ in range(syllables)
+		)
+
+	def zh_word(self):
+		"""Returns a random word of CJK ideographs."""
+		return "".join(chr(self.rng.randint(*ZH_RANGE)) for _ in range(self.rng.randint(1, 3)))
+
+	def frame_name(self, word=None):
+		"""Returns a frame name that was not returned before."""
+		word = word or self.word
+		while True:
+			name = "_".join(word().capitalize() for _ in range(self.rng.randint(1, 3)))
+			if name not in self.used_names:
+				self.used_names.add(name)
+				return name
+
+	def count(self, mean):
+		"""Returns a random count whose expected value is ``mean``."""
+		return self.rng.randint(max(0, mean // 2), mean + mean // 2) if mean else 0
+
+	def fe_names(self, mean):
+		"""Returns distinct FE names for a frame."""
+		n = max(1, self.count(mean))
+		names = []
+		while len(names) < n:
+			# Zipf-like choice over FE_NAMES, rare FEs get a made up name
+			rank = int(self.rng.paretovariate(1.2)) - 1
+			name = FE_NAMES[rank] if rank < len(FE_NAMES) else self.word().capitalize()
+			if name not in names:
+				names.append(name)
+		return names
+
+	def pos(self):
+		return self.rng.choices(POS, POS_WEIGHTS)[0]
+
+	def core_type(self, position):
+		return "Core" if position < 2 else self.rng.choices(CORE_TYPES, CORE_WEIGHTS)[0]
+
+	def tokens(self, fillers, words):
+		"""Returns ``words`` random words, some of them taken from ``fillers``."""
+		return [
+			self.rng.choice(fillers) if self.rng.random() < 0.4 else self.word()
+			for _ in range(words)
+		]
+
+	def text(self, fillers, mentions=()):
+		"""Returns a sentence of random words mixed with ``fillers`` and
+		``mentions``.
+		"""
+		tokens = self.tokens(fillers, self.rng.randint(8, 20))
+		for mention in mentions:
+			tokens.insert(self.rng.randint(0, len(tokens)), mention)
+		return " ".join(tokens).capitalize() + "."
+
+	def sentence(self, lemma, fillers):
+		"""Returns an annotated sentence and the first and last character offsets
+		of ``lemma`` in it.
+		"""
+		before = " ".join(self.tokens(fillers, self.rng.randint(0, 10)))
+		after = " ".join(self.tokens(fillers, self.rng.randint(0, 10)))
+		prefix = f"{before} " if before else ""
+		sentence = f"{prefix}{lemma} {after}".strip() + "."
+		return sentence, len(prefix), len(prefix) + len(lemma) - 1
+
+
+def write_xml(path, parts):
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	with open(path, "w", encoding="utf-8") as fp:
+		fp.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+		fp.write("".join(parts))
+
+
+def write_bfn(base_path, gen, frames, lus, fes, annotations):
+	"""Writes a database in the Berkeley FrameNet schema: one file per frame in
+	``frame`` and one file per LU in ``lu``.
+	"""
+	lu_id = 0
+	fe_id = 0
+
+	for frame_id in range(1, frames + 1):
+		name = gen.frame_name()
+		fe_names = gen.fe_names(fes)
+		mentions = [f"<fen>{fe}</fen>" for fe in fe_names[:2]]
+		definition = f"<def-root>{gen.text(EN_FILLERS, mentions)}<ex>{gen.text(EN_FILLERS)}</ex></def-root>"
+		parts = [
+			f'<frame xmlns="{NS}" ID="{frame_id}" name={quoteattr(name)}>',
+			f"<definition>{escape(definition)}</definition>",
+		]
+
+		for i, fe in enumerate(fe_names):
+			fe_id += 1
+			fe_def = f"<def-root>{gen.text(EN_FILLERS, [f'<fen>{fe}</fen>'])}</def-root>"
+			parts.append(
+				f'<FE ID="{fe_id}" name={quoteattr(fe)} abbrev={quoteattr(fe[:3])} '
+				f'coreType="{gen.core_type(i)}"><definition>{escape(fe_def)}</definition></FE>'
+			)
+
+		for _ in range(gen.count(lus)):
+			lu_id += 1
+			lemma, pos = gen.word(), gen.pos()
+			parts.append(f'<lexUnit ID="{lu_id}" name="{lemma}.{pos}" POS="{pos.upper()}"/>')
+
+			lu_parts = [f'<lexUnit xmlns="{NS}" ID="{lu_id}"><subCorpus name="manually-added">']
+			for sent_id in range(gen.count(annotations)):
+				sentence, start, end = gen.sentence(lemma, EN_FILLERS)
+				lu_parts.append(
+					f'<sentence ID="{sent_id}"><text>{escape(sentence)}</text><annotationSet>'
+					f'<layer name="Target"><label name="Target" start="{start}" end="{end}"/></layer>'
+					f'</annotationSet></sentence>'
+				)
+			lu_parts.append("</subCorpus></lexUnit>")
+			write_xml(os.path.join(base_path, "lu", f"lu{lu_id}.xml"), lu_parts)
+
+		parts.append("</frame>")
+		write_xml(os.path.join(base_path, "frame", f"{name}.xml"), parts)
+
+
+def write_fnbrasil(base_path, gen, frames, lus, fes, annotations):
+	"""Writes a database in the FrameNet Brasil/SALSA schema: all frames in
+	``data.xml`` and one file per LU in ``lu``.
+	"""
+	lu_id = 0
+	fe_id = 0
+	parts = ["<frames>"]
+
+	for frame_id in range(1, frames + 1):
+		definition = f"{gen.text(PT_FILLERS)}\nEx: {gen.text(PT_FILLERS)}"
+		parts.append(
+			f'<frame ID="{frame_id}" name={quoteattr(gen.frame_name())}>'
+			f"<definition>{escape(definition)}</definition><lexunits>"
+		)
+
+		for _ in range(gen.count(lus)):
+			lu_id += 1
+			lemma, pos = gen.word(), gen.pos()
+			parts.append(f'<lexunit ID="{lu_id}" name="{lemma}.{pos}" pos="{pos.upper()}"/>')
+
+			lu_parts = ["<lexunit><subcorpus>"]
+			for _ in range(gen.count(annotations)):
+				sentence, start, end = gen.sentence(lemma, PT_FILLERS)
+				lu_parts.append(
+					f"<annotationSet><sentence><text>{escape(sentence)}</text></sentence>"
+					f'<layers><layer name="Target"><labels><label name="Target" start="{start}" '
+					f'end="{end}"/></labels></layer></layers></annotationSet>'
+				)
+			lu_parts.append("</subcorpus></lexunit>")
+			write_xml(os.path.join(base_path, "lu", f"lu{lu_id}.xml"), lu_parts)
+
+		parts.append("</lexunits><fes>")
+		for i, fe in enumerate(gen.fe_names(fes)):
+			fe_id += 1
+			parts.append(
+				f'<fe ID="{fe_id}" name={quoteattr(fe)} abbrev={quoteattr(fe[:2])} '
+				f'coreType="{gen.core_type(i)}"><definition>{escape(gen.text(PT_FILLERS))}</definition></fe>'
+			)
+		parts.append("</fes></frame>")
+
+	parts.append("</frames>")
+	write_xml(os.path.join(base_path, "data.xml"), parts)
+
+
+def write_chinesefn(base_path, gen, frames, lus, fes, annotations):
+	"""Writes a database in the Chinese FrameNet schema: one file per frame in
+	``frame`` with english translations of frame and FE names. This schema has
+	no annotated sentences.
+	"""
+	for frame_id in range(1, frames + 1):
+		name_en = gen.frame_name()
+		lu_parts = [
+			f'<lexicalunit lexicalunit_name="{gen.zh_word()}.{pos}" lexicalunit_pos_mark="{pos}"/>'
+			for pos in (gen.pos() for _ in range(gen.count(lus)))
+		]
+		fe_parts = [
+			f'<FE frameelement_name="{gen.zh_word()}" frameelement_name_en={quoteattr(fe)} '
+			f'frameelement_abbr={quoteattr(fe[:2])}/>'
+			for fe in gen.fe_names(fes)
+		]
+		write_xml(os.path.join(base_path, "frame", f"{frame_id}.xml"), [
+			f'<Frame><Frame_Info frame_name="{gen.zh_word()}" frame_name_en={quoteattr(name_en)} ',
+			f'frame_def="{gen.zh_word() * 4}"><LexicalUnit_Info>{"".join(lu_parts)}</LexicalUnit_Info>',
+			f'<FrameElement_Info>{"".join(fe_parts)}</FrameElement_Info></Frame_Info></Frame>',
+		])
+
+
+def write_swedishfn(base_path, gen, frames, lus, fes, annotations):
+	"""Writes a database in the Swedish FrameNet schema: all frames in
+	``data.xml`` as senses of lexical entries. Most frames are linked to a
+	Berkeley FrameNet frame and there are no definitions or annotated sentences.
+	"""
+	parts = ["<LexicalResource><Lexicon>"]
+
+	for frame_id in range(1, frames + 1):
+		feats = []
+		if gen.rng.random() < 0.8:
+			feats.append(f'<feat att="BFNID" val={quoteattr(gen.frame_name())}/>')
+		for _ in range(gen.count(lus)):
+			feats.append(f'<feat att="LU" val="{gen.word()}..{gen.rng.randint(1, 3)}"/>')
+		for i, fe in enumerate(gen.fe_names(fes)):
+			att = "coreElement" if i < 2 or gen.rng.random() < 0.4 else "peripheralElement"
+			feats.append(f'<feat att="{att}" val={quoteattr(fe)}/>')
+		parts.append(
+			f'<LexicalEntry><Sense id="{gen.word()}{frame_id}">{"".join(feats)}</Sense></LexicalEntry>'
+		)
+
+	parts.append("</Lexicon></LexicalResource>")
+	write_xml(os.path.join(base_path, "data.xml"), parts)
+
+
+SCHEMAS = {
+	"bfn": write_bfn,
+	"fnbrasil": write_fnbrasil,
+	"chinesefn": write_chinesefn,
+	"swedishfn": write_swedishfn,
+}
+
+# Schemas whose FEs have a core type, which core FE techniques need
+CORE_FE_SCHEMAS = ("bfn", "fnbrasil", "swedishfn")
+
+
+def generate(schema, data_dir, frames=100, lus=10, fes=8, annotations=5, seed=0, name=None):
+	"""Writes a synthetic database of ``schema`` to ``data_dir``. The numbers of
+	LUs and FEs of each frame and of annotated sentences of each LU vary around
+	the given means.
+
+	:param schema: The database schema, one of :data:`SCHEMAS`.
+	:type schema: str
+	:param data_dir: The folder where the database folder is created.
+	:type data_dir: str
+	:param frames: Number of frames.
+	:type frames: int
+	:param lus: Mean number of LUs per frame.
+	:type lus: int
+	:param fes: Mean number of FEs per frame.
+	:type fes: int
+	:param annotations: Mean number of annotated sentences per LU.
+	:type annotations: int
+	:param seed: Seed of the random number generator.
+	:type seed: int
+	:param name: The name of the database folder, the schema name by default.
+	:type name: str
+	:returns: The path of the database folder.
+	:rtype: str
+	"""
+	base_path = os.path.join(data_dir, name or schema)
+	SCHEMAS[schema](base_path, Generator(seed), frames, lus, fes, annotations)
+	return base_path
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('schema', choices=SCHEMAS.keys())
+	parser.add_argument('data_dir')
+	parser.add_argument('--frames', type=int, default=100)
+	parser.add_argument('--lus', type=int, default=10)
+	parser.add_argument('--fes', type=int, default=8)
+	parser.add_argument('--annotations', type=int, default=5)
+	parser.add_argument('--seed', type=int, default=0)
+	args = parser.parse_args()
+
+	path = generate(
+		args.schema, args.data_dir, frames=args.frames, lus=args.lus, fes=args.fes,
+		annotations=args.annotations, seed=args.seed)
+	print(f'Synthetic {args.schema} database written to {path}')
@@ -0,0 +1,91 @@
+"""Converts alignment outputs between the JSON format described by
+fnalign/schema.json and the binary container of fnalign.output. The direction
+is given by the input file: binary outputs are converted to JSON and JSON
+outputs to binary. With --top-k, scores are pruned to the best ones of each
+frame while converting.
+
+	python convert_output.py out/202001011200_fnbrasil.json out/fnbrasil.fnalign
+	python convert_output.py out/fnbrasil.fnalign out/fnbrasil.json
+	python convert_output.py out/fnbrasil.fnalign out/fnbrasil_top5.json --top-k 5
+
+"""
+
+import os
+import time
+import logging
+import argparse
+
+logging.basicConfig(
+	level=logging.INFO,
+	format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('alignment')
+
+from fnalign import output
+from fnalign.models import CustomEncoder
+from fnalign.alignment.matrix import top_k as prune_top_k
+
+
+def prune(data, top_k, threshold=None):
+	"""Prunes the scores of an alignment output as
+	:func:`fnalign.models.Alignment.dump` does with ``top_k``.
+
+	:param data: The alignment output.
+	:type data: dict
+	:param top_k: Number of scores kept for each frame.
+	:type top_k: int
+	:param threshold: Scores kept regardless of ``top_k``.
+	:type threshold: float
+	:returns: ``data``, with its scores replaced.
+	:rtype: dict
+	"""
+	for alignment in data["alignments"]:
+		if alignment.get("data") is not None:
+			alignment["data"] = prune_top_k(alignment["data"], top_k, threshold=threshold)
+			alignment["pruning"] = {"top_k": top_k, "threshold": threshold}
+
+	return data
+
+
+def convert(src, dst, precision='float32', top_k=None, threshold=None):
+	"""Converts the alignment output ``src`` to the other format and saves it
+	to ``dst``.
+
+	:param src: The input file path.
+	:type src: str
+	:param dst: The output file path.
+	:type dst: str
+	:param precision: The values type of dense scores in binary outputs,
+		"float32" or "float16".
+	:type precision: str
+	:param top_k: If given, number of scores kept for each frame.
+	:type top_k: int
+	:param threshold: Scores kept regardless of ``top_k``.
+	:type threshold: float
+	"""
+	start_time = time.time()
+	binary = output.is_binary(src)
+	data = output.read(src) if binary else output.read_json(src)
+
+	if top_k is not None:
+		data = prune(data, top_k, threshold=threshold)
+
+	if binary:
+		output.write_json(dst, data, cls=CustomEncoder)
+	else:
+		output.write(dst, data, precision=precision, cls=CustomEncoder)
+
+	logger.info(
+		f'{src} ({os.path.getsize(src) / 2**20:.1f} MB) converted to '
+		f'{dst} ({os.path.getsize(dst) / 2**20:.1f} MB) in {time.time() - start_time:.1f} seconds')
+
+
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+	parser.add_argument('src')
+	parser.add_argument('dst')
+	parser.add_argument('--precision', choices=output.PRECISIONS.keys(), default='float32')
+	parser.add_argument('--top-k', type=int)
+	parser.add_argument('--threshold', type=float)
+	args = parser.parse_args()
+
+	convert(args.src, args.dst, precision=args.precision, top_k=args.top_k, threshold=args.threshold)
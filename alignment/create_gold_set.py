@@ -1,7 +1,8 @@
 import os
 import time
 import logging
-import pandas as pd
+import numpy as np
+from scipy import sparse
 
 global_time = time.time()
 
@@ -14,6 +15,18 @@ from fnalign.loaders import load
 from fnalign.models import Alignment
 from fnalign.alignment import attribute
 
+
+def add_matches(matched, score):
+	"""Adds 1 to the pairs of ``matched`` where ``score`` has value 1."""
+	return matched + sparse.csr_matrix(score["matrix"] == 1, dtype=np.int64)
+
+
+def complete_pairs(alignment, matched):
+	"""Returns the rows and columns of pairs matched by all scores."""
+	if not alignment.scores:
+		return np.indices(alignment.shape).reshape(2, -1)
+	return (matched == len(alignment.scores)).nonzero()
+
 if __name__ == "__main__":
 	configs = [
 		# ('chinesefn', 'zh'),
@@ -26,38 +39,36 @@ if __name__ == "__main__":
 		('dutchfn', 'nl'),
 	]
 
-	en_fn = load("bfn", "en")
+	en_fn = load("bfn", "en", lazy_annotations=True)
 
 	for db_name, lang in configs:
 		start_time = time.time()
 
-		l2_fn = load(db_name, lang)
+		l2_fn = load(db_name, lang, lazy_annotations=True)
 		alignment = Alignment(en_fn, l2_fn)
-		df = pd.DataFrame(0, index=alignment.en_frm['name'], columns=alignment.l2_frm['name'])
+		matched = sparse.csr_matrix(alignment.shape, dtype=np.int64)
 
 		if db_name != "fnbrasil":
 			attribute.name_matching(alignment)
-			df_score = alignment.scores[-1]["df"]
-			df = df.add(df_score, fill_value=0)
+			matched = add_matches(matched, alignment.scores[-1])
 
-		logger.info(f'     matching name count    = {len(df.loc[:, (df == len(alignment.scores)).sum() > 0].columns)}')
+		logger.info(f'     matching name count    = {len(set(complete_pairs(alignment, matched)[1]))}')
 
 		if db_name != "chinesefn":
 			attribute.fe_matching(alignment)
-			df_score = alignment.scores[-1]["df"]
-			df = df.add(df_score, fill_value=0)
+			matched = add_matches(matched, alignment.scores[-1])
 
-		logger.info(f'     matching name/fe count = {len(df.loc[:, (df == len(alignment.scores)).sum() > 0].columns)}')
+		logger.info(f'     matching name/fe count = {len(set(complete_pairs(alignment, matched)[1]))}')
 
 		if db_name not in ["chinesefn", "swedishfn"]:
 			attribute.id_matching(alignment)
-			df_score = alignment.scores[-1]["df"]
-			df = df.add(df_score, fill_value=0)
+			matched = add_matches(matched, alignment.scores[-1])
 
-		logger.info(f'     matching id count      = {len(df.loc[:, (df == len(alignment.scores)).sum() > 0].columns)}')
+		logger.info(f'     matching id count      = {len(set(complete_pairs(alignment, matched)[1]))}')
 		logger.info(f'')
 
-		pairs = df[df == len(alignment.scores)].stack().index.tolist()
+		rows, cols = complete_pairs(alignment, matched)
+		pairs = zip(alignment.en_frm['name'].iloc[rows], alignment.l2_frm['name'].iloc[cols])
 		path = os.path.join('out', f'gold_{db_name}.txt')
 
 		with open(path, 'w+') as fp:
@@ -1,47 +1,112 @@
 """This module contains basic alignment procedures based on FrameNet elements's
 attributes. This alignments should be mainly used as baselines for validation.
 
+Each technique computes the score matrix at once from per-side arrays. ID and
+name matching join them by hash indexes, so they take linear time and give
+sparse matrices, and FE matching gets all intersections of FE sets with a
+product of sparse incidence matrices. With ``vectorized=False`` techniques
+iterate over :func:`Alignment.pairs` instead, which gives the same scores.
+
 .. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
 """
 
-def id_matching(alignment):
+import numpy as np
+from scipy import sparse
+
+from fnalign.alignment.matrix import equal_pairs, overlap_scores
+from fnalign.alignment.fuzzy import TrigramIndex
+from fnalign.alignment.minhash import similar_pairs
+
+def id_matching(alignment, vectorized=True):
 	"""Computes the alignment score of each frame pair in ``alignment``. When
 	both frames have same ID, score = 1, else 0.
 
 	:param alignment: An :class:`Alignment` instance.
 	:type alignment: :class:`Alignment`
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
-	scores = []
-	for frame, other in alignment.pairs():
-		scores.append(1 if frame.id == other.id else 0)
-	
+	if vectorized:
+		scores = equal_pairs(*alignment.frame_values(lambda frm: frm.id))
+	else:
+		scores = []
+		for frame, other in alignment.pairs():
+			scores.append(1 if frame.id == other.id else 0)
+
 	alignment.add_scores(
 		'id_matching', 'attr_matching', scores,
 		desc=f'Matching ID')
 
-def name_matching(alignment):
+def name_matching(alignment, vectorized=True):
 	"""Computes the alignment score of each frame pair in ``alignment``. When
 	both frames have the same name, score = 1, else 0.
 
 	:param alignment: An :class:`Alignment` instance.
 	:type alignment: :class:`Alignment`
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
-	scores = []
-	for frame, other in alignment.pairs():
-		scores.append(1 if frame.name == other.name or frame.name == other.name_en else 0)
-	
+	if vectorized:
+		en_names, l2_names = alignment.frame_values(lambda frm: frm.name)
+		_, l2_names_en = alignment.frame_values(lambda frm: frm.name_en)
+		scores = equal_pairs(en_names, l2_names, l2_names_en)
+	else:
+		scores = []
+		for frame, other in alignment.pairs():
+			scores.append(1 if frame.name == other.name or frame.name == other.name_en else 0)
+
 	alignment.add_scores(
 		'name_matching', 'attr_matching', scores,
 		desc=f'Matching Name')
 
-def fe_matching(alignment, core_only=True):
+def fuzzy_name_matching(alignment, min_similarity=0.8):
+	"""Computes the alignment score of each frame pair in ``alignment`` whose
+	names are similar, ignoring case and diacritics. The score is the greatest
+	similarity of the english frame name to the l2 frame ``name`` or
+	``name_en``, as defined in :mod:`fnalign.alignment.fuzzy`, and pairs below
+	``min_similarity`` score 0.
+
+	English names are indexed by trigrams once and all l2 names are searched in
+	the index at once, so only pairs of close names are compared.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`Alignment`
+	:param min_similarity: The minimum similarity of names, at least 2/3.
+	:type min_similarity: float
+	"""
+	en_names, l2_names = alignment.frame_values(lambda frm: frm.name)
+	_, l2_names_en = alignment.frame_values(lambda frm: frm.name_en)
+	queries = [(j, name) for j, names in enumerate(zip(l2_names, l2_names_en)) for name in set(names) if name]
+	matches = {}
+
+	for i, k, similarity in TrigramIndex(en_names).search([name for _, name in queries], min_similarity):
+		j = queries[k][0]
+		matches[i, j] = max(matches.get((i, j), 0), similarity)
+
+	rows, cols = zip(*matches) if matches else ((), ())
+	scores = sparse.csr_matrix(
+		(list(matches.values()), (rows, cols)), shape=alignment.shape, dtype=np.float64)
+
+	alignment.add_scores(
+		'fuzzy_name_matching', 'attr_matching', scores,
+		desc=f'Similar Name (≥ {min_similarity})')
+
+def fe_matching(alignment, core_only=True, vectorized=True, threshold=None):
 	"""Computes the jaccard score of each frame pair in ``alignment`` based on
 	core frame elements sets.
 
+	With a ``threshold``, only pairs with a score of at least ``threshold`` are
+	kept. They are found by :func:`fnalign.alignment.minhash.similar_pairs`,
+	which scores only candidate pairs in near-linear time but may miss a few.
+
 	:param alignment: An :class:`Alignment` instance.
 	:type alignment: :class:`Alignment`
 	:param core_only: If only core FEs should be considered for alignment.
 	:type core_only: bool
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
+	:param threshold: The minimum score of pairs found by MinHash LSH.
+	:type threshold: float
 	"""
 	aid = 'core_fe_matching' if core_only else 'all_fe_matching'
 
@@ -54,6 +119,18 @@ def fe_matching(alignment, core_only=True):
 		get_fes = lambda frm: set(
 			fe.name_en or fe.name for fe in frm.fes)
 
+	if threshold is not None:
+		scores = similar_pairs(*alignment.frame_values(get_fes), threshold)
+
+		alignment.add_scores(aid, 'fe_matching', scores, desc=f'Matching core FEs (≥ {threshold})')
+		return
+
+	if vectorized:
+		scores, = overlap_scores(*alignment.frame_values(get_fes), measures=["jaccard"])
+
+		alignment.add_scores(aid, 'fe_matching', scores, desc=f'Matching core FEs')
+		return
+
 	fe_name_dict = {
 		frm.gid: get_fes(frm)
 		for frm in alignment.frm["obj"]
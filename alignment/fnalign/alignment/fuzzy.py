@@ -0,0 +1,149 @@
+"""This module contains a character trigram index that finds, for a name, the
+indexed names within an edit distance bound without comparing it to all of
+them.
+
+Names are compared after :func:`normalize`, so case and diacritics don't count
+as edits. The similarity of two names is 1 - *d* ÷ *n*, where *d* is their
+edit distance and *n* the length of the longest one, and a query with a
+minimum similarity allows each candidate at most *d* = ⌊(1 - similarity) ×
+*n*⌋ edits. Since an edit removes at most 3 trigrams, names within *d* edits
+share all but 3 *d* of the distinct trigrams of the padded names. Only
+pairs of names of close length that share that many trigrams, counted for
+all pairs at once with a sparse matrix product, have their edit distance
+computed. Pairs that share no trigram are never compared, which can only
+miss names, with repeated trigrams or similarities below 2/3, whose bound is
+not positive.
+
+>>> index = TrigramIndex(["Cause_to_make_progress", "Motion"])
+>>> index.search(["cause_to_make_progres"], 0.9)
+[(0, 0, 0.9545454545454546)]
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import unicodedata
+import numpy as np
+from scipy import sparse
+
+from fnalign.alignment.matrix import set_sizes
+
+# Padding of names, so that their first and last characters are in 3 trigrams
+PAD = "\0\0"
+
+
+def normalize(name):
+	"""Returns ``name`` in lower case and without diacritics."""
+	decomposed = unicodedata.normalize('NFKD', name)
+	return "".join(c for c in decomposed if not unicodedata.combining(c)).casefold()
+
+
+def trigrams(name):
+	"""Returns the set of trigrams of the padded ``name``.
+
+	:rtype: set[str]
+	"""
+	padded = f'{PAD}{name}{PAD}'
+	return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, max_distance):
+	"""Computes the Levenshtein distance of ``a`` and ``b``, giving up as soon
+	as it is greater than ``max_distance``.
+
+	:param a: A string.
+	:type a: str
+	:param b: A string.
+	:type b: str
+	:param max_distance: The maximum distance of interest.
+	:type max_distance: int
+	:returns: The distance, or None if it is greater than ``max_distance``.
+	:rtype: int
+	"""
+	if abs(len(a) - len(b)) > max_distance:
+		return None
+
+	previous = list(range(len(b) + 1))
+
+	for i, ca in enumerate(a, 1):
+		current = [i]
+		for j, cb in enumerate(b, 1):
+			current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+
+		if min(current) > max_distance:
+			return None
+		previous = current
+
+	return previous[-1] if previous[-1] <= max_distance else None
+
+
+class TrigramIndex():
+	"""An index of the trigrams of ``names``, as a sparse name × trigram matrix.
+
+	:param names: The indexed names.
+	:type names: Sequence[str]
+	"""
+
+	def __init__(self, names):
+		self.names = [normalize(name) for name in names]
+		self.lengths = np.array([len(name) for name in self.names], dtype=np.int64)
+		self.columns = {}
+		self.matrix = self.incidence([trigrams(name) for name in self.names], add=True)
+
+	def incidence(self, grams, add=False):
+		"""Returns the sparse binary matrix with a row for each set of ``grams``
+		and a column for each indexed trigram. With ``add``, missing trigrams
+		are added to the index columns, otherwise they are left out.
+
+		:rtype: scipy.sparse.csr_matrix
+		"""
+		indptr, indices = [0], []
+		for items in grams:
+			if add:
+				indices.extend(self.columns.setdefault(gram, len(self.columns)) for gram in items)
+			else:
+				indices.extend(self.columns[gram] for gram in items if gram in self.columns)
+			indptr.append(len(indices))
+
+		return sparse.csr_matrix(
+			(np.ones(len(indices), dtype=np.int64), indices, indptr),
+			shape=(len(grams), len(self.columns)))
+
+	def search(self, names, min_similarity):
+		"""Finds the indexed names with a similarity to each of ``names`` of at
+		least ``min_similarity``.
+
+		Trigrams shared by each pair are counted at once as the product of their
+		incidence matrices, which only has the pairs sharing any trigram.
+
+		:param names: The query names.
+		:type names: Sequence[str]
+		:param min_similarity: The minimum similarity. Names that share no
+			trigram with a query are not found, which only happens below 2/3.
+		:type min_similarity: float
+		:returns: The position of the indexed name, the position of the query and
+			their similarity, for each pair found.
+		:rtype: list[tuple(int, int, float)]
+		"""
+		names = [normalize(name) for name in names]
+		grams = [trigrams(name) for name in names]
+		lengths = np.array([len(name) for name in names], dtype=np.int64)
+
+		shared = (self.matrix @ self.incidence(grams).T).tocoo()
+		rows, cols = shared.row, shared.col
+		longest = np.maximum(self.lengths[rows], lengths[cols])
+		# Rounded so that float errors never drop a name at the bound
+		max_distance = np.floor(np.round((1 - min_similarity) * longest, 9)).astype(np.int64)
+
+		# An edit removes at most 3 of the distinct trigrams of a name
+		most_grams = np.maximum(np.diff(self.matrix.indptr)[rows], set_sizes(grams)[cols])
+		keep = (
+			(shared.data >= most_grams - 3 * max_distance) &
+			(np.abs(self.lengths[rows] - lengths[cols]) <= max_distance))
+
+		matches = []
+		for i, j, limit, length in zip(rows[keep], cols[keep], max_distance[keep], longest[keep]):
+			distance = edit_distance(self.names[i], names[j], limit)
+			if distance is not None:
+				matches.append((int(i), int(j), 1 - distance / int(length) if length else 1.0))
+
+		return matches
@@ -0,0 +1,311 @@
+"""This module contains helpers used by alignment techniques to compute the
+scores of all frame pairs at once. They take per-side arrays, with one value
+for each english frame and one for each l2 frame (see
+:func:`fnalign.models.Alignment.frame_values`), and return matrices whose rows
+are english frames and columns are l2 frames.
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+from collections import defaultdict
+import numpy as np
+from scipy import sparse
+
+
+def equal_pairs(en, *l2):
+	"""Returns a sparse matrix with 1 where ``en[i] == l2[j]`` and 0 elsewhere.
+	It is computed by a hash join, i.e., each l2 value is looked up in an index
+	of the english values, so it takes linear time in the number of frames and
+	matches. When more than one l2 array is given, the matrix has 1 where
+	``en[i]`` is equal to the value of any of them.
+
+	:param en: The english frames values.
+	:type en: numpy.ndarray
+	:param l2: The l2 frames values.
+	:type l2: numpy.ndarray
+	:rtype: scipy.sparse.csr_matrix
+	"""
+	index = defaultdict(list)
+	for i, value in enumerate(en):
+		index[value].append(i)
+
+	rows, cols = [], []
+	for j, values in enumerate(zip(*l2)):
+		matches = {i for value in values for i in index.get(value, ())}
+		rows.extend(matches)
+		cols.extend([j] * len(matches))
+
+	return sparse.csr_matrix(
+		(np.ones(len(rows), dtype=np.int64), (rows, cols)), shape=(len(en), len(l2[0])))
+
+
+def incidence(en_sets, l2_sets):
+	"""Returns the sparse binary incidence matrices of ``en_sets`` and
+	``l2_sets``, with a row for each set and a column for each item of the
+	english sets. Items only in l2 sets have no column, since they are in no
+	intersection.
+
+	:param en_sets: The set of each english frame.
+	:type en_sets: Sequence[set]
+	:param l2_sets: The set of each l2 frame.
+	:type l2_sets: Sequence[set]
+	:returns: The english and l2 matrices.
+	:rtype: tuple(scipy.sparse.csr_matrix, scipy.sparse.csr_matrix)
+	"""
+	columns = {}
+	for items in en_sets:
+		for item in items:
+			columns.setdefault(item, len(columns))
+
+	matrices = []
+	for sets in (en_sets, l2_sets):
+		indptr, indices = [0], []
+		for items in sets:
+			indices.extend(columns[item] for item in items if item in columns)
+			indptr.append(len(indices))
+
+		matrices.append(sparse.csr_matrix(
+			(np.ones(len(indices), dtype=np.int64), indices, indptr),
+			shape=(len(sets), len(columns))))
+
+	return tuple(matrices)
+
+
+def intersections(en_sets, l2_sets):
+	"""Returns the sparse matrix of intersection sizes of each english and l2
+	set, computed as the product of their incidence matrices.
+
+	:param en_sets: The set of each english frame.
+	:type en_sets: Sequence[set]
+	:param l2_sets: The set of each l2 frame.
+	:type l2_sets: Sequence[set]
+	:rtype: scipy.sparse.csr_matrix
+	"""
+	en, l2 = incidence(en_sets, l2_sets)
+	return (en @ l2.T).tocsr()
+
+
+def overlap_counts(en_sets, l2_sets):
+	"""Returns the matrix of intersection sizes of each english and l2 set.
+
+	:param en_sets: The set of each english frame.
+	:type en_sets: Sequence[set]
+	:param l2_sets: The set of each l2 frame.
+	:type l2_sets: Sequence[set]
+	:rtype: numpy.ndarray
+	"""
+	return intersections(en_sets, l2_sets).toarray()
+
+
+# Denominators of overlap measures from intersection and set sizes
+OVERLAP_MEASURES = {
+	"jaccard": lambda inter, en_len, l2_len: en_len + l2_len - inter,
+	"en": lambda inter, en_len, l2_len: en_len,
+	"l2": lambda inter, en_len, l2_len: l2_len,
+}
+
+
+def overlap_scores(en_sets, l2_sets, measures=("jaccard",)):
+	"""Returns sparse matrices of set overlap scores of each english and l2 set.
+	Intersection sizes are computed once by :func:`intersections` and divided,
+	only where they are not 0, by the denominator of each measure:
+
+	* ``"jaccard"``: the size of the union.
+	* ``"en"``: the size of the english set.
+	* ``"l2"``: the size of the l2 set.
+
+	:param en_sets: The set of each english frame.
+	:type en_sets: Sequence[set]
+	:param l2_sets: The set of each l2 frame.
+	:type l2_sets: Sequence[set]
+	:param measures: Names of :data:`OVERLAP_MEASURES`.
+	:type measures: Sequence[str]
+	:returns: A score matrix for each measure.
+	:rtype: list[scipy.sparse.csr_matrix]
+	"""
+	inter = intersections(en_sets, l2_sets)
+	inter.sort_indices()
+	rows = np.repeat(np.arange(inter.shape[0]), np.diff(inter.indptr))
+	en_len = set_sizes(en_sets)[rows]
+	l2_len = set_sizes(l2_sets)[inter.indices]
+
+	# Each matrix gets its own index arrays, so changing one leaves the others
+	return [
+		sparse.csr_matrix(
+			(inter.data / OVERLAP_MEASURES[measure](inter.data, en_len, l2_len),
+				inter.indices.copy(), inter.indptr.copy()),
+			shape=inter.shape)
+		for measure in measures
+	]
+
+
+def match_counts(en_groups, l2_sets):
+	"""Returns the matrix with the number of sets in each english group that
+	intersect each l2 set, e.g., the number of LUs of an english frame that
+	share a synset with a l2 frame.
+
+	It is computed with the incidence matrices of the english sets, e.g., LU ×
+	synset, and of the l2 sets. Their product is greater than 0 where a set
+	intersects a l2 set, and the product of the group × set incidence matrix by
+	those matches counts them for each group.
+
+	:param en_groups: The sets of each english frame.
+	:type en_groups: Sequence[Sequence[set]]
+	:param l2_sets: The set of each l2 frame.
+	:type l2_sets: Sequence[set]
+	:rtype: scipy.sparse.csr_matrix
+	"""
+	en_sets = [items for group in en_groups for items in group]
+	en, l2 = incidence(en_sets, l2_sets)
+
+	matches = (en @ l2.T).tocsr()
+	matches.data = (matches.data > 0).astype(np.int64)
+
+	sizes = np.fromiter((len(group) for group in en_groups), np.int64, len(en_groups))
+	groups = sparse.csr_matrix(
+		(np.ones(len(en_sets), dtype=np.int64), np.arange(len(en_sets)), np.concatenate([[0], np.cumsum(sizes)])),
+		shape=(len(en_groups), len(en_sets)))
+
+	return (groups @ matches).tocsr()
+
+
+def match_ratios(en_groups, l2_sets):
+	"""Returns the sparse matrix of :func:`match_counts` divided by the size of
+	each english group, e.g., the fraction of LUs of an english frame that share
+	a synset with a l2 frame.
+
+	:param en_groups: The sets of each english frame.
+	:type en_groups: Sequence[Sequence[set]]
+	:param l2_sets: The set of each l2 frame.
+	:type l2_sets: Sequence[set]
+	:rtype: scipy.sparse.csr_matrix
+	"""
+	counts = match_counts(en_groups, l2_sets)
+	sizes = np.fromiter((len(group) for group in en_groups), np.int64, len(en_groups))
+	rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+
+	return sparse.csr_matrix(
+		(counts.data / sizes[rows], counts.indices, counts.indptr), shape=counts.shape)
+
+
+def set_sizes(sets):
+	"""Returns the length of each set as an array."""
+	return np.fromiter((len(s) for s in sets), np.int64, len(sets))
+
+
+def divide(num, den):
+	"""Divides ``num`` by ``den`` element-wise, with 0 where ``den`` is 0."""
+	num, den = np.broadcast_arrays(num, den)
+	return np.divide(num, den, out=np.zeros(num.shape), where=den != 0)
+
+
+def to_dense(matrix):
+	"""Returns ``matrix``, dense or sparse, as a :class:`numpy.ndarray`."""
+	return matrix.toarray() if sparse.issparse(matrix) else np.asarray(matrix)
+
+
+def select_columns(mask, matrix, other):
+	"""Returns a matrix with the columns of ``matrix`` where ``mask`` is True and
+	the ones of ``other`` elsewhere. The result is sparse when both matrices are.
+
+	:param mask: A boolean value for each column.
+	:type mask: numpy.ndarray
+	:param matrix: A score matrix, dense or sparse.
+	:type matrix: numpy.ndarray or scipy.sparse.spmatrix
+	:param other: A score matrix, dense or sparse.
+	:type other: numpy.ndarray or scipy.sparse.spmatrix
+	:rtype: numpy.ndarray or scipy.sparse.csr_matrix
+	"""
+	if sparse.issparse(matrix) and sparse.issparse(other):
+		keep = sparse.diags(mask.astype(matrix.dtype), dtype=matrix.dtype)
+		drop = sparse.diags((~mask).astype(other.dtype), dtype=other.dtype)
+		return (matrix @ keep + other @ drop).tocsr()
+
+	return np.where(mask[None, :], to_dense(matrix), to_dense(other))
+
+
+def cosine_sims(en_vecs, l2_vecs):
+	"""Returns the matrix of cosine similarities, scaled to [0, 1] as in
+	:func:`fnalign.alignment.vector.cosine_sim`, between the rows of
+	``en_vecs`` and ``l2_vecs``.
+
+	:param en_vecs: English vectors.
+	:type en_vecs: numpy.ndarray
+	:param l2_vecs: L2 vectors.
+	:type l2_vecs: numpy.ndarray
+	:rtype: numpy.ndarray
+	"""
+	en_vecs = np.asarray(en_vecs, dtype=np.float64)
+	l2_vecs = np.asarray(l2_vecs, dtype=np.float64)
+
+	with np.errstate(divide='ignore', invalid='ignore'):
+		en_norm = en_vecs / np.linalg.norm(en_vecs, axis=1, keepdims=True)
+		l2_norm = l2_vecs / np.linalg.norm(l2_vecs, axis=1, keepdims=True)
+
+	return (1 + en_norm @ l2_norm.T) / 2
+
+
+def top_k(matrix, k, threshold=None):
+	"""Returns a sparse copy of a score matrix with, for each english frame, its
+	``k`` greatest scores and, for each l2 frame, its ``k`` greatest scores, plus
+	every score of at least ``threshold``. Scores of 0 are never kept.
+
+	Dense matrices are pruned with partial sorts along each axis. Sparse ones
+	only have their non-zero scores sorted, grouped by row and by column.
+
+	:param matrix: A score matrix, dense or sparse.
+	:type matrix: numpy.ndarray or scipy.sparse.spmatrix
+	:param k: Number of scores kept for each frame.
+	:type k: int
+	:param threshold: Scores at least as high are kept regardless of ``k``.
+	:type threshold: float
+	:rtype: scipy.sparse.csr_matrix
+	"""
+	if k < 0:
+		raise ValueError(f'k must not be negative, got {k}')
+
+	if sparse.issparse(matrix):
+		matrix = matrix.tocoo()
+		rows, cols, values = matrix.row, matrix.col, matrix.data
+		keep = _group_top_k(rows, values, k) | _group_top_k(cols, values, k)
+		if threshold is not None:
+			keep |= values >= threshold
+		keep &= values > 0
+		rows, cols, values = rows[keep], cols[keep], values[keep]
+	else:
+		matrix = np.asarray(matrix)
+		keep = np.zeros(matrix.shape, dtype=bool)
+		for axis in (0, 1):
+			_mark_top_k(keep, matrix, k, axis)
+		if threshold is not None:
+			keep |= matrix >= threshold
+		keep &= matrix > 0
+		rows, cols = np.nonzero(keep)
+		values = matrix[rows, cols]
+
+	return sparse.csr_matrix((values, (rows, cols)), shape=matrix.shape)
+
+
+def _mark_top_k(keep, values, k, axis):
+	"""Sets ``keep`` to True at the ``k`` greatest ``values`` along ``axis``."""
+	size = values.shape[axis]
+
+	if k >= size:
+		keep[...] = True
+	elif k > 0:
+		# Negated so that the k smallest, placed first, are the k greatest
+		top = np.argpartition(-values, k - 1, axis=axis)
+		top = top[:k] if axis == 0 else top[:, :k]
+		np.put_along_axis(keep, top, True, axis=axis)
+
+
+def _group_top_k(groups, values, k):
+	"""Returns a mask of the ``k`` greatest ``values`` of each group."""
+	order = np.lexsort((-values, groups))
+	sorted_groups = groups[order]
+	rank = np.arange(len(order)) - np.searchsorted(sorted_groups, sorted_groups)
+
+	keep = np.zeros(len(order), dtype=bool)
+	keep[order] = rank < k
+
+	return keep
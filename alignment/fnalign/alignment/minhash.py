@@ -0,0 +1,213 @@
+"""This module contains a MinHash and LSH index that finds the frame pairs
+whose sets, e.g., of core FE names, have a Jaccard similarity of at least a
+threshold without scoring every pair.
+
+Each set gets a signature of :data:`NUM_PERM` minimum hashes, where two
+signatures agree in each position with probability equal to the Jaccard
+similarity of their sets. Signatures are split in bands of rows and two frames
+are candidates when all rows of any band are equal, which is found by hashing
+the bands. The number of bands is chosen by :func:`bands` so that pairs above
+the threshold are candidates with a probability of :data:`MIN_RECALL`, and
+candidates are scored exactly, so the result has no false positives but may
+miss a few pairs. Both steps take time linear in the number of frames and
+candidates.
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import zlib
+import numpy as np
+from scipy import sparse
+
+from fnalign.alignment.matrix import incidence, set_sizes
+
+NUM_PERM = 128
+
+# Mersenne prime modulus of the hash functions
+PRIME = (1 << 61) - 1
+
+# Minimum probability that a pair with a similarity equal to the threshold is
+# a candidate. Candidates are scored exactly, so extra ones only cost time.
+MIN_RECALL = 0.99
+
+
+def bands(threshold, num_perm=NUM_PERM, min_recall=MIN_RECALL):
+	r"""Chooses the number of bands and of rows per band of signatures with
+	``num_perm`` hashes. Two sets of similarity *s* are candidates with
+	probability 1 - (1 - *s*\ :sup:`rows`)\ :sup:`bands`, so the most rows,
+	i.e., the fewest candidates below ``threshold``, are chosen for which
+	pairs above ``threshold`` are candidates with probability ``min_recall``.
+
+	:param threshold: The Jaccard threshold.
+	:type threshold: float
+	:param num_perm: Number of hashes of signatures.
+	:type num_perm: int
+	:param min_recall: The probability of a pair above the threshold being a
+		candidate.
+	:type min_recall: float
+	:returns: The numbers of bands and rows.
+	:rtype: tuple(int, int)
+	"""
+	for rows in range(num_perm, 1, -1):
+		n_bands = num_perm // rows
+		if 1 - (1 - threshold ** rows) ** n_bands >= min_recall:
+			return n_bands, rows
+
+	return num_perm, 1
+
+
+def item_hashes(items):
+	"""Returns a 32 bits hash of each item that is the same in every run."""
+	return np.fromiter(
+		(zlib.crc32(str(item).encode('utf-8')) for item in items), np.uint64, len(items))
+
+
+def signatures(sets, num_perm=NUM_PERM, seed=0):
+	"""Computes the MinHash signature of each set. Signatures computed with the
+	same ``num_perm`` and ``seed`` can be compared.
+
+	:param sets: A sequence of sets.
+	:type sets: Sequence[set]
+	:param num_perm: Number of hashes of signatures.
+	:type num_perm: int
+	:param seed: Seed of the hash functions.
+	:type seed: int
+	:returns: A row of ``num_perm`` hashes for each set. Rows of empty sets are
+		all equal to :data:`PRIME`.
+	:rtype: numpy.ndarray
+	"""
+	rng = np.random.RandomState(seed)
+	# a * x + b fits in 64 bits for 32 bits items
+	a = rng.randint(1, 1 << 31, size=num_perm).astype(np.uint64)
+	b = rng.randint(0, 1 << 61, size=num_perm, dtype=np.int64).astype(np.uint64)
+
+	sizes = set_sizes(sets)
+	sigs = np.full((len(sets), num_perm), PRIME, dtype=np.uint64)
+	nonempty = np.flatnonzero(sizes)
+
+	if len(nonempty):
+		# Items are shared by many sets, so each one is hashed once
+		codes = {}
+		positions = np.fromiter(
+			(codes.setdefault(item, len(codes)) for i in nonempty for item in sets[i]),
+			np.int64, sizes.sum())
+		hashes = item_hashes(list(codes))
+		values = (hashes[:, None] * a[None, :] + b[None, :]) % np.uint64(PRIME)
+		starts = np.concatenate([[0], np.cumsum(sizes[nonempty])[:-1]])
+		sigs[nonempty] = np.minimum.reduceat(values[positions], starts, axis=0)
+
+	return sigs
+
+
+def band_hashes(sigs, n_bands, rows, seed=0):
+	"""Hashes the rows of each band of ``sigs`` to a single 64 bits value.
+
+	:returns: A column of hashes for each band.
+	:rtype: numpy.ndarray
+	"""
+	weights = np.random.RandomState(seed).randint(1, 1 << 62, size=rows, dtype=np.int64).astype(np.uint64)
+	band_sigs = sigs[:, :n_bands * rows].reshape(len(sigs), n_bands, rows)
+	# Overflow wraps around, which keeps the hash well mixed
+	return (band_sigs * weights).sum(axis=2, dtype=np.uint64)
+
+
+def candidates(en_sigs, l2_sigs, n_bands, rows):
+	"""Returns the pairs of english and l2 signatures that are equal in all
+	rows of at least one band.
+
+	Band hashes of english signatures are sorted, and each l2 hash is looked up
+	in them by binary search. Pairs whose band hashes collide are candidates as
+	well, but they are rare and removed when candidates are scored.
+
+	:param en_sigs: The signatures of english sets.
+	:type en_sigs: numpy.ndarray
+	:param l2_sigs: The signatures of l2 sets.
+	:type l2_sigs: numpy.ndarray
+	:param n_bands: Number of bands.
+	:type n_bands: int
+	:param rows: Number of rows per band.
+	:type rows: int
+	:returns: The rows and columns of the candidate pairs, without repetitions.
+	:rtype: tuple(numpy.ndarray, numpy.ndarray)
+	"""
+	# Empty sets are similar to nothing
+	en_valid = np.flatnonzero(en_sigs[:, 0] != PRIME)
+	l2_valid = np.flatnonzero(l2_sigs[:, 0] != PRIME)
+	en_hashes = band_hashes(en_sigs[en_valid], n_bands, rows)
+	l2_hashes = band_hashes(l2_sigs[l2_valid], n_bands, rows)
+	pairs = []
+
+	for band in range(n_bands):
+		order = np.argsort(en_hashes[:, band], kind='stable')
+		sorted_hashes = en_hashes[order, band]
+		start = np.searchsorted(sorted_hashes, l2_hashes[:, band], side='left')
+		end = np.searchsorted(sorted_hashes, l2_hashes[:, band], side='right')
+
+		# Each l2 signature is paired with every english one in its bucket
+		counts = end - start
+		cols = np.repeat(l2_valid, counts)
+		offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+		rows_ = en_valid[order[np.repeat(start, counts) + offsets]]
+		pairs.append(rows_.astype(np.int64) * len(l2_sigs) + cols)
+
+	pairs = np.sort(np.concatenate(pairs))
+	pairs = pairs[np.concatenate([pairs[:1] == pairs[:1], pairs[1:] != pairs[:-1]])]
+
+	return pairs // len(l2_sigs), pairs % len(l2_sigs)
+
+
+def distinct_sets(sets):
+	"""Returns the distinct sets of ``sets`` and a sparse matrix with a row for
+	each set and a 1 in the column of its distinct set.
+
+	:rtype: tuple(list[frozenset], scipy.sparse.csr_matrix)
+	"""
+	codes = {}
+	cols = np.fromiter((codes.setdefault(frozenset(s), len(codes)) for s in sets), np.int64, len(sets))
+	groups = sparse.csr_matrix(
+		(np.ones(len(sets)), cols, np.arange(len(sets) + 1)), shape=(len(sets), len(codes)))
+
+	return list(codes), groups
+
+
+def similar_pairs(en_sets, l2_sets, threshold, num_perm=NUM_PERM, seed=0):
+	"""Returns the Jaccard similarity of the pairs of english and l2 sets found
+	by LSH with a similarity of at least ``threshold``, which are the same as
+	:func:`fnalign.alignment.matrix.overlap_scores` above ``threshold`` except
+	for the pairs LSH misses.
+
+	Many frames have the same set, e.g., of core FEs, so LSH runs on distinct
+	sets and their scores are then given to every pair of frames with them.
+
+	:param en_sets: The set of each english frame.
+	:type en_sets: Sequence[set]
+	:param l2_sets: The set of each l2 frame.
+	:type l2_sets: Sequence[set]
+	:param threshold: The Jaccard threshold, greater than 0.
+	:type threshold: float
+	:param num_perm: Number of hashes of signatures.
+	:type num_perm: int
+	:param seed: Seed of the hash functions.
+	:type seed: int
+	:rtype: scipy.sparse.csr_matrix
+	"""
+	en_sets, en_groups = distinct_sets(en_sets)
+	l2_sets, l2_groups = distinct_sets(l2_sets)
+
+	n_bands, rows = bands(threshold, num_perm)
+	en_sigs = signatures(en_sets, num_perm, seed)
+	l2_sigs = signatures(l2_sets, num_perm, seed)
+	cand_rows, cand_cols = candidates(en_sigs, l2_sigs, n_bands, rows)
+
+	# Intersections of candidates only, as the row-wise product of incidences
+	en, l2 = incidence(en_sets, l2_sets)
+	inter = np.asarray(en[cand_rows].multiply(l2[cand_cols]).sum(axis=1)).ravel()
+	union = set_sizes(en_sets)[cand_rows] + set_sizes(l2_sets)[cand_cols] - inter
+	scores = inter / union
+
+	keep = scores >= threshold
+	scores = sparse.csr_matrix(
+		(scores[keep], (cand_rows[keep], cand_cols[keep])), shape=(len(en_sets), len(l2_sets)))
+
+	# Each frame pair gets the only score of its pair of distinct sets
+	return (en_groups @ scores @ l2_groups.T).tocsr()
@@ -2,6 +2,9 @@
 MUSE (Multilingual Unsupervised and Supervised Embeddings) and BERT
 (Bidirectional Encoder Representations from Transformers).
 
+Techniques compute score matrices at once from stacked frame and FE vectors.
+With ``vectorized=False`` they iterate over :func:`Alignment.pairs` instead.
+
 .. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
 """
 import io
@@ -11,12 +14,17 @@ import itertools
 from collections import defaultdict
 import numpy as np
 from scipy.stats import rankdata
+from scipy import sparse
 from scipy.spatial.distance import cosine
 
 from ..embeddings import SearchIndex
+from .matrix import overlap_counts, match_ratios, set_sizes, divide, cosine_sims, select_columns
 
 FE_SPECIAL_CHAR_RE = re.compile(r'[\[\]\(\)\/\-\*\'\.\?!\d:",;_]')
 
+# Maximum number of FE pairs whose similarities are held in memory at once
+FE_BLOCK_SIZE = 2**22
+
 def cosine_sim(a, b):
 	"""Computes the cosine sim between two vectors.
 
@@ -27,7 +35,7 @@ def cosine_sim(a, b):
 	"""
 	return (2 - cosine(a, b)) / 2
 
-def lu_scores(alignment, lu_vecs, K, thres):
+def lu_scores(alignment, lu_vecs, K, thres, vectorized=True):
 	"""Given ``alignemnt`` and ``lu_vecs``, uses ``K`` and ``thres`` to determine
 	the neighborhood of each LU and and computes the score of each frame pair
 	based on the count of LUs that have any of its neighbors on the second frame.
@@ -42,6 +50,10 @@ def lu_scores(alignment, lu_vecs, K, thres):
 	:type K: int
 	:param thres: A distance threshold to consider vectors as neighbors.
 	:type thres: float
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
+	:returns: The score matrix, or a score list if not ``vectorized``.
+	:rtype: scipy.sparse.csr_matrix or list[float]
 	"""
 	# Computing frame vectors based on nearest neighbors filters
 	vec_sets = {
@@ -50,13 +62,18 @@ def lu_scores(alignment, lu_vecs, K, thres):
 	}
 
 	frm_vecs = defaultdict(set)
+	lu_frames = alignment.l2_fn.index('lu_frame')
 
 	# L2 LUs will have a single vector in lu_vecs 
-	for _, row in alignment.l2_frm.iterrows():
-		frame = row["obj"]
-		for lu in frame.lus:
-			if lu.gid in vec_sets:
-				frm_vecs[frame.gid].update(vec_sets[lu.gid])
+	for gid, vecs in vec_sets.items():
+		if gid in lu_frames:
+			frm_vecs[lu_frames[gid].gid].update(vecs)
+
+	if vectorized:
+		en_lus = [[vec_sets.get(lu.gid, ()) for lu in frm.lus] for frm in alignment.en_frm["obj"]]
+		l2_vecs = [frm_vecs[frm.gid] for frm in alignment.l2_frm["obj"]]
+
+		return match_ratios(en_lus, l2_vecs)
 
 	# Scoring
 	scores = []
@@ -141,6 +158,148 @@ def set_fe_vecs(alignment, en_emb, l2_emb, name_vecs=False):
 		alignment.resources["fe_name_vecs"] = name_vecs
 
 
+def frame_sims(alignment, frm_vecs):
+	"""Computes the matrix of cosine similarities between english and l2 frames
+	vectors. Pairs where a frame has no vector have score 0.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`Alignment`
+	:param frm_vecs: Frame vectors by frame gid.
+	:type frm_vecs: dict[str, numpy.ndarray]
+	:returns: The score matrix.
+	:rtype: numpy.ndarray
+	"""
+	scores = np.zeros(alignment.shape)
+	rows = [i for gid, i in alignment.en_pos.items() if gid in frm_vecs]
+	cols = [j for gid, j in alignment.l2_pos.items() if gid in frm_vecs]
+
+	if rows and cols:
+		scores[np.ix_(rows, cols)] = cosine_sims(
+			[frm_vecs[gid] for gid in alignment.en_frm.index[rows]],
+			[frm_vecs[gid] for gid in alignment.l2_frm.index[cols]])
+
+	return scores
+
+
+def fe_vecs_by_name(frames, vecs):
+	"""Groups the FE vectors of ``frames`` by FE name.
+
+	:param frames: Frame objects.
+	:type frames: Iterable[:class:`Frame`]
+	:param vecs: FE vectors dictionary.
+	:type vecs: dict
+	:returns: A mapping of FE names to the position of the frames with that FE
+		and the FE vector in each one.
+	:rtype: dict[str, tuple(list[int], list[numpy.ndarray])]
+	"""
+	by_name = defaultdict(lambda: ([], []))
+
+	for i, frm in enumerate(frames):
+		for name, vec in vecs[frm.gid].items():
+			by_name[name][0].append(i)
+			by_name[name][1].append(vec)
+
+	return by_name
+
+
+def exact_fe_scores(alignment, def_vecs):
+	"""Computes the matrix of :func:`exact_fe_score` for all frame pairs of
+	``alignment``. Each FE name shared by both sides adds the similarities of
+	its definitions to the pairs of frames that have it.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`Alignment`
+	:param def_vecs: FE definition vectors dictionary.
+	:type def_vecs: dict
+	:returns: The score matrix.
+	:rtype: numpy.ndarray
+	"""
+	en_frames, l2_frames = alignment.en_frm["obj"], alignment.l2_frm["obj"]
+	en_fes = [def_vecs[frm.gid].keys() for frm in en_frames]
+	l2_fes = [def_vecs[frm.gid].keys() for frm in l2_frames]
+
+	sims = np.zeros(alignment.shape)
+	l2_by_name = fe_vecs_by_name(l2_frames, def_vecs)
+
+	for name, (rows, en_vecs) in fe_vecs_by_name(en_frames, def_vecs).items():
+		if name in l2_by_name:
+			cols, l2_vecs = l2_by_name[name]
+			sims[np.ix_(rows, cols)] += cosine_sims(en_vecs, l2_vecs)
+
+	inter = overlap_counts(en_fes, l2_fes)
+	union = set_sizes(en_fes)[:, None] + set_sizes(l2_fes)[None, :] - inter
+
+	return divide(sims, union)
+
+
+def stack_fes(frames, def_vecs, name_vecs):
+	"""Stacks the definition and name vectors of FEs of ``frames`` that have
+	both.
+
+	:param frames: Frame objects.
+	:type frames: Sequence[:class:`Frame`]
+	:param def_vecs: FE definition vectors dictionary.
+	:type def_vecs: dict
+	:param name_vecs: FE name vectors dictionary.
+	:type name_vecs: dict
+	:returns: The definition and name vectors and a sparse matrix with a row for
+		each frame and a column for each FE, which is 1 where the FE belongs to the
+		frame.
+	:rtype: tuple(numpy.ndarray, numpy.ndarray, scipy.sparse.csr_matrix)
+	"""
+	defs, names, owners = [], [], []
+
+	for i, frm in enumerate(frames):
+		frm_defs, frm_names = def_vecs[frm.gid], name_vecs[frm.gid]
+		for fe in frm_defs.keys() & frm_names.keys():
+			defs.append(frm_defs[fe])
+			names.append(frm_names[fe])
+			owners.append(i)
+
+	members = sparse.csr_matrix(
+		(np.ones(len(owners)), (owners, np.arange(len(owners)))),
+		shape=(len(frames), len(owners)))
+
+	return np.array(defs), np.array(names), members
+
+
+def fe_scores(alignment, def_vecs, name_vecs):
+	"""Computes the matrix of :func:`fe_score` for all frame pairs of
+	``alignment``. Similarities of all pairs of english and l2 FEs are computed
+	in blocks of english FEs and summed up by frame pair.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`Alignment`
+	:param def_vecs: FE definition vectors dictionary.
+	:type def_vecs: dict
+	:param name_vecs: FE name vectors dictionary.
+	:type name_vecs: dict
+	:returns: The score matrix.
+	:rtype: numpy.ndarray
+	"""
+	en_defs, en_names, en_members = stack_fes(alignment.en_frm["obj"], def_vecs, name_vecs)
+	l2_defs, l2_names, l2_members = stack_fes(alignment.l2_frm["obj"], def_vecs, name_vecs)
+
+	sums = np.zeros(alignment.shape)
+
+	if len(en_defs) == 0 or len(l2_defs) == 0:
+		return sums
+
+	en_members = en_members.tocsc()
+	step = max(1, FE_BLOCK_SIZE // len(l2_defs))
+
+	for start in range(0, len(en_defs), step):
+		end = min(start + step, len(en_defs))
+		sims = cosine_sims(en_names[start:end], l2_names) * cosine_sims(en_defs[start:end], l2_defs)
+		# (frames × block FEs) · (block FEs × l2 FEs) · (l2 FEs × l2 frames)
+		sums += en_members[:, start:end] @ (l2_members @ sims.T).T
+
+	en_count = np.asarray(en_members.sum(axis=1)).ravel()
+	l2_count = np.asarray(l2_members.sum(axis=1)).ravel()
+
+	return divide(sums, en_count[:, None] * l2_count[None, :])
+
+
 def exact_fe_score(frame, other, def_vecs):
 	"""Computes the alignment score between ``frame`` and ``other`` considering
 	exact frame matches weighted by the cosine similarity of their definitions.
@@ -202,7 +361,7 @@ def fe_score(frame, other, def_vecs, name_vecs):
 	return sum(sims)/len(sims)
 
 
-def lu_bert_matching(alignment, en_emb, l2_emb, scoring_configs):
+def lu_bert_matching(alignment, en_emb, l2_emb, scoring_configs, vectorized=True):
 	"""Computes scores of each pair of frames on the alignment based on two
 	different aligned BERT word embeddings.
 
@@ -224,6 +383,8 @@ def lu_bert_matching(alignment, en_emb, l2_emb, scoring_configs):
 		A list of scoring config tuples containing a int value for K and a float
 		value for threshold.
 	:type scoring_configs: list(tuple(int, float))
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	K = max(c[0] for c in scoring_configs)
 
@@ -236,13 +397,13 @@ def lu_bert_matching(alignment, en_emb, l2_emb, scoring_configs):
 	# Including NN in l2 space of english LUs
 	lu_nn = {}
 
-	for _, row in alignment.l2_frm.iterrows():
-		for lu in row["obj"].lus:
+	for frame in alignment.l2_frm["obj"]:
+		for lu in frame.lus:
 			if lu.id in search_idx.word2id:
 				lu_nn[lu.gid] = [(1, search_idx.word2id[lu.id])]
 
-	for _, row in alignment.en_frm.iterrows():
-		for lu in row["obj"].lus:
+	for frame in alignment.en_frm["obj"]:
+		for lu in frame.lus:
 			vec = en_emb.get_word_emb(lu.id)
 			if vec is not None:
 				lu_nn[lu.gid] = list(zip(*search_idx.get_knn(vec, K=K)))
@@ -251,11 +412,11 @@ def lu_bert_matching(alignment, en_emb, l2_emb, scoring_configs):
 	alignment.resources['id2word_bert'] = {int(i):search_idx.id2word[i] for k,v in lu_nn.items() for d, i in v}
 
 	if len(scoring_configs) == 1:
-		scores = lu_scores(alignment, lu_nn, scoring_configs[0][0], scoring_configs[0][1])
+		scores = lu_scores(alignment, lu_nn, scoring_configs[0][0], scoring_configs[0][1], vectorized)
 		alignment.add_scores(f'lu_bert', f'lu_bert', scores, desc='LU similarity using BERT annotation vectors')
 	else:
 		for c in scoring_configs:
-			scores = lu_scores(alignment, lu_nn, c[0], c[1])
+			scores = lu_scores(alignment, lu_nn, c[0], c[1], vectorized)
 			alignment.add_scores(
 				f'lu_bert_{c[0]}_{c[1]}', f'lu_bert', scores,
 				desc=f'LU similarity using BERT annotation vectors (K={c[0]}, Threshold={c[1]})',
@@ -263,7 +424,7 @@ def lu_bert_matching(alignment, en_emb, l2_emb, scoring_configs):
 
 
 
-def lu_muse_matching(alignment, en_emb, l2_emb, scoring_configs):
+def lu_muse_matching(alignment, en_emb, l2_emb, scoring_configs, vectorized=True):
 	"""Computes scores of each pair of frames on the alignment based on two
 	different MUSE word embeddings.
 
@@ -285,6 +446,8 @@ def lu_muse_matching(alignment, en_emb, l2_emb, scoring_configs):
 		A list of scoring config tuples containing a int value for K and a float
 		value for threshold.
 	:type scoring_configs: list(tuple(int, float))
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	K = max(c[0] for c in scoring_configs)
 
@@ -292,8 +455,8 @@ def lu_muse_matching(alignment, en_emb, l2_emb, scoring_configs):
 	inf_vecs = []
 	inf_words = []
 
-	for _, row in alignment.l2_frm.iterrows():
-		for lu in row["obj"].lus:
+	for frame in alignment.l2_frm["obj"]:
+		for lu in frame.lus:
 			if lu.clean_name not in l2_emb.word2id:
 				vec = l2_emb.infer_vector(lu.clean_name)
 				if vec is not None:
@@ -319,13 +482,13 @@ def lu_muse_matching(alignment, en_emb, l2_emb, scoring_configs):
 	# Including NN in l2 space of english LUs
 	lu_nn = {}
 
-	for _, row in alignment.l2_frm.iterrows():
-		for lu in row["obj"].lus:
+	for frame in alignment.l2_frm["obj"]:
+		for lu in frame.lus:
 			if lu.clean_name in search_idx.word2id:
 				lu_nn[lu.gid] = [(1, search_idx.word2id[lu.clean_name])]
 
-	for _, row in alignment.en_frm.iterrows():
-		for lu in row["obj"].lus:
+	for frame in alignment.en_frm["obj"]:
+		for lu in frame.lus:
 			vec = en_emb.infer_vector(lu.clean_name)
 			if vec is not None:
 				lu_nn[lu.gid] = list(zip(*search_idx.get_knn(vec, K=K)))
@@ -334,18 +497,18 @@ def lu_muse_matching(alignment, en_emb, l2_emb, scoring_configs):
 	alignment.resources['id2word_muse'] = {int(i):search_idx.id2word[i] for k,v in lu_nn.items() for d, i in v}
 
 	if len(scoring_configs) == 1:
-		scores = lu_scores(alignment, lu_nn, scoring_configs[0][0], scoring_configs[0][1])
+		scores = lu_scores(alignment, lu_nn, scoring_configs[0][0], scoring_configs[0][1], vectorized)
 		alignment.add_scores(f'lu_muse', f'lu_muse', scores, desc='LU translations using MUSE')
 	else:
 		for c in scoring_configs:
-			scores = lu_scores(alignment, lu_nn, c[0], c[1])
+			scores = lu_scores(alignment, lu_nn, c[0], c[1], vectorized)
 			alignment.add_scores(
 				f'lu_muse_{c[0]}_{c[1]}', f'lu_muse', scores,
 				desc=f'LU translations using MUSE (K={c[0]}, Threshold={c[1]})',
 				K=c[0], threshold=c[1])
 
 
-def lu_mean_matching(alignment, en_emb, l2_emb, name='muse'):
+def lu_mean_matching(alignment, en_emb, l2_emb, name='muse', vectorized=True):
 	"""Computes scores of each pair of frames on the alignment based on
 	multilingual fastText vectors aligned using MUSE or BERT.
 
@@ -360,6 +523,8 @@ def lu_mean_matching(alignment, en_emb, l2_emb, name='muse'):
 	:type l2_emb: :class:`WordEmbedding`
 	:param name: The name of the embedding type.
 	:type name: str
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	frm_mean_vecs = {}
 	if name == 'muse':
@@ -367,8 +532,7 @@ def lu_mean_matching(alignment, en_emb, l2_emb, name='muse'):
 	else:
 		infer_func = lambda lu: emb.get_word_emb(lu.id)
 
-	for _, row in alignment.frm.iterrows():
-		frm = row["obj"]
+	for frm in alignment.frm["obj"]:
 		emb = en_emb if frm.lang == "en" else l2_emb
 		lu_vecs = (infer_func(lu) for lu in frm.lus)
 		lu_vecs = [v for v in lu_vecs if v is not None]
@@ -376,17 +540,20 @@ def lu_mean_matching(alignment, en_emb, l2_emb, name='muse'):
 			frm_mean_vecs[frm.gid] = np.mean(lu_vecs, axis=0)
 
 	# Scoring
-	scores = []
-	for frame, other in alignment.pairs():
-		if frame.gid in frm_mean_vecs and other.gid in frm_mean_vecs:
-			scores.append(cosine_sim(frm_mean_vecs[frame.gid], frm_mean_vecs[other.gid]))
-		else:
-			scores.append(0)
+	if vectorized:
+		scores = frame_sims(alignment, frm_mean_vecs)
+	else:
+		scores = []
+		for frame, other in alignment.pairs():
+			if frame.gid in frm_mean_vecs and other.gid in frm_mean_vecs:
+				scores.append(cosine_sim(frm_mean_vecs[frame.gid], frm_mean_vecs[other.gid]))
+			else:
+				scores.append(0)
 
 	alignment.add_scores(f'lu_mean_{name}', f'lu_mean_{name}', scores, desc=f'LU centroid similarity using {name.upper()}')
 
 
-def fe_exact_matching(alignment, en_emb, l2_emb):
+def fe_exact_matching(alignment, en_emb, l2_emb, vectorized=True):
 	"""Computes scores of each pair of frames on the alignment based on
 	multilingual fastText vectors aligned using Multilingual Unsupervised or
 	Supervised word Embeddings (MUSE).
@@ -400,21 +567,26 @@ def fe_exact_matching(alignment, en_emb, l2_emb):
 	:type en_emb: :class:`Embedding`
 	:param l2_emb: An :class:`Embedding`instance for l2.
 	:type l2_emb: :class:`Embedding`
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	set_fe_vecs(alignment, en_emb, l2_emb)
 	def_vecs = alignment.resources["fe_def_vecs"]
 
-	scores = [
-		exact_fe_score(frame, other, def_vecs)
-		for frame, other in alignment.pairs()
-	]
+	if vectorized:
+		scores = exact_fe_scores(alignment, def_vecs)
+	else:
+		scores = [
+			exact_fe_score(frame, other, def_vecs)
+			for frame, other in alignment.pairs()
+		]
 
 	alignment.add_scores(
 		'muse_exact_fe_match', 'muse_fe_matching', scores,
 		desc=f'Matching core FE weighted by definition MUSE similarities')
 
 
-def fe_matching(alignment, en_emb, l2_emb):
+def fe_matching(alignment, en_emb, l2_emb, vectorized=True):
 	"""Computes scores of each pair of frames on the alignment based on
 	multilingual fastText vectors aligned using Multilingual Unsupervised or
 	Supervised word Embeddings (MUSE).
@@ -429,22 +601,27 @@ def fe_matching(alignment, en_emb, l2_emb):
 	:type en_emb: :class:`Embedding`
 	:param l2_emb: An :class:`Embedding`instance for l2.
 	:type l2_emb: :class:`Embedding`
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	set_fe_vecs(alignment, en_emb, l2_emb, name_vecs=True)
 	def_vecs = alignment.resources["fe_def_vecs"]
 	name_vecs = alignment.resources["fe_name_vecs"]
 
-	scores = [
-		fe_score(frame, other, def_vecs, name_vecs)
-		for frame, other in alignment.pairs()
-	]
+	if vectorized:
+		scores = fe_scores(alignment, def_vecs, name_vecs)
+	else:
+		scores = [
+			fe_score(frame, other, def_vecs, name_vecs)
+			for frame, other in alignment.pairs()
+		]
 
 	alignment.add_scores(
 		'muse_fe_match', 'muse_fe_matching', scores,
 		desc=f'Average core FE name and definition MUSE similarities')
 
 
-def fe_mixed_matching(alignment):
+def fe_mixed_matching(alignment, vectorized=True):
 	"""Merges the scores of the ``muse_fe_match`` and ``muse_exact_fe_match``
 	techniques into a new score using the values from exact matches for FEs in
 	english and the average for FEs in l2. This scoring should be used when the
@@ -456,14 +633,20 @@ def fe_mixed_matching(alignment):
 	:type en_emb: :class:`Embedding`
 	:param l2_emb: An :class:`Embedding`instance for l2.
 	:type l2_emb: :class:`Embedding`
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	average = next(s for s in alignment.scores if s["id"] == "muse_fe_match")
 	exact = next(s for s in alignment.scores if s["id"] == "muse_exact_fe_match")
 
-	scores = [
-		(exact if other.fe_lang == "en" else average)["df"].loc[frame.name, other.name]
-		for frame, other in alignment.pairs()
-	]
+	if vectorized:
+		_, en_fes = alignment.frame_values(lambda frm: frm.fe_lang == "en", bool)
+		scores = select_columns(en_fes, exact["matrix"], average["matrix"])
+	else:
+		scores = [
+			(exact if other.fe_lang == "en" else average)["matrix"][alignment.en_pos[frame.gid], alignment.l2_pos[other.gid]]
+			for frame, other in alignment.pairs()
+		]
 
 	alignment.add_scores(
 		'muse_mixed_fe_match', 'muse_fe_matching', scores,
@@ -471,7 +654,7 @@ def fe_mixed_matching(alignment):
 		normalize=False)
 
 
-def def_matching(alignment, en_emb, l2_emb):
+def def_matching(alignment, en_emb, l2_emb, vectorized=True):
 	"""Computes scores of each pair of frames on the alignment based on
 	multilingual fastText vectors aligned using Multilingual Unsupervised or
 
@@ -484,11 +667,12 @@ def def_matching(alignment, en_emb, l2_emb):
 	:type en_emb: :class:`Embedding`
 	:param l2_emb: An :class:`Embedding`instance for l2.
 	:type l2_emb: :class:`Embedding`
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	frm_def_vecs = {}
 
-	for _, row in alignment.frm.iterrows():
-		frm = row["obj"]
+	for frm in alignment.frm["obj"]:
 		emb = en_emb if frm.lang == "en" else l2_emb
 
 		if frm.definition:
@@ -496,11 +680,14 @@ def def_matching(alignment, en_emb, l2_emb):
 			if vec is not None:
 				frm_def_vecs[frm.gid] = vec
 
-	scores = []
-	for frame, other in alignment.pairs():
-		if frame.gid in frm_def_vecs and other.gid in frm_def_vecs:
-			scores.append(cosine_sim(frm_def_vecs[frame.gid], frm_def_vecs[other.gid]))
-		else:
-			scores.append(0)
+	if vectorized:
+		scores = frame_sims(alignment, frm_def_vecs)
+	else:
+		scores = []
+		for frame, other in alignment.pairs():
+			if frame.gid in frm_def_vecs and other.gid in frm_def_vecs:
+				scores.append(cosine_sim(frm_def_vecs[frame.gid], frm_def_vecs[other.gid]))
+			else:
+				scores.append(0)
 
 	alignment.add_scores('frame_def_muse', 'frame_def_muse', scores, desc='Frame definition similarity using MUSE')
@@ -1,16 +1,20 @@
 """This module contains a collection of alignment algorithms that are based on
 Open Multilingual Wordnet.
 
+Techniques compute score matrices at once from per-frame synset sets. With
+``vectorized=False`` they iterate over :func:`Alignment.pairs` instead.
+
 .. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
 """
 
 import re
 import itertools
 from collections import defaultdict
-import numpy as np
 import pandas as pd
 from nltk.corpus import wordnet as wn
 
+from fnalign.alignment.matrix import overlap_scores, match_ratios
+
 FN_WN_POS_MAP = {
 	"a": "a",
 	"v": "v",
@@ -31,15 +35,18 @@ LANG_MAP = {
 }
 
 
-def get_mappings(frm_df):
+def get_mappings(fns):
 	"""Gets commonly used mappings, namely:
 	
 	* LU to Synset
 	* Synset to LU
 	* Frame to Synset
 
-	:param frm_df: A frame DataFrame.
-	:type frm_df: pandas.DataFrame
+	LUs are taken from the ``lu_lemma`` index of each FrameNet, so synsets are
+	searched once for all LUs with the same name and POS tag.
+
+	:param fns: The FrameNets whose frames are mapped.
+	:type fns: list[:class:`fnalign.models.FrameNet`]
 	:returns: Dictionary containing mappings.
 	:rtype: dict[str, defaultdict(set)]
 	"""
@@ -47,20 +54,30 @@ def get_mappings(frm_df):
 	syn_to_lu = defaultdict(set)
 	frm_to_syn = defaultdict(set)
 
-	for _, row in frm_df.iterrows():
-		frame = row['obj']
+	for fn in fns:
+		lu_frames = fn.index('lu_frame')
+
+		for (_, pos), lus in fn.index('lu_lemma').items():
+			wn_pos = FN_WN_POS_MAP[pos] if pos in FN_WN_POS_MAP else None
+			lemma_syns = {}
 
-		for lu in frame.lus:
-			lemma = re.sub(r'\s?[^\w&\s&\-].*', '', lu.name)
-			pos = FN_WN_POS_MAP[lu.pos] if lu.pos in FN_WN_POS_MAP else None
+			for lu in lus:
+				frame = lu_frames[lu.gid]
+				lemma = re.sub(r'\s?[^\w&\s&\-].*', '', lu.name)
 
-			try:
-				for syn in wn.synsets(lemma, lang=LANG_MAP[frame.lang], pos=pos):
-					lu_to_syn[lu.gid].add(syn.name())
-					syn_to_lu[syn.name()].add(lu.name)
-					frm_to_syn[frame.gid].add(syn.name())
-			except:
-				print(f"Error searching for lemma synsets. Lemma={lemma}, POS={lu.pos}")
+				if (lemma, frame.lang) not in lemma_syns:
+					try:
+						lemma_syns[(lemma, frame.lang)] = [
+							syn.name() for syn in wn.synsets(lemma, lang=LANG_MAP[frame.lang], pos=wn_pos)
+						]
+					except:
+						print(f"Error searching for lemma synsets. Lemma={lemma}, POS={lu.pos}")
+						lemma_syns[(lemma, frame.lang)] = []
+
+				for syn in lemma_syns[(lemma, frame.lang)]:
+					lu_to_syn[lu.gid].add(syn)
+					syn_to_lu[syn].add(lu.name)
+					frm_to_syn[frame.gid].add(syn)
 
 	return { 
 		"lu_to_syn": lu_to_syn,
@@ -102,11 +119,11 @@ def set_resources(alignment):
 	:type alignment: :class:`Alignment`
 	"""
 	if 'lu_to_syn' not in alignment.resources:
-		alignment.resources.update(get_mappings(alignment.frm))
+		alignment.resources.update(get_mappings([alignment.en_fn, alignment.l2_fn]))
 		alignment.resources['syn_data'] = get_synsets(alignment)
 
 
-def synset_matching(alignment):
+def synset_matching(alignment, vectorized=True):
 	r"""Computes scores between each pair of frames on the alignment based on
 	synsets associated to the frames.
 	
@@ -121,21 +138,27 @@ def synset_matching(alignment):
 
 	:param alignment: An :class:`Alignment` instance.
 	:type alignment: :class:`Alignment`
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	set_resources(alignment)
 	syn = alignment.resources["frm_to_syn"]
 
-	scores = []
-	scores_inv = []
-	for frame, other in alignment.pairs():
-		if len(syn[frame.gid]) == 0 or len(syn[other.gid]) == 0:
-			scores.append(0)
-			scores_inv.append(0)
-			continue
-
-		inter_len = len(syn[frame.gid] & syn[other.gid])
-		scores.append(inter_len/len(syn[frame.gid]))
-		scores_inv.append(inter_len/len(syn[other.gid]))
+	if vectorized:
+		scores, scores_inv = overlap_scores(
+			*alignment.frame_values(lambda frm: syn[frm.gid]), measures=["en", "l2"])
+	else:
+		scores = []
+		scores_inv = []
+		for frame, other in alignment.pairs():
+			if len(syn[frame.gid]) == 0 or len(syn[other.gid]) == 0:
+				scores.append(0)
+				scores_inv.append(0)
+				continue
+
+			inter_len = len(syn[frame.gid] & syn[other.gid])
+			scores.append(inter_len/len(syn[frame.gid]))
+			scores_inv.append(inter_len/len(syn[other.gid]))
 
 	alignment.add_scores(
 		'synset', 'synset', scores,
@@ -145,7 +168,7 @@ def synset_matching(alignment):
 		desc=f'Synset count {alignment.l2_fn.lang}→{alignment.en_fn.lang}')
 
 
-def lu_matching(alignment):
+def lu_matching(alignment, vectorized=True):
 	r"""Computes scores between each pair of frames on the alignment based on the
 	matching of LUs through synsets.
 
@@ -163,24 +186,35 @@ def lu_matching(alignment):
 
 	:param alignment: An :class:`Alignment` instance.
 	:type alignment: :class:`Alignment`
+	:param vectorized: If scores should be computed as a matrix.
+	:type vectorized: bool
 	"""
 	set_resources(alignment)
 	lu_to_syn = alignment.resources["lu_to_syn"]
 
-	scores = []
-	for frame, other in alignment.pairs():
-		if len(frame.lus) == 0:
-			scores.append(0)
-			continue
-
-		count = 0
-		for lu1 in frame.lus:
-			for lu2 in other.lus:
-				if lu_to_syn[lu1.gid] & lu_to_syn[lu2.gid]:
-					count += 1
-					break
-
-		scores.append(count/len(frame.lus))
+	if vectorized:
+		# A LU of x is matched if it shares a synset with any LU of y
+		en_lus = [[lu_to_syn.get(lu.gid, ()) for lu in frm.lus] for frm in alignment.en_frm["obj"]]
+		l2_syn = [
+			set().union(*(lu_to_syn.get(lu.gid, ()) for lu in frm.lus))
+			for frm in alignment.l2_frm["obj"]
+		]
+		scores = match_ratios(en_lus, l2_syn)
+	else:
+		scores = []
+		for frame, other in alignment.pairs():
+			if len(frame.lus) == 0:
+				scores.append(0)
+				continue
+
+			count = 0
+			for lu1 in frame.lus:
+				for lu2 in other.lus:
+					if lu_to_syn[lu1.gid] & lu_to_syn[lu2.gid]:
+						count += 1
+						break
+
+			scores.append(count/len(frame.lus))
 
 	alignment.add_scores(
 		'lu_wordnet', 'lu_wordnet', scores,
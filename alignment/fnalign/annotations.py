@@ -0,0 +1,298 @@
+"""This module contains the storage of LU annotated sentences. All annotations
+of a FrameNet are kept in a single :class:`AnnotationStore`:
+
+* Unique sentences are stored once, concatenated in a text buffer, and
+  :attr:`AnnotationStore.offsets` has the start of each one in it.
+* Annotations are rows of integer arrays with their sentence id and target
+  span (:attr:`AnnotationStore.sentence_ids` and :attr:`AnnotationStore.spans`).
+* The annotations of a LU are a contiguous range of rows, which is accessed
+  through an :class:`AnnotationView`.
+
+Sentences are added in batches, one per LU, and each batch is appended as a
+new text segment. :func:`AnnotationStore.compact` merges all segments into a
+single buffer.
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+from bisect import bisect_right
+import numpy as np
+
+
+def _grow(array, size):
+	"""Returns ``array`` or a larger copy of it with room for ``size`` rows."""
+	if size <= len(array):
+		return array
+
+	grown = np.empty((max(size, 2 * len(array)),) + array.shape[1:], dtype=array.dtype)
+	grown[:len(array)] = array
+	return grown
+
+
+class AnnotationStore:
+	"""A class used to store the annotated sentences of all LUs of a FrameNet.
+	Each annotation is the same dict that loaders return, i.e.,
+	``{"sentence": str, "lu_pos": (start, end)}``, but sentences shared by
+	annotations are stored only once.
+	"""
+
+	def __init__(self):
+		self._segments = []
+		self._segment_starts = []
+		self._pending = []
+		self._flushed = 0
+		self._length = 0
+		self._sentences = 0
+		self._offsets = np.zeros(1, dtype=np.int64)
+		self._annotations = 0
+		self._rows = np.empty((0, 3), dtype=np.int32)
+		self._index = {}
+
+	def __getstate__(self):
+		self.compact()
+		state = self.__dict__.copy()
+		state['_index'] = None
+		return state
+
+	def __len__(self):
+		return self._annotations
+
+	@property
+	def sentence_count(self):
+		"""The number of unique sentences.
+
+		:rtype: int
+		"""
+		return self._sentences
+
+	@property
+	def offsets(self):
+		"""The offsets of sentences in :attr:`text`. Sentence ``i`` spans from
+		``offsets[i]`` to ``offsets[i + 1]``.
+
+		:rtype: numpy.ndarray
+		"""
+		return self._offsets[:self._sentences + 1]
+
+	@property
+	def sentence_ids(self):
+		"""The sentence id of each annotation.
+
+		:rtype: numpy.ndarray
+		"""
+		return self._rows[:self._annotations, 0]
+
+	@property
+	def spans(self):
+		"""The target span, as (start, end) offsets in the sentence, of each
+		annotation.
+
+		:rtype: numpy.ndarray
+		"""
+		return self._rows[:self._annotations, 1:]
+
+	@property
+	def text(self):
+		"""The buffer with all sentences. Reading it compacts the store.
+
+		:rtype: str
+		"""
+		self.compact()
+		return self._segments[0] if self._segments else ""
+
+	def sentence(self, sid):
+		"""Returns the sentence with id ``sid``.
+
+		:param sid: The sentence id.
+		:type sid: int
+		:rtype: str
+		"""
+		if sid >= self._flushed:
+			return self._pending[sid - self._flushed]
+
+		start, end = int(self._offsets[sid]), int(self._offsets[sid + 1])
+		seg = bisect_right(self._segment_starts, start) - 1
+		local = start - self._segment_starts[seg]
+
+		return self._segments[seg][local:local + end - start]
+
+	def annotation(self, row):
+		"""Returns the annotation in ``row`` as a dict.
+
+		:param row: The annotation row.
+		:type row: int
+		:rtype: dict
+		"""
+		sid, start, end = self._rows[row].tolist()
+		return {"sentence": self.sentence(sid), "lu_pos": (start, end)}
+
+	def add_sentence(self, sentence):
+		"""Adds ``sentence`` to the store unless it is already there and returns
+		its id.
+
+		:param sentence: The sentence text.
+		:type sentence: str
+		:returns: The sentence id.
+		:rtype: int
+		"""
+		if self._index is None:
+			self._index = {}
+			for sid in reversed(range(self._sentences)):
+				self._index[hash(self.sentence(sid))] = sid
+
+		key = hash(sentence)
+		sid = self._index.get(key)
+
+		if sid is not None and self.sentence(sid) == sentence:
+			return sid
+
+		sid = self._sentences
+		self._pending.append(sentence)
+		self._length += len(sentence)
+		self._sentences += 1
+		self._offsets = _grow(self._offsets, self._sentences + 1)
+		self._offsets[self._sentences] = self._length
+		self._index.setdefault(key, sid)
+
+		return sid
+
+	def add(self, annotations):
+		"""Adds the annotations of a LU and returns the range of rows where they
+		were stored.
+
+		:param annotations: The annotations, as returned by loaders.
+		:type annotations: list[dict]
+		:returns: The first and last (exclusive) rows of the annotations.
+		:rtype: tuple(int, int)
+		"""
+		rows = [
+			(self.add_sentence(anno["sentence"]), anno["lu_pos"][0], anno["lu_pos"][1])
+			for anno in annotations
+		]
+		begin = self._annotations
+		self._annotations += len(rows)
+
+		if rows:
+			self._rows = _grow(self._rows, self._annotations)
+			self._rows[begin:self._annotations] = rows
+
+		self.flush()
+
+		return begin, self._annotations
+
+	def flush(self):
+		"""Appends sentences added since the last flush as a new text segment."""
+		if self._pending:
+			self._segment_starts.append(int(self._offsets[self._flushed]))
+			self._segments.append("".join(self._pending))
+			self._pending = []
+			self._flushed = self._sentences
+
+	def compact(self):
+		"""Merges all text segments into a single buffer and releases unused
+		array space. The index of known sentences is dropped as well and is built
+		again if more sentences are added.
+		"""
+		self.flush()
+
+		if len(self._segments) > 1:
+			self._segments = ["".join(self._segments)]
+			self._segment_starts = [0]
+
+		self._offsets = self._offsets[:self._sentences + 1].copy()
+		self._rows = self._rows[:self._annotations].copy()
+		self._index = None
+
+	def retain(self, ranges):
+		"""Keeps only the annotations in ``ranges`` and the sentences they use,
+		discarding all others, and compacts the store. Kept annotations are
+		stored in the order of ``ranges``.
+
+		:param ranges: The first and last (exclusive) rows of each range of
+			annotations to be kept, e.g., the ones of each LU.
+		:type ranges: Iterable[tuple(int, int)]
+		:returns: The new rows of each range.
+		:rtype: list[tuple(int, int)]
+		"""
+		self.compact()
+		ranges = list(ranges)
+		sizes = np.array([end - begin for begin, end in ranges], dtype=np.int64)
+		ends = np.cumsum(sizes)
+		rows = np.concatenate(
+			[np.arange(begin, end) for begin, end in ranges] + [np.empty(0, dtype=np.int64)])
+		rows = self._rows[rows]
+
+		# Sentences are renumbered in their current order
+		used = np.unique(rows[:, 0])
+		new_ids = np.zeros(self._sentences, dtype=self._rows.dtype)
+		new_ids[used] = np.arange(len(used))
+		rows[:, 0] = new_ids[rows[:, 0]]
+
+		text = self._segments[0] if self._segments else ""
+		lengths = np.diff(self._offsets)[used]
+		self._segments = ["".join(text[self._offsets[sid]:self._offsets[sid + 1]] for sid in used.tolist())]
+		self._segment_starts = [0]
+		self._offsets = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+		self._length = int(self._offsets[-1])
+		self._sentences = self._flushed = len(used)
+		self._rows = rows
+		self._annotations = len(rows)
+
+		return [(int(end - size), int(end)) for size, end in zip(sizes, ends)]
+
+
+class AnnotationView:
+	"""A read-only sequence of the annotations of a LU, which are rows
+	``begin`` to ``end`` of an :class:`AnnotationStore`. Items are the
+	annotation dicts.
+	"""
+
+	__slots__ = ('store', 'begin', 'end')
+
+	def __init__(self, store, begin, end):
+		self.store = store
+		self.begin = begin
+		self.end = end
+
+	def __len__(self):
+		return self.end - self.begin
+
+	def __iter__(self):
+		for row in range(self.begin, self.end):
+			yield self.store.annotation(row)
+
+	def __getitem__(self, i):
+		if isinstance(i, slice):
+			return [self.store.annotation(self.begin + r) for r in range(*i.indices(len(self)))]
+
+		if i < 0:
+			i += len(self)
+		if not 0 <= i < len(self):
+			raise IndexError('annotation index out of range')
+
+		return self.store.annotation(self.begin + i)
+
+	def __eq__(self, other):
+		try:
+			return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+		except TypeError:
+			return NotImplemented
+
+	def __repr__(self):
+		return f'AnnotationView({list(self)!r})'
+
+	@property
+	def sentence_ids(self):
+		"""The sentence id of each annotation.
+
+		:rtype: numpy.ndarray
+		"""
+		return self.store.sentence_ids[self.begin:self.end]
+
+	@property
+	def spans(self):
+		"""The target span of each annotation.
+
+		:rtype: numpy.ndarray
+		"""
+		return self.store.spans[self.begin:self.end]
@@ -1,10 +1,14 @@
 import os
+from collections import defaultdict
+import numpy as np
 from numpy.lib.function_base import average
 import sklearn.metrics as metrics
 import matplotlib.pyplot as plt
-from scipy import stats
+from scipy import stats, sparse
 from sklearn.metrics import PrecisionRecallDisplay
 
+from fnalign.alignment.matrix import to_dense
+
 def read(dbname):
 	path = os.path.join('data', 'gold', f'{dbname}.txt')
 
@@ -14,19 +18,67 @@ def read(dbname):
 	return pairs
 
 
-def gold_scores(alignment):
-	pairs = read(alignment.l2_fn.name)
+def gold_matrix(alignment, pairs):
+	"""Returns a sparse matrix of the shape of ``alignment`` scores with 1 for
+	the frame pairs in ``pairs`` and 0 elsewhere.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`Alignment`
+	:param pairs: Pairs of english and l2 frame names.
+	:type pairs: list[tuple(str, str)]
+	:rtype: scipy.sparse.csr_matrix
+	"""
+	en_rows = defaultdict(list)
+	l2_cols = defaultdict(list)
+
+	for i, name in enumerate(alignment.en_frm['name']):
+		en_rows[name].append(i)
+	for j, name in enumerate(alignment.l2_frm['name']):
+		l2_cols[name].append(j)
+
+	cells = set((i, j) for x, y in pairs for i in en_rows[x] for j in l2_cols[y])
+	rows, cols = zip(*cells) if cells else ((), ())
+
+	return sparse.csr_matrix(
+		(np.ones(len(cells)), (rows, cols)), shape=alignment.shape)
 
-	for score in alignment.scores:
-		gold_df = score['df'].copy()
 
-		gold_df[gold_df.columns] = 0
+def pr_samples(matrix, gold):
+	"""Returns the labels, scores and weights of the frame pairs used to compute
+	precision and recall. Sparse scores only have a sample for each non-zero or
+	gold pair, and another one for all remaining pairs, whose weight is their
+	count.
 
-		for x, y in pairs:
-			gold_df.loc[x, y] = 1
+	:param matrix: A score matrix.
+	:type matrix: numpy.ndarray or scipy.sparse.csr_matrix
+	:param gold: The gold matrix (see :func:`gold_matrix`).
+	:type gold: scipy.sparse.csr_matrix
+	:returns: The labels, scores and weights, which are None for dense scores.
+	:rtype: tuple(numpy.ndarray, numpy.ndarray, numpy.ndarray)
+	"""
+	if not sparse.issparse(matrix):
+		return gold.toarray().flatten(), matrix.flatten(), None
 
-		true_values = gold_df.to_numpy().flatten()
-		pred_values = score['df'].to_numpy().flatten()
+	cells = (matrix.astype(bool) + gold.astype(bool)).tocoo()
+	true_values = np.asarray(gold[cells.row, cells.col]).ravel()
+	pred_values = np.asarray(matrix[cells.row, cells.col]).ravel()
+	weights = np.ones(cells.nnz)
+	rest = matrix.shape[0] * matrix.shape[1] - cells.nnz
+
+	if rest == 0:
+		return true_values, pred_values, weights
+
+	return np.append(true_values, 0), np.append(pred_values, 0), np.append(weights, rest)
+
+
+def gold_scores(alignment):
+	pairs = read(alignment.l2_fn.name)
+	gold = gold_matrix(alignment, pairs)
+
+	for score in alignment.scores:
+		# Rank correlations are computed over all pairs
+		true_values = gold.toarray().flatten()
+		pred_values = to_dense(score['matrix']).flatten()
 
 		print('-------')
 		print(score['id'])
@@ -40,7 +92,9 @@ def gold_scores(alignment):
 		print(p_value)
 		print('-------')
 
-		precision, recall, _ = metrics.precision_recall_curve(true_values, pred_values)
+		true_values, pred_values, weights = pr_samples(score['matrix'], gold)
+		precision, recall, _ = metrics.precision_recall_curve(
+			true_values, pred_values, sample_weight=weights)
 		disp = PrecisionRecallDisplay(precision, recall, 0, score['id'])
 		disp.plot()
 		a = score['id']
@@ -0,0 +1,176 @@
+"""This module contains the language detection used to identify the language
+of FE definitions. Detecting languages with :mod:`langdetect` is slow, so
+texts go through three steps and each one only handles what the previous
+could not:
+
+* A pre-classifier that decides obvious cases based on the Unicode scripts
+  and English stopwords of the text.
+* A persistent cache of :func:`langdetect.detect` results keyed by the hash of
+  the text.
+* :func:`langdetect.detect` itself, optionally in a pool of processes.
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import os
+import re
+import pickle
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from langdetect import detect, DetectorFactory
+
+DetectorFactory.seed = 0
+
+CACHE_VERSION = 1
+CACHE_PATH = os.path.join(
+	os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "cache", "langdetect.pkl")
+
+# Stopwords that are frequent in english, but are not words in the other
+# latin script languages of the project, e.g., "is", "an" and "will" are left
+# out because they are dutch or german words.
+EN_STOPWORDS = frozenset([
+	"the", "that", "which", "with", "this", "these", "those", "are", "were",
+	"being", "who", "whose", "whom", "its", "such", "other", "some", "their",
+	"they", "them", "what", "where", "when", "how", "would", "should", "could",
+	"might", "does", "did", "into", "than", "then", "there", "any", "each",
+	"while", "about", "between", "through", "during", "without", "whether",
+	"because", "someone", "something",
+])
+
+EN_MIN_WORDS = 8
+EN_MIN_STOPWORDS = 0.15
+
+# Minimum fraction of the letters of a text that must be in the script of a
+# language for it to be classified by script. Japanese is also written with
+# han characters, so a fraction of its letters must be kana as well.
+SCRIPT_MIN_RATIO = 0.6
+KANA_MIN_RATIO = 0.1
+
+KANA_RE = re.compile(r'[\u3040-\u30ff]')
+HAN_RE = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff]')
+HANGUL_RE = re.compile(r'[\u1100-\u11ff\u3130-\u318f\uac00-\ud7af]')
+WORD_RE = re.compile(r"[a-z']+")
+
+_cache = None
+
+
+def preclassify(text):
+	"""Returns the language of ``text`` when it can be decided without a
+	detection model or None otherwise. Texts mostly written in Japanese kana and
+	han or in Korean hangul are classified by their script, so that a few quoted
+	words don't decide the language, and texts with only ASCII characters are
+	classified as english when enough of their words are english stopwords.
+
+	:param text: The text to be classified.
+	:type text: str
+	:returns: The language code as returned by :func:`langdetect.detect`.
+	:rtype: str
+	"""
+	letters = sum(1 for c in text if c.isalpha())
+
+	if letters and not text.isascii():
+		kana = len(KANA_RE.findall(text))
+		if kana >= KANA_MIN_RATIO * letters and kana + len(HAN_RE.findall(text)) >= SCRIPT_MIN_RATIO * letters:
+			return "ja"
+
+		if len(HANGUL_RE.findall(text)) >= SCRIPT_MIN_RATIO * letters:
+			return "ko"
+
+	if text.isascii():
+		words = WORD_RE.findall(text.lower())
+
+		if len(words) >= EN_MIN_WORDS:
+			stopwords = sum(1 for w in words if w in EN_STOPWORDS)
+			if stopwords / len(words) >= EN_MIN_STOPWORDS:
+				return "en"
+
+	return None
+
+
+def text_key(text):
+	"""Returns the cache key of ``text``.
+
+	:param text: The text.
+	:type text: str
+	:returns: The hexadecimal digest of the text.
+	:rtype: str
+	"""
+	return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def get_cache():
+	"""Returns the detection cache, reading it from :data:`CACHE_PATH` on the
+	first call.
+
+	:returns: A mapping of text keys to languages.
+	:rtype: dict[str, str]
+	"""
+	global _cache
+
+	if _cache is None:
+		try:
+			with open(CACHE_PATH, 'rb') as fp:
+				version, _cache = pickle.load(fp)
+			if version != CACHE_VERSION:
+				_cache = {}
+		except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+			_cache = {}
+
+	return _cache
+
+
+def save_cache():
+	"""Writes the detection cache to :data:`CACHE_PATH`."""
+	os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+	tmp_path = f'{CACHE_PATH}.{os.getpid()}.tmp'
+
+	with open(tmp_path, 'wb') as fp:
+		pickle.dump((CACHE_VERSION, get_cache()), fp, pickle.HIGHEST_PROTOCOL)
+
+	os.replace(tmp_path, CACHE_PATH)
+
+
+def detect_all(texts, workers=None, cache=True):
+	"""Detects the language of each text in ``texts``. The results are the same
+	as calling :func:`langdetect.detect` for each text, but only texts that are
+	not settled by :func:`preclassify` or the cache are given to the detection
+	model. When ``workers`` is given, those are detected by a pool of processes.
+
+	:param texts: The texts to be classified.
+	:type texts: list[str]
+	:param workers: Number of processes used to detect languages.
+	:type workers: int
+	:param cache: Whether the persistent cache should be used.
+	:type cache: bool
+	:returns: The language code of each text.
+	:rtype: list[str]
+	"""
+	langs = [preclassify(text) for text in texts]
+	detections = get_cache() if cache else {}
+	pending = {}
+
+	for text, lang in zip(texts, langs):
+		if lang is None:
+			key = text_key(text)
+			if key not in detections:
+				pending[key] = text
+
+	if pending:
+		keys = list(pending.keys())
+
+		if workers is not None and workers > 1:
+			with ProcessPoolExecutor(workers) as pool:
+				chunksize = max(1, len(keys) // (workers * 4))
+				results = list(pool.map(detect, pending.values(), chunksize=chunksize))
+		else:
+			results = [detect(text) for text in pending.values()]
+
+		detections.update(zip(keys, results))
+
+		if cache:
+			save_cache()
+
+	return [
+		lang if lang is not None else detections[text_key(text)]
+		for text, lang in zip(texts, langs)
+	]
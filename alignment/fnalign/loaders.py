@@ -16,11 +16,23 @@ loader and use it.
 
 import os
 import re
+import time
+import pickle
+import itertools
+import hashlib
 import logging
 import pandas as pd
 import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
 
 from fnalign.models import FrameNet, Frame, LexUnit, FrameElement
+from fnalign.annotations import AnnotationStore
+from fnalign.sources import open_source
+
+try:
+	from lxml import etree as LET
+except ImportError:
+	LET = None
 
 SWEFN_FE_TYPES = {
 	"coreElement": "Core",
@@ -29,6 +41,48 @@ SWEFN_FE_TYPES = {
 
 NS = '{http://framenet.icsi.berkeley.edu}'
 
+SNAPSHOT_VERSION = 5
+SNAPSHOT_DIR = "cache"
+
+def iterparse(filename, tag, depth, backend='etree'):
+	"""Yields the elements of the XML file ``filename`` that have the given
+	``tag`` and ``depth`` (the root has depth 0) as soon as they are completely
+	parsed. Once the consumer resumes, each yielded element is cleared and
+	removed from its parent, so memory usage does not grow with the file size.
+
+	:param filename: Path or binary file object of the XML file.
+	:type filename: str
+	:param tag: Tag of the elements to be yielded.
+	:type tag: str
+	:param depth: Depth of the elements to be yielded.
+	:type depth: int
+	:param backend: The XML library used, either "etree" or "lxml".
+	:type backend: str
+	:returns: An iterator over the matching elements.
+	:rtype: Iterator[xml.etree.ElementTree.Element]
+	"""
+	ancestors = []
+
+	if backend == 'lxml':
+		events = LET.iterparse(filename, events=("start", "end"), remove_comments=True, remove_pis=True)
+	else:
+		events = ET.iterparse(filename, events=("start", "end"))
+
+	for event, el in events:
+		if event == "start":
+			ancestors.append(el)
+			continue
+
+		ancestors.pop()
+
+		if len(ancestors) == depth and el.tag == tag:
+			yield el
+			el.clear()
+
+			if ancestors:
+				ancestors[-1].remove(el)
+
+
 class FNLoader():
 	"""A class used to represent a FrameNet XML loader.
 
@@ -36,9 +90,56 @@ class FNLoader():
 	``db_name``.
 	"""
 
-	def __init__(self, db_name):
+	#: Whether each frame is stored in its own file and can be parsed regardless
+	#: of the others, e.g. by a different process.
+	split_frames = True
+
+	#: Whether LU annotations are stored in separate ``lu/lu<ID>.xml`` files.
+	lu_files = True
+
+	#: ElementPath expressions used to find elements. With the lxml backend they
+	#: are compiled to XPath once per loader.
+	paths = {
+		"definition": f"{NS}definition",
+		"lexUnit": f"{NS}lexUnit",
+		"FE": f"{NS}FE",
+		"sentence": f"{NS}subCorpus/{NS}sentence",
+		"text": f"{NS}text",
+		"target": f'{NS}annotationSet/{NS}layer[@name="Target"]/{NS}label[@name="Target"]',
+	}
+
+	def __init__(self, db_name, backend=None, data_dir="data"):
+		"""Initializes a loader for ``db_name``, whose files are inside the
+		``data_dir`` folder, either unpacked or in a release archive (see
+		:mod:`fnalign.sources`). XML files are parsed with lxml when it is
+		installed, unless ``backend`` is "etree", in which case the standard
+		:mod:`xml.etree.ElementTree` is used.
+
+		:param db_name: The name of the database.
+		:type db_name: str
+		:param backend: The XML library to be used, either "lxml" or "etree".
+		:type backend: str
+		:param data_dir: The folder containing all databases.
+		:type data_dir: str
+		"""
 		self.db_name = db_name
-		self.base_path = os.path.join("data", self.db_name)
+		self.base_path = os.path.join(data_dir, self.db_name)
+		self.source = open_source(self.base_path, os.path.join(data_dir, SNAPSHOT_DIR))
+
+		if backend is None:
+			backend = 'lxml' if LET is not None else 'etree'
+		elif backend == 'lxml' and LET is None:
+			logging.getLogger('alignment').warning('lxml is not installed, using ElementTree instead')
+			backend = 'etree'
+
+		self.backend = backend
+		self._xpaths = {}
+
+	def __getstate__(self):
+		# Compiled XPath objects can't be pickled, they are compiled again on use
+		state = self.__dict__.copy()
+		state['_xpaths'] = {}
+		return state
 
 	@staticmethod
 	def supported_db():
@@ -50,6 +151,120 @@ class FNLoader():
 		"""
 		return ['bfn', 'frenchfn', 'japanesefn', 'spanishfn', 'dutchfn']
 
+	def parse_file(self, filename):
+		"""Parses the XML file ``filename`` and returns its root.
+
+		:param filename: Path of the XML file.
+		:type filename: str
+		:returns: The XML root of the file.
+		:rtype: xml.etree.ElementTree.Element
+		"""
+		with self.source.open(filename) as fp:
+			if self.backend == 'lxml':
+				return LET.parse(fp, _lxml_parser()).getroot()
+
+			return ET.parse(fp).getroot()
+
+	def find(self, el, name):
+		"""Returns the first element under ``el`` that matches the expression
+		``name`` of :attr:`paths` or None if there is no match.
+
+		:param el: The context element.
+		:type el: xml.etree.ElementTree.Element
+		:param name: The expression name.
+		:type name: str
+		:returns: The first matching element.
+		:rtype: xml.etree.ElementTree.Element
+		"""
+		if self.backend == 'lxml':
+			result = self.xpath(name)(el)
+			return result[0] if result else None
+
+		return el.find(self.paths[name])
+
+	def findall(self, el, name):
+		"""Returns all elements under ``el`` that match the expression ``name`` of
+		:attr:`paths` in document order.
+
+		:param el: The context element.
+		:type el: xml.etree.ElementTree.Element
+		:param name: The expression name.
+		:type name: str
+		:returns: List of matching elements.
+		:rtype: list[xml.etree.ElementTree.Element]
+		"""
+		if self.backend == 'lxml':
+			return self.xpath(name)(el)
+
+		return el.findall(self.paths[name])
+
+	def find_each(self, el, name, *children):
+		"""Finds all elements under ``el`` that match the expression ``name`` and,
+		for each one of them, the first element that matches each expression in
+		``children``. With the lxml backend, each child expression is evaluated
+		only once for the whole tree instead of once for each element.
+
+		:param el: The context element.
+		:type el: xml.etree.ElementTree.Element
+		:param name: The expression name.
+		:type name: str
+		:param children: The names of expressions relative to the matches of
+			``name``.
+		:type children: str
+		:returns: An iterator over each matching element followed by the first
+			match of each child expression (or None).
+		:rtype: Iterator[tuple]
+		"""
+		if self.backend != 'lxml':
+			for match in el.findall(self.paths[name]):
+				yield (match, *(match.find(self.paths[c]) for c in children))
+			return
+
+		matches = self.xpath(name)(el)
+		firsts = []
+
+		for child in children:
+			path = f'{self.paths[name]}/{self.paths[child]}'
+			depth = re.sub(r'\{[^}]*\}|\[[^\]]*\]', '', self.paths[child]).count('/') + 1
+			first = {}
+
+			for result in self.xpath(path)(el):
+				parent = result
+				for _ in range(depth):
+					parent = parent.getparent()
+				first.setdefault(parent, result)
+
+			firsts.append(first)
+
+		for match in matches:
+			yield (match, *(first.get(match) for first in firsts))
+
+	def xpath(self, name):
+		"""Returns the compiled XPath equivalent to the expression ``name`` of
+		:attr:`paths` (or to ``name`` itself, if it is an ElementPath expression).
+		Expressions are compiled only once.
+
+		:param name: The expression name.
+		:type name: str
+		:returns: The compiled XPath.
+		:rtype: lxml.etree.XPath
+		"""
+		if name not in self._xpaths:
+			path = re.sub(r'\{[^}]*\}', 'fn:', self.paths.get(name, name))
+			self._xpaths[name] = LET.XPath(path, namespaces={'fn': NS[1:-1]})
+
+		return self._xpaths[name]
+
+	def frame_files(self):
+		"""Returns the paths of all frame files on the dataset identified by
+		``self.db_name``.
+
+		:returns: List of frame file paths.
+		:rtype: list[str]
+		"""
+		path = os.path.join(self.base_path, 'frame')
+		return [os.path.join(path, p) for p in self.source.listdir(path) if p.endswith(".xml")]
+
 	def frames(self):
 		"""Yields the xml root of all existent frames on the dataset identified by
 		``self.db_name``.
@@ -57,11 +272,38 @@ class FNLoader():
 		:returns: An iterator over :class:`xml.etree.ElementTree.Element`.
 		:rtype: Iterator[xml.etree.ElementTree.Element]
 		"""
-		path = os.path.join(self.base_path, 'frame')
-		files = [os.path.join(path, p) for p in os.listdir(path) if p.endswith(".xml")]
+		for filename in self.frame_files():
+			yield self.parse_file(filename)
 
-		for filename in files:
-			yield ET.parse(filename).getroot()
+	def source_files(self):
+		"""Returns the paths of all files that the database is loaded from, i.e.,
+		frame files and, if :attr:`lu_files` is set, LU files.
+
+		:returns: List of file paths.
+		:rtype: list[str]
+		"""
+		files = self.frame_files()
+		path = os.path.join(self.base_path, 'lu')
+
+		if self.lu_files and self.source.isdir(path):
+			files.extend(os.path.join(path, p) for p in self.source.listdir(path) if p.endswith(".xml"))
+
+		return files
+
+	def fingerprint(self):
+		"""Computes a digest of the paths, sizes and modification times of all
+		source files. Any change to the database files changes the digest.
+
+		:returns: The hexadecimal digest.
+		:rtype: str
+		"""
+		digest = hashlib.sha1()
+
+		for path in sorted(self.source_files()):
+			size, version = self.source.stat(path)
+			digest.update(f'{path}\0{size}\0{version}\n'.encode())
+
+		return digest.hexdigest()
 
 	def parse_def(self, root):
 		"""Parses a frame or FE definition to XML and removes the examples section.
@@ -74,7 +316,10 @@ class FNLoader():
 		:rtype: str
 		"""
 		try :
-			def_root = ET.fromstring(root.text)
+			if self.backend == 'lxml':
+				def_root = LET.fromstring(root.text, _lxml_parser())
+			else:
+				def_root = ET.fromstring(root.text)
 			def_str = def_root.text if def_root.text is not None else ""
 			for child in def_root:
 				if child.tag == "ex":
@@ -100,7 +345,7 @@ class FNLoader():
 		:rtype: (str, str, str)
 		"""
 		name = root.get("name")
-		definition = self.parse_def(root.find(f"{NS}definition"))
+		definition = self.parse_def(self.find(root, "definition"))
 		return root.get("ID"), name, name, definition
 	
 	def parse_lus(self, root):
@@ -110,31 +355,49 @@ class FNLoader():
 
 		:param root: The frame's XML root tag.
 		:param type: xml.etree.ElementTree.Element
-		:returns: An iterator over lexical units id, name, POS tag, annotated sentences.
-		:rtype: Iterator[(str, str, str, str)]
+		:returns: An iterator over lexical units id, name and POS tag.
+		:rtype: Iterator[(str, str, str)]
+		"""
+		for el in self.findall(root, "lexUnit"):
+			yield el.get("ID"), el.get("name"), el.get("POS")
+
+	def lu_path(self, lu_id):
+		"""Returns the path of the file with annotations of the LU ``lu_id``.
+
+		:param lu_id: The lexical unit id.
+		:type lu_id: str
+		:returns: The LU file path.
+		:rtype: str
 		"""
-		for el in root.findall(f"{NS}lexUnit"):
-			path = os.path.join(self.base_path, 'lu', f'lu{el.get("ID")}.xml')
+		return os.path.join(self.base_path, 'lu', f'lu{lu_id}.xml')
+
+	def parse_annotations(self, lu_id):
+		"""Returns the annotated sentences of the lexical unit identified by
+		``lu_id``, which are read from its own XML file. This method should be
+		overriden when a schema uses different tags or attributes for annotations.
 
-			try:
-				lu_root = ET.parse(path).getroot()
-				annotations = list()
+		:param lu_id: The lexical unit id.
+		:type lu_id: str
+		:returns: List of annotated sentences and the LU position in each one.
+		:rtype: list[dict]
+		"""
+		try:
+			lu_root = self.parse_file(self.lu_path(lu_id))
+		except FileNotFoundError:
+			return list()
 
-				for anno_set in lu_root.findall(f"{NS}subCorpus/{NS}sentence"):
-					text_el = anno_set.find(f'{NS}text')
-					sentence = text_el.text if text_el is not None else anno_set.text
-					target = anno_set.find(f'{NS}annotationSet/{NS}layer[@name="Target"]/{NS}label[@name="Target"]')
+		annotations = list()
 
-					if target is not None:
-						annotations.append({
-							"sentence": sentence,
-							"lu_pos": (int(target.get("start")), int(target.get("end"))+1)
-						})
+		for anno_set, text_el, target in self.find_each(lu_root, "sentence", "text", "target"):
+			sentence = text_el.text if text_el is not None else anno_set.text
 
-				yield el.get("ID"), el.get("name"), el.get("POS"), annotations
-			except FileNotFoundError:
-				yield el.get("ID"), el.get("name"), el.get("POS"), list()
+			if target is not None:
+				annotations.append({
+					"sentence": sentence,
+					"lu_pos": (int(target.get("start")), int(target.get("end"))+1)
+				})
 
+		return annotations
 
 	def parse_fes(self, root):
 		"""Yields all frame elements under ``root``. This method should be
@@ -147,20 +410,62 @@ class FNLoader():
 			abbreviation.
 		:rtype: Iterator[(str, str, str)]
 		"""
-		for el in root.findall(f"{NS}FE"):
-			def_str = self.parse_def(el.find(f"{NS}definition"))
+		for el, definition in self.find_each(root, "FE", "definition"):
+			def_str = self.parse_def(definition)
 			yield (el.get("ID"), el.get("name"), el.get("name"), el.get("coreType"),
 				el.get("abbrev"), def_str)
 
-	def load(self, lang='en'):
+	def read_frame(self, root):
+		"""Extracts from ``root`` all data of a frame, its LUs and FEs. The result
+		contains only builtin types, so it can be sent across processes.
+
+		:param root: The frame's XML root tag.
+		:param type: xml.etree.ElementTree.Element
+		:returns: The frame data as returned by :func:`parse_frame` and lists of
+			the LU and FE data as yielded by :func:`parse_lus` and
+			:func:`parse_fes`.
+		:rtype: (tuple, list[tuple], list[tuple])
+		"""
+		return self.parse_frame(root), list(self.parse_lus(root)), list(self.parse_fes(root))
+
+	def read_annotations(self, lu_ids, workers=None):
+		"""Reads the annotated sentences of all lexical units in ``lu_ids``. When
+		``workers`` is given and :attr:`lu_files` is set, LU files are parsed by a
+		pool of processes.
+
+		:param lu_ids: The lexical unit ids.
+		:type lu_ids: list[str]
+		:param workers: Number of processes used to parse LU files.
+		:type workers: int
+		:returns: List of annotations of each LU in the same order as ``lu_ids``.
+		:rtype: list[list[dict]]
+		"""
+		if not self.lu_files:
+			return [list() for _ in lu_ids]
+
+		if workers is not None and workers > 1:
+			with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self,)) as pool:
+				return list(pool.map(_parse_annotations, lu_ids, chunksize=_chunksize(lu_ids, workers)))
+
+		return [self.parse_annotations(_id) for _id in lu_ids]
+
+	def load(self, lang='en', workers=None, lazy_annotations=False):
 		"""Loads all frames and their LUs from XML files and returns a frame list.
 		This methods acts as an orchestrator for the loading process, that's why it
 		list directory contents and parses the XML files, but always delegate the
-		responsibility of finding frame and LU data to :func:`__parse_frame` and
-		:func:`__parse_lus`, respectively.
+		responsibility of finding frame and LU data to :func:`parse_frame`,
+		:func:`parse_lus`, :func:`parse_fes` and :func:`parse_annotations`.
 		It also assumes that all XML files are located inside a folder with the
 		same name as the ``db_name`` attribute and that this folder is inside the
-		"data" folder.
+		data folder ("data" by default).
+
+		When ``workers`` is given, frame files (if :attr:`split_frames`) and LU
+		files (if :attr:`lu_files`) are parsed by a pool of processes. The result
+		is the same as the one of a sequential load.
+
+		When ``lazy_annotations`` is True, LU files are not read during the load.
+		Each :class:`LexUnit` keeps a reference to this loader and reads its
+		annotations on first use (see :func:`FrameNet.prefetch_annotations`).
 
 		>>> loader = FNLoader("chinesefn")
 		>>> loader.load("cmn") # Will look for files inside "data/chinesefn"
@@ -168,54 +473,288 @@ class FNLoader():
 
 		:param lang: Language identifier to be attributed to loaded frames.
 		:type lang: str
+		:param workers: Number of processes used to parse XML files.
+		:type workers: int
+		:param lazy_annotations: Whether LU annotations should be read on demand.
+		:type lazy_annotations: bool
 		:returns: List of frame objects.
 		:rtype: list[:class:`Frame`]
 		"""
-		frames = []
+		logger = logging.getLogger('alignment')
+		start_time = time.time()
+
+		if self.split_frames:
+			files = self.frame_files()
+			records = self.read_frame_files(files, workers=workers)
+		else:
+			files = []
+			records = [self.read_frame(root) for root in self.frames()]
+
+		logger.info(f'{self.db_name} frames parsed --- {time.time() - start_time:.2f} seconds ---')
+
+		lu_ids = [lu[0] for _, lus, _ in records for lu in lus]
+
+		if lazy_annotations and self.lu_files:
+			annotations = [None for _ in lu_ids]
+		else:
+			start_time = time.time()
+			annotations = self.read_annotations(lu_ids, workers=workers)
+			logger.info(f'{self.db_name} LUs parsed --- {time.time() - start_time:.2f} seconds ---')
+
+		store = AnnotationStore()
+		annotations = iter(annotations)
+		frames = [
+			self.make_frame(lang, record, [next(annotations) for _ in record[1]], store)
+			for record in records
+		]
+		store.compact()
+
+		start_time = time.time()
+		fn = FrameNet(self.db_name, lang, frames, workers=workers, annotations=store)
+		logger.info(f'{self.db_name} FE languages detected --- {time.time() - start_time:.2f} seconds ---')
+
+		fn.manifest = self.manifest(frames, records, files, lazy_annotations)
+
+		return fn
+
+	def read_frame_files(self, files, workers=None):
+		"""Reads the frame data of each file in ``files`` as returned by
+		:func:`read_frame`. When ``workers`` is given, files are parsed by a pool of
+		processes.
+
+		:param files: The frame file paths.
+		:type files: list[str]
+		:param workers: Number of processes used to parse frame files.
+		:type workers: int
+		:returns: List of frame data in the same order as ``files``.
+		:rtype: list[tuple]
+		"""
+		if workers is not None and workers > 1:
+			with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(self,)) as pool:
+				return list(pool.map(_read_frame_file, files, chunksize=_chunksize(files, workers)))
 
-		for root in self.frames():
-			_id, name, name_en, definition = self.parse_frame(root)
-			frame = Frame(_id, name, name_en, self.db_name, lang, definition=definition)
+		return [self.read_frame(self.parse_file(filename)) for filename in files]
 
-			frame.lus = set(
-				LexUnit(_id, f'{frame.gid}.{_id}', name, pos, annotations)
-				for _id, name, pos, annotations in self.parse_lus(root)
-			)
+	def make_frame(self, lang, record, annotations, store=None):
+		"""Instantiates a :class:`Frame` with its LUs and FEs from the frame data
+		returned by :func:`read_frame`.
 
-			frame.fes = set(
-				FrameElement(_id, name, name_en, etype, abbrev, definition)
-				for _id, name, name_en, etype, abbrev, definition in self.parse_fes(root)
-			)
+		:param lang: Language identifier to be attributed to the frame.
+		:type lang: str
+		:param record: The frame data.
+		:type record: tuple
+		:param annotations: The annotations of each LU of the frame. LUs whose
+			annotations are None read them from this loader on demand.
+		:type annotations: list[list[dict]]
+		:param store: The store where annotations are kept.
+		:type store: :class:`fnalign.annotations.AnnotationStore`
+		:returns: The frame object.
+		:rtype: :class:`Frame`
+		"""
+		(_id, name, name_en, definition), lus, fes = record
+		frame = Frame(_id, name, name_en, self.db_name, lang, definition=definition)
+
+		frame.lus = set(
+			LexUnit(_id, f'{frame.gid}.{_id}', name, pos, anno, self, store)
+			for (_id, name, pos), anno in zip(lus, annotations)
+		)
+
+		frame.fes = set(
+			FrameElement(_id, name, name_en, etype, abbrev, definition)
+			for _id, name, name_en, etype, abbrev, definition in fes
+		)
+
+		return frame
+
+	def manifest(self, frames, records, files, lazy_annotations=False):
+		"""Builds the manifest of a loaded database, which is used by
+		:func:`reload`. It maps each source file to its size and modification time
+		and each frame global id to the file it was read from and a digest of its
+		data, and keeps whether annotations are read on demand.
+
+		:param frames: The loaded frames.
+		:type frames: list[:class:`Frame`]
+		:param records: The frame data of each frame.
+		:type records: list[tuple]
+		:param files: The frame file of each frame. It is empty when frames are
+			not split in different files.
+		:type files: list[str]
+		:param lazy_annotations: Whether LU annotations are read on demand.
+		:type lazy_annotations: bool
+		:returns: The manifest.
+		:rtype: dict
+		"""
+		return {
+			"files": {path: self.source.stat(path) for path in self.source_files()},
+			"frames": {
+				frame.gid: (path, _digest(record))
+				for frame, record, path in itertools.zip_longest(frames, records, files)
+			},
+			"lazy_annotations": lazy_annotations,
+		}
+
+	def reload(self, fn, workers=None):
+		"""Updates ``fn``, a FrameNet previously loaded by this loader, with the
+		changes made to its source files since then. Files whose size or
+		modification time changed are parsed again and frames are only replaced
+		when their data digest changed. Unchanged frames and LUs are kept as they
+		are, as well as the annotations of LUs whose files did not change.
+
+		When frames are not split in different files, the whole database is
+		parsed again, but still only changed frames are replaced.
+
+		New LUs read their annotations as the LUs of ``fn`` do: on demand when
+		it was loaded with ``lazy_annotations``, and during the reload otherwise.
+
+		:param fn: The FrameNet to be updated in place.
+		:type fn: :class:`FrameNet`
+		:param workers: Number of processes used to parse frame and LU files.
+		:type workers: int
+		:returns: The global ids of added, changed and removed frames.
+		:rtype: dict[str, set[str]]
+		:raises: ValueError -- when ``fn`` has no manifest, e.g., it was not loaded
+			from XML files by a loader.
+		"""
+		if "files" not in fn.manifest or "frames" not in fn.manifest:
+			raise ValueError(f'FrameNet "{fn.name}" has no manifest of its source files and must be loaded again')
+
+		changes = {"added": set(), "changed": set(), "removed": set()}
+		old_files = fn.manifest["files"]
+		new_files = {path: self.source.stat(path) for path in self.source_files()}
+		touched = set(p for p in new_files if old_files.get(p) != new_files[p])
+		touched.update(p for p in old_files if p not in new_files)
+
+		if not touched:
+			return changes
+
+		old_frames = {frm.gid: frm for frm in fn.frames}
+		old_digests = fn.manifest["frames"]
+		frame_files = set(self.frame_files())
+		lu_paths = [p for p in touched if p not in frame_files]
+
+		if self.split_frames:
+			gid_by_path = {path: gid for gid, (path, _) in old_digests.items()}
+			files = [p for p in touched if p in frame_files and p in new_files]
+			records = self.read_frame_files(files, workers=workers)
+			new_digests = {
+				gid: old_digests[gid]
+				for path, gid in gid_by_path.items() if path in new_files and path not in touched
+			}
+		else:
+			files = []
+			records = [self.read_frame(root) for root in self.frames()]
+			new_digests = {}
+
+		# Replacing frames whose data changed
+		new_frames = {}
+
+		for record, path in itertools.zip_longest(records, files):
+			digest = _digest(record)
+			frame = self.make_frame(
+				fn.lang, record, [None if self.lu_files else list() for _ in record[1]], fn.annotations)
+			new_digests[frame.gid] = (path, digest)
+
+			if frame.gid in old_frames and old_digests[frame.gid][1] == digest:
+				new_frames[frame.gid] = old_frames[frame.gid]
+				continue
+
+			changes["changed" if frame.gid in old_frames else "added"].add(frame.gid)
+			new_frames[frame.gid] = frame
+
+			if frame.gid in old_frames:
+				old_lus = {lu.gid: lu for lu in old_frames[frame.gid].lus}
+
+				for lu in frame.lus:
+					path = self.lu_path(lu.id)
+					if lu.gid in old_lus and old_lus[lu.gid].anno_loaded and path not in touched:
+						lu.anno_sents = old_lus[lu.gid].anno_sents
+
+		# LUs of a FrameNet loaded with its annotations don't keep this loader
+		if not fn.manifest.get("lazy_annotations", True):
+			lus = [
+				lu for gid in changes["added"] | changes["changed"]
+				for lu in new_frames[gid].lus if not lu.anno_loaded
+			]
+			for lu, annotations in zip(lus, self.read_annotations([lu.id for lu in lus], workers=workers)):
+				lu.anno_sents = annotations
+				lu.anno_source = None
+
+		changes["removed"] = set(old_frames) - set(new_digests)
+
+		fn.frames[:] = [
+			new_frames.get(frm.gid, frm)
+			for frm in fn.frames if frm.gid not in changes["removed"]
+		]
+		fn.frames.extend(new_frames[gid] for gid in new_digests if gid not in old_frames)
+
+		# Updating annotations of LUs whose frame did not change
+		lus_by_path = {
+			self.lu_path(lu.id): (frm, lu)
+			for frm in fn.frames for lu in frm.lus
+			if frm.gid not in changes["added"] and frm.gid not in changes["changed"]
+		}
+
+		for path in lu_paths:
+			if path in lus_by_path:
+				frm, lu = lus_by_path[path]
+
+				if lu.anno_loaded:
+					annotations = self.parse_annotations(lu.id)
+					if annotations == lu.anno_sents:
+						continue
+					lu.anno_sents = annotations
+
+				changes["changed"].add(frm.gid)
+
+		fn.detect_langs([frm for frm in fn.frames if frm.gid in changes["added"] | changes["changed"]])
+		fn.invalidate_indexes()
+		# Annotations of replaced LUs are still in the store
+		fn.compact_annotations()
+		fn.manifest = {
+			"files": new_files,
+			"frames": new_digests,
+			"lazy_annotations": fn.manifest.get("lazy_annotations", True),
+		}
+
+		return changes
 
-			frames.append(frame)
 
-		return FrameNet(self.db_name, lang, frames)
+class ChineseFNLoader(FNLoader):
 
+	# Element ids are assigned in parsing order
+	split_frames = False
+	lu_files = False
 
-class ChineseFNLoader(FNLoader):
+	paths = {
+		"info": "Frame_Info",
+		"lu_info": "LexicalUnit_Info",
+		"lexicalunit": "lexicalunit",
+		"fe_info": "FrameElement_Info",
+		"FE": "FE",
+	}
 
 	@staticmethod
 	def supported_db():
 		return ['chinesefn']
 
-	def __init__(self, db_name):
-		super().__init__(db_name)
+	def __init__(self, db_name, backend=None, data_dir="data"):
+		super().__init__(db_name, backend=backend, data_dir=data_dir)
 		self.id = 0
 
 	def parse_frame(self, root):
-		info = root.find("Frame_Info")
+		info = self.find(root, "info")
 		self.id += 1
 		return self.id, info.get("frame_name"), info.get("frame_name_en"), info.get("frame_def")
 	
 	def parse_lus(self, root):
-		info = root.find("Frame_Info").find("LexicalUnit_Info")
-		for el in info.findall("lexicalunit"):
+		info = self.find(self.find(root, "info"), "lu_info")
+		for el in self.findall(info, "lexicalunit"):
 			self.id += 1
-			yield self.id, el.get("lexicalunit_name"), el.get("lexicalunit_pos_mark"), []
+			yield self.id, el.get("lexicalunit_name"), el.get("lexicalunit_pos_mark")
 
 	def parse_fes(self, root):
-		info = root.find("Frame_Info").find("FrameElement_Info")
-		for el in info.findall("FE"):
+		info = self.find(self.find(root, "info"), "fe_info")
+		for el in self.findall(info, "FE"):
 			self.id += 1
 			yield (self.id, el.get("frameelement_name"), el.get("frameelement_name_en"),
 				None, el.get("frameelement_abbr"), None)
@@ -223,12 +762,26 @@ class ChineseFNLoader(FNLoader):
 
 class FNBrasilLoader(FNLoader):
 
+	# All frames are in a single file
+	split_frames = False
+
+	paths = {
+		"definition": "definition",
+		"lexunits": "lexunits",
+		"lexunit": "lexunit",
+		"fes": "fes",
+		"fe": "fe",
+		"annotationSet": "subcorpus/annotationSet",
+		"text": "sentence/text",
+		"target": 'layers/layer[@name="Target"]/labels/label[@name="Target"]',
+	}
+
 	@staticmethod
 	def supported_db():
 		return ['fnbrasil', 'fncopa', 'salsa']
 
-	def __init__(self, db_name):
-		super().__init__(db_name)
+	def __init__(self, db_name, backend=None, data_dir="data"):
+		super().__init__(db_name, backend=backend, data_dir=data_dir)
 		self.def_ex_re = re.compile(r'^Ex:(.|\n)*', re.MULTILINE)
 		self.def_com_re = re.compile(r'^s\d+:.*$', re.MULTILINE)
 
@@ -249,55 +802,68 @@ class FNBrasilLoader(FNLoader):
 		else :
 			return None
 
+	def frame_files(self):
+		return [os.path.join(self.base_path, "data.xml")]
+
 	def frames(self):
-		filename = os.path.join("data", self.db_name, "data.xml")
-		root = ET.parse(filename).getroot()
+		filename = os.path.join(self.base_path, "data.xml")
 
-		for frm_node in root.findall("frame"):
-			yield frm_node
+		with self.source.open(filename) as fp:
+			for frm_node in iterparse(fp, "frame", 1, self.backend):
+				yield frm_node
 
 	def parse_frame(self, root):
-		definition = self.clean_def(root.find("definition").text)
+		definition = self.clean_def(self.find(root, "definition").text)
 		return root.get("ID"), root.get("name"), None, definition
 
 	def parse_lus(self, root):
-		for el in root.find("lexunits").findall("lexunit"):
-			path = os.path.join(self.base_path, 'lu', f'lu{el.get("ID")}.xml')
+		for el in self.findall(self.find(root, "lexunits"), "lexunit"):
+			yield el.get("ID"), el.get("name"), el.get("pos")
 
-			try:
-				lu_root = ET.parse(path).getroot()
-				annotations = list()
+	def parse_annotations(self, lu_id):
+		try:
+			lu_root = self.parse_file(self.lu_path(lu_id))
+		except FileNotFoundError:
+			return list()
 
-				for anno_set in lu_root.findall(f"subcorpus/annotationSet"):
-					sentence = anno_set.find(f'sentence/text').text
-					target = anno_set.find(f'layers/layer[@name="Target"]/labels/label[@name="Target"]')
+		annotations = list()
 
-					if target is not None:
-						annotations.append({
-							"sentence": sentence,
-							"lu_pos": (int(target.get("start")), int(target.get("end"))+1)
-						})
+		for anno_set, text_el, target in self.find_each(lu_root, "annotationSet", "text", "target"):
+			sentence = text_el.text
 
-				yield el.get("ID"), el.get("name"), el.get("pos"), annotations
-			except FileNotFoundError:
-				yield el.get("ID"), el.get("name"), el.get("pos"), list()
+			if target is not None:
+				annotations.append({
+					"sentence": sentence,
+					"lu_pos": (int(target.get("start")), int(target.get("end"))+1)
+				})
 
+		return annotations
 
 	def parse_fes(self, root):
-		for el in root.find("fes").findall("fe"):
-			definition = self.clean_def(el.find("definition").text)
+		for el, definition in self.find_each(self.find(root, "fes"), "fe", "definition"):
+			definition = self.clean_def(definition.text)
 			yield (el.get("ID"), el.get("name"), None, el.get("coreType"),
 				el.get("abbrev"), definition)
 
 
 class SwedishFNLoader(FNLoader):
 
+	# All frames are in a single file and element ids are assigned in parsing
+	# order
+	split_frames = False
+	lu_files = False
+
+	paths = {
+		"Sense": "Sense",
+		"feat": "feat",
+	}
+
 	@staticmethod
 	def supported_db():
 		return ['swedishfn']
 
-	def __init__(self, db_name):
-		super().__init__(db_name)
+	def __init__(self, db_name, backend=None, data_dir="data"):
+		super().__init__(db_name, backend=backend, data_dir=data_dir)
 		self.id = 0
 
 	def get_lu(self, lu):
@@ -314,36 +880,79 @@ class SwedishFNLoader(FNLoader):
 		lu = lu.replace('..', '.')
 		return lu, pos
 
+	def frame_files(self):
+		return [os.path.join(self.base_path, "data.xml")]
+
 	def frames(self):
-		filename = os.path.join("data", self.db_name, "data.xml")
-		root = ET.parse(filename).getroot()
+		filename = os.path.join(self.base_path, "data.xml")
 
-		for le in root.find("Lexicon").findall("LexicalEntry"):
-			if le.find("Sense"):
-				yield le.find("Sense")
+		with self.source.open(filename) as fp:
+			for le in iterparse(fp, "LexicalEntry", 2, self.backend):
+				sense = self.find(le, "Sense")
+				if sense is not None and len(sense) > 0:
+					yield sense
 
 	def parse_frame(self, root):
 		try:
-			en_name = next(f for f in root.findall("feat") if f.get("att") == "BFNID").get("val")
+			en_name = next(f for f in self.findall(root, "feat") if f.get("att") == "BFNID").get("val")
 		except StopIteration:
 			en_name = None
 		self.id += 1
 		return self.id, root.get("id"), en_name, None
 
 	def parse_lus(self, root):
-		for f in root.findall("feat"):
+		for f in self.findall(root, "feat"):
 			if f.get("att") == "LU":
 				lu, pos = self.get_lu(f.get("val"))
 				self.id += 1
-				yield self.id, lu, pos, []
+				yield self.id, lu, pos
 
 	def parse_fes(self, root):
-		for f in root.findall("feat"):
+		for f in self.findall(root, "feat"):
 			if f.get("att") in SWEFN_FE_TYPES:
 				self.id += 1
 				yield self.id, None, f.get("val"), SWEFN_FE_TYPES[f.get("att")], None, None
 
 
+_worker_loader = None
+_parser = None
+
+
+def _lxml_parser():
+	"""Returns the lxml parser of this process. Comments and processing
+	instructions are removed, as :mod:`xml.etree.ElementTree` does.
+	"""
+	global _parser
+	if _parser is None:
+		_parser = LET.XMLParser(remove_comments=True, remove_pis=True)
+	return _parser
+
+
+
+def _init_worker(loader):
+	"""Initializes a process of the loading pool with its own copy of
+	``loader``.
+	"""
+	global _worker_loader
+	_worker_loader = loader
+
+
+def _read_frame_file(filename):
+	return _worker_loader.read_frame(_worker_loader.parse_file(filename))
+
+
+def _parse_annotations(lu_id):
+	return _worker_loader.parse_annotations(lu_id)
+
+
+def _digest(record):
+	return hashlib.sha1(pickle.dumps(record, pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def _chunksize(items, workers):
+	return max(1, len(items) // (workers * 4))
+
+
 loaders = [
 	FNLoader,
 	ChineseFNLoader,
@@ -360,28 +969,143 @@ def log_loaded_fn(fn):
 	logger.info(f'     frame count         = {len(fn.frames)}')
 	logger.info(f'     lu count            = {sum(len(f.lus) for f in fn.frames)}')
 	logger.info(f'     fe count            = {sum(len(f.fes) for f in fn.frames)}')
-	logger.info(f'     lu annotation count = {sum(len(l.anno_sents) for f in fn.frames for l in f.lus)})')
+	lus = [l for f in fn.frames for l in f.lus]
+	loaded = [l for l in lus if l.anno_loaded]
+
+	logger.info(f'     lu annotation count = {sum(len(l.anno_sents) for l in loaded)})')
+	logger.info(f'     unique sentences    = {fn.annotations.sentence_count}')
+	if len(loaded) < len(lus):
+		logger.info(f'     lazy annotation lus = {len(lus) - len(loaded)}')
 	logger.info(f'')
 
 
-def load(db_name, lang):
+def read_snapshot(path, fingerprint):
+	"""Reads a :class:`FrameNet` snapshot written by :func:`write_snapshot`. The
+	snapshot is only used when it was written by the current snapshot version
+	from source files with the same ``fingerprint``.
+
+	:param path: Path of the snapshot file.
+	:type path: str
+	:param fingerprint: The current fingerprint of the database source files.
+	:type fingerprint: str
+	:returns: The snapshot FrameNet or None if it is missing or outdated.
+	:rtype: :class:`FrameNet`
+	"""
+	try:
+		with open(path, 'rb') as fp:
+			header = pickle.load(fp)
+
+			if header != {"version": SNAPSHOT_VERSION, "fingerprint": fingerprint}:
+				return None
+
+			return pickle.load(fp)
+	except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+		return None
+
+
+def write_snapshot(path, fingerprint, fn):
+	"""Writes a binary snapshot of ``fn`` to ``path``. The snapshot consists of
+	a header with the snapshot version and the ``fingerprint`` of the source
+	files followed by the pickled :class:`FrameNet`.
+
+	:param path: Path of the snapshot file.
+	:type path: str
+	:param fingerprint: The fingerprint of the database source files.
+	:type fingerprint: str
+	:param fn: The FrameNet to be saved.
+	:type fn: :class:`FrameNet`
+	"""
+	os.makedirs(os.path.dirname(path), exist_ok=True)
+	tmp_path = f'{path}.{os.getpid()}.tmp'
+
+	with open(tmp_path, 'wb') as fp:
+		pickle.dump({"version": SNAPSHOT_VERSION, "fingerprint": fingerprint}, fp, pickle.HIGHEST_PROTOCOL)
+		pickle.dump(fn, fp, pickle.HIGHEST_PROTOCOL)
+
+	os.replace(tmp_path, path)
+
+
+def reload(fn, workers=None, data_dir="data"):
+	"""Updates ``fn`` in place with the changes made to its source files since
+	it was loaded. This is a utility function that identifies the appropriate
+	loader of ``fn`` as :func:`load` does and calls its :func:`FNLoader.reload`.
+
+	:param fn: The FrameNet to be updated.
+	:type fn: :class:`FrameNet`
+	:param workers: Number of processes used to parse frame files.
+	:type workers: int
+	:param data_dir: The folder containing all databases.
+	:type data_dir: str
+	:returns: The global ids of added, changed and removed frames.
+	:rtype: dict[str, set[str]]
+	"""
+	loader = next(
+		l(fn.name, data_dir=data_dir)
+		for l in loaders if fn.name in l.supported_db()
+	)
+	changes = loader.reload(fn, workers=workers)
+
+	logging.getLogger('alignment').info(
+		f"Reloaded '{fn.name}' database: {len(changes['added'])} added, "
+		f"{len(changes['changed'])} changed and {len(changes['removed'])} removed frames")
+
+	return changes
+
+
+def load(db_name, lang, workers=None, snapshot=True, lazy_annotations=False, backend=None,
+	data_dir="data"):
 	"""This is a utility function that given ``db_name`` identifies the
 	appropriate loader class (:class:`FNLoader` or a subclass) to handle this 
 	database. An instance of this loader is used to create the FrameNet objects.
 
+	When ``snapshot`` is True, the loaded FrameNet is saved as a binary snapshot
+	in the :data:`SNAPSHOT_DIR` folder of ``data_dir`` and subsequent calls read
+	it instead of the XML files, unless any of them was changed.
+
 	:param db_name: The name of the database to be loaded.
 	:type db_name: str
 	:param lang: Language identifier to be attributed to loaded frames.
 	:type lang: str
+	:param workers: Number of processes used to parse XML files.
+	:type workers: int
+	:param snapshot: Whether snapshots should be used.
+	:type snapshot: bool
+	:param lazy_annotations: Whether LU annotations should be read on demand.
+	:type lazy_annotations: bool
+	:param backend: The XML library to be used, either "lxml" or "etree".
+	:type backend: str
+	:param data_dir: The folder containing all databases.
+	:type data_dir: str
 	:returns: pandas.DataFrame -- A pandas DataFrame containing all loaded frames.
 	:raises: Exception
 	"""
-	loader = next(l(db_name) for l in loaders if db_name in l.supported_db())
+	loader = next(
+		l(db_name, backend=backend, data_dir=data_dir)
+		for l in loaders if db_name in l.supported_db()
+	)
 
 	if not loader: 
 		raise Exception(f"No loader found for db \"{db_name}\"")
 
-	fn = loader.load(lang)
+	fn = None
+
+	if snapshot:
+		start_time = time.time()
+		mode = '.lazy' if lazy_annotations else ''
+		path = os.path.join(data_dir, SNAPSHOT_DIR, f'{db_name}.{lang}{mode}.snapshot')
+		fingerprint = loader.fingerprint()
+		fn = read_snapshot(path, fingerprint)
+
+		if fn is not None:
+			logging.getLogger('alignment').info(
+				f'{db_name} snapshot loaded --- {time.time() - start_time:.2f} seconds ---')
+
+	if fn is None:
+		fn = loader.load(lang, workers=workers, lazy_annotations=lazy_annotations)
+
+		if snapshot:
+			write_snapshot(path, fingerprint, fn)
+
 	log_loaded_fn(fn)
 
 	return fn
@@ -11,15 +11,28 @@ alignment.
 
 import json
 import os
+import hashlib
 import itertools
 import re
+import sys
+from collections import defaultdict
 from datetime import datetime
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from scipy.stats import rankdata
-from langdetect import detect, DetectorFactory
 
-DetectorFactory.seed = 0
+from fnalign import output
+from fnalign.alignment.matrix import top_k as prune_top_k
+from fnalign.languages import detect_all
+from fnalign.annotations import AnnotationStore, AnnotationView
+
+# Scores with at most this fraction of non-zero frame pairs are stored as
+# sparse matrices by :func:`Alignment.add_scores`
+SPARSE_DENSITY = 0.1
+
+# Names of the lookup indexes of :func:`FrameNet.index`
+INDEXES = ('frame_gid', 'frame_name', 'lu_gid', 'lu_frame', 'lu_name', 'lu_lemma', 'fe_name')
 
 class FrameNet:
 	"""A class used to represent a FrameNet database.
@@ -27,39 +40,275 @@ class FrameNet:
 	This representation of a FrameNet should be used to store a collection of
 	frames that come from the same database and the language of that database.
 	For some databases that language might reflect only the LU languages.
+
+	Lookups of frames, LUs and FEs are backed by indexes that are built on
+	first use. When :attr:`frames` is changed, :func:`invalidate_indexes` must
+	be called.
+
+	The annotated sentences of all LUs are kept in :attr:`annotations`, a
+	shared :class:`fnalign.annotations.AnnotationStore`.
 	"""
 
-	def __init__(self, name, lang, frames):
+	def __init__(self, name, lang, frames, workers=None, annotations=None):
 		self.name = name
 		self.lang = lang
 		self.frames = frames
+		self.annotations = annotations if annotations is not None else AnnotationStore()
+
+		# Source files data used to reload this database incrementally
+		self.manifest = {}
+		self._indexes = {}
+
+		self.detect_langs(workers=workers)
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		state['_indexes'] = {}
+		return state
+
+	def index(self, name):
+		"""Returns the index ``name``, building it if it does not exist yet. The
+		available indexes are:
+
+		* ``frame_gid``: frame global id -> :class:`Frame`.
+		* ``frame_name``: frame name -> :class:`Frame`.
+		* ``lu_gid``: LU global id -> :class:`LexUnit`.
+		* ``lu_frame``: LU global id -> :class:`Frame` of the LU.
+		* ``lu_name``: LU clean name -> list of :class:`LexUnit`.
+		* ``lu_lemma``: (LU clean name, POS tag) -> list of :class:`LexUnit`.
+		* ``fe_name``: FE name or english name -> list of :class:`Frame`.
+
+		:param name: The index name.
+		:type name: str
+		:returns: The index.
+		:rtype: dict
+		:raises: KeyError -- when ``name`` is not one of the indexes above.
+		"""
+		if name not in self._indexes:
+			if name not in INDEXES:
+				raise KeyError(f'Unknown index "{name}"')
+
+			index = {} if name in ('frame_gid', 'frame_name', 'lu_gid', 'lu_frame') else defaultdict(list)
+
+			for frm in self.frames:
+				if name == 'frame_gid':
+					index[frm.gid] = frm
+				elif name == 'frame_name':
+					index.setdefault(frm.name, frm)
+				elif name == 'lu_gid':
+					index.update((lu.gid, lu) for lu in frm.lus)
+				elif name == 'lu_frame':
+					index.update((lu.gid, frm) for lu in frm.lus)
+				elif name == 'lu_name':
+					for lu in frm.lus:
+						index[lu.clean_name].append(lu)
+				elif name == 'lu_lemma':
+					for lu in frm.lus:
+						index[(lu.clean_name, lu.pos)].append(lu)
+				elif name == 'fe_name':
+					for fe_name in set(n for fe in frm.fes for n in (fe.name, fe.name_en) if n):
+						index[fe_name].append(frm)
+
+			self._indexes[name] = dict(index)
+
+		return self._indexes[name]
+
+	def invalidate_indexes(self):
+		"""Discards all indexes, so they are built again on the next lookup."""
+		self._indexes = {}
+
+	def fingerprint(self):
+		"""Computes a digest of the data of all frames, their LUs and FEs. The
+		frame digests of :attr:`manifest` are used when they exist.
+
+		:returns: The hexadecimal digest.
+		:rtype: str
+		"""
+		digest = hashlib.sha1(f'{self.name}\0{self.lang}\n'.encode())
 
-		self.detect_langs()
+		if self.manifest.get("frames"):
+			frames = ((gid, data) for gid, (_, data) in self.manifest["frames"].items())
+		else:
+			frames = (
+				(frm.gid, repr((
+					frm.name, frm.name_en, frm.definition,
+					sorted(repr((lu.gid, lu.name, lu.pos)) for lu in frm.lus),
+					sorted(repr((fe.name, fe.name_en, fe.type, fe.definition)) for fe in frm.fes),
+				)))
+				for frm in self.frames
+			)
+
+		for gid, data in sorted(frames):
+			digest.update(f'{gid}\0{data}\n'.encode())
+
+		return digest.hexdigest()
+
+	def get_frame(self, gid):
+		"""Returns the frame with global id ``gid`` or None.
+
+		:param gid: The frame global id.
+		:type gid: str
+		:rtype: :class:`Frame`
+		"""
+		return self.index('frame_gid').get(gid)
+
+	def get_frame_by_name(self, name):
+		"""Returns the frame named ``name`` or None.
+
+		:param name: The frame name.
+		:type name: str
+		:rtype: :class:`Frame`
+		"""
+		return self.index('frame_name').get(name)
+
+	def get_lu(self, gid):
+		"""Returns the LU with global id ``gid`` or None.
+
+		:param gid: The LU global id.
+		:type gid: str
+		:rtype: :class:`LexUnit`
+		"""
+		return self.index('lu_gid').get(gid)
+
+	def find_lus(self, clean_name, pos=None):
+		"""Returns all LUs with the preprocessed name ``clean_name`` and, if
+		given, the POS tag ``pos``.
+
+		:param clean_name: The LU preprocessed name (see :attr:`LexUnit.clean_name`).
+		:type clean_name: str
+		:param pos: The LU POS tag.
+		:type pos: str
+		:rtype: list[:class:`LexUnit`]
+		"""
+		if pos is not None:
+			return list(self.index('lu_lemma').get((clean_name, pos.lower()), []))
 
-	def detect_langs(self):
+		return list(self.index('lu_name').get(clean_name, []))
+
+	def frames_with_fe(self, name):
+		"""Returns all frames with a FE named ``name``, either in their own
+		language or in english.
+
+		:param name: The FE name.
+		:type name: str
+		:rtype: list[:class:`Frame`]
+		"""
+		return list(self.index('fe_name').get(name, []))
+
+	def prefetch_annotations(self, workers=None):
+		"""Loads the annotated sentences of all LUs whose annotations were not
+		read yet. LUs are grouped by their annotation source, so each source
+		reads its LUs at once, optionally using ``workers`` processes.
+
+		:param workers: Number of processes used to read annotations.
+		:type workers: int
+		"""
+		pending = defaultdict(list)
+
+		for frm in self.frames:
+			for lu in frm.lus:
+				if not lu.anno_loaded:
+					pending[lu.anno_source].append(lu)
+
+		for source, lus in pending.items():
+			annotations = source.read_annotations([lu.id for lu in lus], workers=workers)
+
+			for lu, lu_annotations in zip(lus, annotations):
+				lu.anno_sents = lu_annotations
+
+		self.annotations.compact()
+
+	def compact_annotations(self):
+		"""Compacts :attr:`annotations`, also dropping the annotations and
+		sentences that are no longer used by any LU, e.g., the ones of LUs
+		replaced by :func:`fnalign.loaders.reload`.
+		"""
+		lus = [
+			lu for frm in self.frames for lu in frm.lus
+			if lu.anno_loaded and lu.anno_store is self.annotations
+		]
+		views = [lu.anno_sents for lu in lus]
+
+		if sum(len(view) for view in views) < len(self.annotations):
+			ranges = self.annotations.retain((view.begin, view.end) for view in views)
+			for lu, (begin, end) in zip(lus, ranges):
+				lu.anno_sents = AnnotationView(self.annotations, begin, end)
+		else:
+			self.annotations.compact()
+
+	def detect_langs(self, frames=None, workers=None):
 		"""Sets languages of all FEs of this FrameNet. This method assumes that all
 		FEs of a frame are in the same language and to infer this language uses a
 		detection model and the concatenation of all of the FEs description of each
-		frame.
+		frame (see :func:`fnalign.languages.detect_all`).
 
+		:param frames: Frames to be processed instead of all frames.
+		:type frames: list[:class:`Frame`]
+		:param workers: Number of processes used to detect languages.
+		:type workers: int
 		"""
-		for frm in self.frames:
-			text = ' '.join(fe.definition for fe in frm.fes if fe.definition is not None)
+		texts = {}
+
+		for frm in (self.frames if frames is None else frames):
+			# FEs are stored in a set, definitions are sorted so that the same frame
+			# always gives the same text and detection cache key
+			text = ' '.join(sorted(fe.definition for fe in frm.fes if fe.definition is not None))
 
 			if text:
-				lang = detect(text)
-				frm.fe_lang = lang
-				for fe in frm.fes:
-					fe.lang = lang
+				texts[frm] = text
+
+		langs = detect_all(list(texts.values()), workers=workers)
+
+		for frm, lang in zip(texts, langs):
+			lang = intern_str(lang)
+			frm.fe_lang = lang
+			for fe in frm.fes:
+				fe.lang = lang
+
+
+def intern_str(value):
+	"""Returns the interned version of ``value`` (see :func:`sys.intern`) when it
+	is a string and ``value`` itself otherwise.
+
+	:param value: Any attribute value.
+	:returns: The interned string or ``value``.
+	"""
+	return sys.intern(value) if type(value) is str else value
 
 
-class Frame:
+class Compact:
+	"""Base class of FrameNet elements that are created by the thousands. They
+	declare their attributes in ``__slots__``, so instances have no
+	``__dict__``, and the attributes listed in ``interned`` hold strings that
+	repeat across instances (POS tags, FE types, language codes...), which are
+	interned on creation and again when unpickled.
+	"""
+
+	__slots__ = ()
+	interned = ()
+
+	def __getstate__(self):
+		return {
+			name: getattr(self, name)
+			for cls in type(self).__mro__ for name in getattr(cls, '__slots__', ())
+			if hasattr(self, name)
+		}
+
+	def __setstate__(self, state):
+		for name, value in state.items():
+			setattr(self, name, intern_str(value) if name in self.interned else value)
+
+
+class Frame(Compact):
 	"""A class used to represent a Frame.
 
 	This is a simplified representation of a frame containing only a small set of
 	attributes required for the frame aligment between two different databases.
 	"""
 
+	__slots__ = ('id', 'gid', 'name', 'name_en', 'definition', 'db_name', 'lang', 'lus', 'fes', 'fe_lang')
+	interned = ('db_name', 'lang', 'fe_lang')
+
 	def __init__(self, id, name, name_en, db_name, lang, definition=None):
 		"""Initializes a :class:`Frame` object.
 
@@ -81,28 +330,29 @@ class Frame:
 		self.name = name
 		self.name_en = name_en
 		self.definition = definition
-		self.db_name = db_name
-		self.lang = lang
+		self.db_name = intern_str(db_name)
+		self.lang = intern_str(lang)
 
 		self.lus = set()
 		self.fes = set()
 		self.fe_lang = None
 	
 	def core_fes(self):
-		"""Yields all core FEs of the frame.
+		"""Yields all core FEs of the frame. FEs without a type, e.g., those of
+		ChineseFN, are not core FEs.
 
 		:returns: An iterator over the core FEs of this frame.
 		:rtype: Iterator[:class:`FrameElement`]
 		"""
 		for fe in self.fes:
-			if fe.type.lower() == "core":
+			if fe.type is not None and fe.type.lower() == "core":
 				yield fe
 
 	def __str__(self):
 		return f'Frame(\'{self.name}.{self.lang}\')'
 
 
-class LexUnit:
+class LexUnit(Compact):
 	"""A class used to represent a lexical unit.
 
 	This is a simplified representation of a lexical unit containing only a small
@@ -110,41 +360,83 @@ class LexUnit:
 	databases.
 	"""
 
-	def __init__(self, _id, gid, name, pos, annotations):
+	__slots__ = ('id', 'gid', 'name', 'pos', 'clean_name', 'anno_source', 'anno_store', '_anno_range')
+	interned = ('pos',)
+
+	def __init__(self, _id, gid, name, pos, annotations, source=None, store=None):
 		"""Initializes a :class:`LexUnit` object assigning id, global id, name,
-		POS tag, annotated sentences and the preprocessed name.
+		POS tag, annotated sentences and the preprocessed name. Annotations are
+		kept in ``store``, the store of the LU FrameNet, or in a store of this LU
+		when none is given. When ``annotations`` is None, they are read from
+		``source`` (a loader) the first time :attr:`anno_sents` is used.
 		"""
 		self.id = _id
 		self.gid = gid
 		self.name = name
-		self.anno_sents = annotations
-		self.pos = pos.lower()
+		self.anno_source = source if annotations is None else None
+		self.anno_store = store if store is not None else AnnotationStore()
+		self._anno_range = None
+		self.pos = intern_str(pos.lower())
+
+		if annotations is not None:
+			self.anno_sents = annotations
 
 		clean_name = name[:-1-len(pos)].lower()
 		clean_name = re.sub(r"[\(\)\[\]]", "", clean_name)
 		clean_name = clean_name.replace("-", " ")
 		self.clean_name = clean_name
 
+	@property
+	def anno_sents(self):
+		"""The annotated sentences of this LU, a sequence of dicts with the
+		sentence and the target span (``lu_pos``). If they were not loaded yet,
+		they are read from :attr:`anno_source`.
+
+		:rtype: :class:`fnalign.annotations.AnnotationView`
+		"""
+		if self._anno_range is None:
+			self.anno_sents = self.anno_source.parse_annotations(self.id)
+
+		return AnnotationView(self.anno_store, *self._anno_range)
+
+	@anno_sents.setter
+	def anno_sents(self, annotations):
+		if isinstance(annotations, AnnotationView) and annotations.store is self.anno_store:
+			self._anno_range = (annotations.begin, annotations.end)
+		else:
+			self._anno_range = self.anno_store.add(annotations)
+
+	@property
+	def anno_loaded(self):
+		"""Whether the annotated sentences of this LU are already in memory.
+
+		:rtype: bool
+		"""
+		return self._anno_range is not None
+
 	def __str__(self):
 		return f'LexUnit(\'{self.name}.{self.pos}\')'
 
 
-class FrameElement:
+class FrameElement(Compact):
 	""" A class used to represent a frame element.
 
 	This is a simplified representation of a frame element that contains only a
 	set of attributes that are used for the multilingual alignment.
 	"""
 
+	__slots__ = ('id', 'name', 'name_en', 'type', 'abbrev', 'lang', 'definition')
+	interned = ('name', 'name_en', 'type', 'abbrev', 'lang')
+
 	def __init__(self, _id, name, name_en, etype, abbrev=None, definition=None):
 		"""Initializes a :class:`FrameElement` object assigning its id, name,
 		english name, type, name abbreviation and definition.
 		"""
 		self.id = _id
-		self.name = name
-		self.name_en = name_en
-		self.type = etype
-		self.abbrev = abbrev
+		self.name = intern_str(name)
+		self.name_en = intern_str(name_en)
+		self.type = intern_str(etype)
+		self.abbrev = intern_str(abbrev)
 		self.lang = None
 
 		if definition and definition.strip():
@@ -159,7 +451,8 @@ class FrameElement:
 class CustomEncoder(json.JSONEncoder):
 	"""A custom JSON encoder to be used when serializing :class:`Alignment`
 	instances to JSON. It adds support to :class:`numpy.ndarray` and :class:`set`
-	serialization.
+	serialization. Sparse matrices are serialized in CSR format as an object
+	with their ``shape``, ``indptr``, ``indices`` and ``values``.
 	"""
 
 	def default(self, obj):
@@ -169,6 +462,15 @@ class CustomEncoder(json.JSONEncoder):
 			return int(obj)
 		if isinstance(obj, set):
 			return list(obj)
+		elif sparse.issparse(obj):
+			obj = obj.tocsr()
+			return {
+				"format": "csr",
+				"shape": obj.shape,
+				"indptr": obj.indptr,
+				"indices": obj.indices,
+				"values": obj.data,
+			}
 		elif isinstance(obj, np.ndarray):
 			return obj.tolist()
 		else:
@@ -186,6 +488,17 @@ class Alignment():
 	common operations when aligning FrameNets - such as iteration over pair of
 	frames - and allow access to data generated by other alignment procedure/
 	techniques.
+
+	Scores are matrices of shape :attr:`shape` whose rows are english frames
+	and columns are l2 frames, in the order of :attr:`en_frm` and
+	:attr:`l2_frm`. Techniques can compute them at once from per-side arrays
+	(see :func:`frame_values`) instead of iterating over :func:`pairs`.
+
+	Each score in :attr:`scores` keeps its matrix in ``"matrix"``. Scores that
+	are mostly zeros are :class:`scipy.sparse.csr_matrix` instances, the others
+	are :class:`numpy.ndarray` instances and are also available as a
+	:class:`pandas.DataFrame` in ``"df"``. :func:`score_df` returns the
+	DataFrame of any score.
 	"""
 
 	def __init__(self, en_fn, l2_fn):
@@ -240,11 +553,16 @@ class Alignment():
 			for frame in self.frm["obj"]
 		}
 
-	def __get_alignments(self, ignore_scores=set()):
+	def __get_alignments(self, ignore_scores=set(), top_k=None, threshold=None):
 		"""Gets list of alignment scores of different techniques for serialization.
 
 		:param ignore_scores: set of alignment types to not dump scores.
 		:type ignore_scores: set
+		:param top_k: If given, scores are pruned by
+			:func:`fnalign.alignment.matrix.top_k` with this ``k`` and ``threshold``.
+		:type top_k: int
+		:param threshold: Scores kept regardless of ``top_k``.
+		:type threshold: float
 		:returns: A list of dictionaries contaning score's type and values.
 		:rtype: list[dict].
 		"""
@@ -253,8 +571,13 @@ class Alignment():
 		for score_obj in self.scores:
 			copy = score_obj.copy()
 			if score_obj['type'] not in ignore_scores:
-				copy["data"] = copy["df"].values
-			del copy["df"]
+				if top_k is None:
+					copy["data"] = copy["matrix"]
+				else:
+					copy["data"] = prune_top_k(copy["matrix"], top_k, threshold=threshold)
+					copy["pruning"] = {"top_k": top_k, "threshold": threshold}
+			copy.pop("df", None)
+			del copy["matrix"]
 			alignments.append(copy)
 
 		return alignments
@@ -276,8 +599,42 @@ class Alignment():
 		self.en_frm = self.frm[self.frm['lang'] == 'en']
 		self.l2_frm = self.frm[self.frm['lang'] != 'en']
 
+		# Row and column of each frame in score matrices
+		self.en_pos = {gid: i for i, gid in enumerate(self.en_frm.index)}
+		self.l2_pos = {gid: i for i, gid in enumerate(self.l2_frm.index)}
+
 		return self
 
+	@property
+	def shape(self):
+		"""The shape of score matrices, i.e., the number of english and l2 frames.
+
+		:rtype: tuple(int, int)
+		"""
+		return len(self.en_frm), len(self.l2_frm)
+
+	def frame_values(self, func, dtype=object):
+		"""Returns arrays with ``func(frame)`` for each english frame and each l2
+		frame, in the order of score matrix rows and columns respectively.
+
+		:param func: A function of a :class:`Frame`.
+		:type func: Callable[[:class:`Frame`], Any]
+		:param dtype: The array data type.
+		:type dtype: numpy.dtype
+		:returns: The english and l2 arrays.
+		:rtype: tuple(numpy.ndarray, numpy.ndarray)
+		"""
+		values = []
+
+		for frames in (self.en_frm['obj'], self.l2_frm['obj']):
+			# Filled item by item so that tuple or set values are not unpacked
+			array = np.empty(len(frames), dtype=dtype)
+			for i, frm in enumerate(frames):
+				array[i] = func(frm)
+			values.append(array)
+
+		return tuple(values)
+
 
 	def pairs(self):
 		"""Yields all possible pairs of frames betweem english and l2. The first
@@ -290,17 +647,26 @@ class Alignment():
 			yield x, y
 
 
-	def add_scores(self, aid, atype, data, **kwargs):
-		"""Adds a score matrix to this object data. The matrix should be inputed
+	def add_scores(self, aid, atype, data, as_sparse=None, **kwargs):
+		"""Adds a score matrix to this object data. The matrix can be inputed as a
+		:class:`numpy.ndarray` or a :mod:`scipy.sparse` matrix of shape
+		:attr:`shape`, which is stored without copying when its format is kept, or
 		as a list of scores for each possible alignment pair, i.e., its length must
 		be the same as the number of pairs yielded by :func:`pairs`.
 
+		Unless ``as_sparse`` is given, the matrix is stored in CSR format when at
+		most :data:`SPARSE_DENSITY` of its values are non-zero and as a dense array
+		otherwise.
+
 		:param aid: An unique identifier for the aligment score.
 		:type aid: str
 		:param atype: The aligment type identifier referencing the technique used.
 		:type atype: str
-		:param data: A score list with the same len as yielded by :func:`pairs`.
-		:type data: list[float]
+		:param data: A score matrix or a score list with the same len as yielded by
+			:func:`pairs`.
+		:type data: numpy.ndarray or scipy.sparse.spmatrix or list[float]
+		:param as_sparse: If the matrix should be stored in CSR format.
+		:type as_sparse: bool
 		:param desc: A small sentence to describe the techinque used to score.
 		:type desc: str
 		:param K: The K value used for nearest neighbors search used.
@@ -315,41 +681,111 @@ class Alignment():
 		# 	for i, s in zip(indices, norm):
 		# 		data[i] = s
 
-		self.scores.append({
-			"id": aid,
-			"type": atype,
-			"df": pd.DataFrame(
-				np.array(data).reshape(len(self.en_frm), len(self.l2_frm)),
+		if sparse.issparse(data) or (isinstance(data, np.ndarray) and data.ndim == 2):
+			if data.shape != self.shape:
+				raise ValueError(f'Score matrix shape {data.shape} differs from {self.shape}')
+			matrix = data
+		else:
+			matrix = np.array(data).reshape(self.shape)
+
+		if as_sparse is None:
+			nonzero = matrix.count_nonzero() if sparse.issparse(matrix) else np.count_nonzero(matrix)
+			as_sparse = nonzero <= SPARSE_DENSITY * matrix.shape[0] * matrix.shape[1]
+
+		if as_sparse:
+			matrix = sparse.csr_matrix(matrix)
+			if matrix.count_nonzero() < matrix.nnz:
+				# Arrays may be shared with the input matrix
+				matrix = matrix.copy()
+				matrix.eliminate_zeros()
+		elif sparse.issparse(matrix):
+			matrix = matrix.toarray()
+
+		score = {"id": aid, "type": atype, "matrix": matrix}
+
+		if not as_sparse:
+			score["df"] = pd.DataFrame(
+				matrix,
 				index=self.en_frm['name'],
 				columns=self.l2_frm['name'],
-			),
-			**kwargs
-		})
+				copy=False,
+			)
 
+		self.scores.append({**score, **kwargs})
 
-	def dump(self, ignore_scores=set()):
+	def score_df(self, score):
+		"""Returns a score matrix as a DataFrame indexed by english frame names
+		with a column for each l2 frame name. Dense scores already have it as
+		their ``"df"`` and sparse ones are converted to a dense DataFrame, which
+		is not stored.
+
+		:param score: A score of :attr:`scores` or its position.
+		:type score: dict or int
+		:rtype: pandas.DataFrame
+		"""
+		if isinstance(score, int):
+			score = self.scores[score]
+
+		if "df" in score:
+			return score["df"]
+
+		return pd.DataFrame(
+			score["matrix"].toarray(),
+			index=self.en_frm['name'],
+			columns=self.l2_frm['name'],
+			copy=False,
+		)
+
+
+	def dump(self, ignore_scores=set(), binary=False, precision='float32', top_k=None, threshold=None):
 		"""Serializes this object's data to JSON and saves it as a new file. All 
 		files are dumped to the "out" folder.
 
+		With ``binary``, the data is saved as a binary container instead, where
+		scores are raw arrays of ``precision`` values that can be memory-mapped
+		(see :mod:`fnalign.output`).
+
+		With ``top_k``, only the ``top_k`` best scores of each english frame and
+		of each l2 frame are dumped, plus the ones of at least ``threshold``, as
+		sparse matrices (see :func:`fnalign.alignment.matrix.top_k`).
+
 		:param ignore_scores: set of alignment types to not dump scores.
 		:type ignore_scores: set
+		:param binary: If the binary output format should be used.
+		:type binary: bool
+		:param precision: The values type of dense scores in binary outputs,
+			"float32" or "float16".
+		:type precision: str
+		:param top_k: Number of scores dumped for each frame, or None to dump all.
+		:type top_k: int
+		:param threshold: Scores dumped regardless of ``top_k``.
+		:type threshold: float
+		:returns: The path of the dumped file.
+		:rtype: str
 		"""
 		timestamp = datetime.now().strftime("%Y%m%d%H%M")
-		path = os.path.join('out', f'{timestamp}_{self.l2_fn.name}.json')
+		ext = output.BINARY_EXTENSION if binary else '.json'
+		path = os.path.join('out', f'{timestamp}_{self.l2_fn.name}{ext}')
 
 		try:
 			os.makedirs("out")
 		except FileExistsError:
 			pass
 
-		with open(path, 'w+') as fp:
-			json.dump({
-				"version": self.version,
-				"db": (self.en_fn.name, self.l2_fn.name),
-				"lang": (self.en_fn.lang, self.l2_fn.lang),
-				"indices": self.__get_indices(),
-				"frames": self.__get_frames(),
-				"alignments": self.__get_alignments(ignore_scores=ignore_scores),
-				"resources": self.resources,
-			}, fp, cls=CustomEncoder)
+		data = {
+			"version": self.version,
+			"db": (self.en_fn.name, self.l2_fn.name),
+			"lang": (self.en_fn.lang, self.l2_fn.lang),
+			"indices": self.__get_indices(),
+			"frames": self.__get_frames(),
+			"alignments": self.__get_alignments(
+				ignore_scores=ignore_scores, top_k=top_k, threshold=threshold),
+			"resources": self.resources,
+		}
+
+		if binary:
+			output.write(path, data, precision=precision, cls=CustomEncoder)
+		else:
+			output.write_json(path, data, cls=CustomEncoder)
 
+		return path
@@ -0,0 +1,239 @@
+"""This module contains the readers and writers of alignment outputs, which are
+written by :func:`fnalign.models.Alignment.dump` either as JSON, in the format
+described by ``schema.json``, or as a binary container. The container has the
+same data in a single file made of:
+
+* A header with the magic bytes ``FNALIGN\\0``, the format version, the
+  manifest length and the offset of the first score block, as little-endian
+  integers (see :data:`HEADER`).
+* A manifest, the UTF-8 encoded JSON output where the ``data`` of each
+  alignment describes the blocks that hold its scores instead of the scores.
+* Score blocks, raw little-endian arrays, each starting at a multiple of
+  :data:`BLOCK_ALIGNMENT` bytes.
+
+The ``data`` of dense scores is ``{"format": "dense", "values": block}``,
+where the block has shape [n, m] and float32 or float16 values. Sparse scores
+are stored in CSR format as ``{"format": "csr", "shape": [n, m], "indptr":
+block, "indices": block, "values": block}``, with float32 values since
+:mod:`scipy.sparse` does not operate on float16. Each block is described by
+its ``dtype``, ``shape`` and ``offset`` from the first block.
+
+:func:`read` maps the file to memory and returns its blocks as
+:class:`numpy.ndarray` views of the file, so scores are read on demand and
+never copied.
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import os
+import json
+import struct
+import numpy as np
+from scipy import sparse
+
+MAGIC = b'FNALIGN\0'
+BINARY_EXTENSION = '.fnalign'
+FORMAT_VERSION = 1
+BLOCK_ALIGNMENT = 64
+# Magic bytes, format version, manifest length and first block offset
+HEADER = struct.Struct('<8sIQQ')
+PRECISIONS = {'float32': '<f4', 'float16': '<f2'}
+# Number of values converted and written at once
+WRITE_SIZE = 2**20
+
+
+def is_binary(path):
+	"""Returns whether the file ``path`` is a binary alignment output.
+
+	:param path: The file path.
+	:type path: str
+	:rtype: bool
+	"""
+	with open(path, 'rb') as fp:
+		return fp.read(len(MAGIC)) == MAGIC
+
+
+def _padding(size):
+	"""Returns the number of bytes needed to align ``size`` to a block."""
+	return -size % BLOCK_ALIGNMENT
+
+
+class _BlockWriter():
+	"""Collects the score blocks of an output, assigning each one an offset
+	from the first block, and writes them.
+	"""
+
+	def __init__(self):
+		self.blocks = []
+		self.size = 0
+
+	def add(self, array, dtype):
+		"""Adds ``array`` as a block of ``dtype`` and returns its description."""
+		dtype = np.dtype(dtype)
+		desc = {"dtype": dtype.str, "shape": list(array.shape), "offset": self.size}
+
+		self.blocks.append((array, dtype))
+		self.size += array.size * dtype.itemsize
+		self.size += _padding(self.size)
+
+		return desc
+
+	def write(self, fp):
+		for array, dtype in self.blocks:
+			step = max(1, WRITE_SIZE * len(array) // max(array.size, 1))
+			for start in range(0, len(array), step):
+				fp.write(np.ascontiguousarray(array[start:start + step], dtype=dtype).data)
+			fp.write(b'\0' * _padding(array.size * dtype.itemsize))
+
+
+def write(path, output, precision='float32', cls=None):
+	"""Writes ``output`` to ``path`` as a binary container.
+
+	:param path: The output file path.
+	:type path: str
+	:param output: The alignment output, as written to JSON. The ``data`` of
+		each alignment may be a dense or a :mod:`scipy.sparse` matrix.
+	:type output: dict
+	:param precision: The values type of dense scores, "float32" or "float16".
+	:type precision: str
+	:param cls: The JSON encoder class used for the manifest.
+	:type cls: type
+	"""
+	if precision not in PRECISIONS:
+		raise ValueError(f'Unknown precision "{precision}", expected one of {list(PRECISIONS)}')
+
+	blocks = _BlockWriter()
+	alignments = []
+
+	for alignment in output["alignments"]:
+		alignment = alignment.copy()
+
+		if alignment.get("data") is not None:
+			alignment["data"] = _add_matrix(blocks, alignment["data"], PRECISIONS[precision])
+
+		alignments.append(alignment)
+
+	manifest = json.dumps({**output, "alignments": alignments}, cls=cls).encode('utf-8')
+	data_offset = HEADER.size + len(manifest)
+	data_offset += _padding(data_offset)
+
+	with open(path, 'wb') as fp:
+		fp.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(manifest), data_offset))
+		fp.write(manifest)
+		fp.write(b'\0' * (data_offset - HEADER.size - len(manifest)))
+		blocks.write(fp)
+
+
+def _add_matrix(blocks, matrix, dtype):
+	"""Adds the blocks of a score matrix and returns its ``data`` description."""
+	if sparse.issparse(matrix):
+		matrix = matrix.tocsr()
+		index_dtype = '<i4' if matrix.nnz < 2**31 else '<i8'
+
+		return {
+			"format": "csr",
+			"shape": list(matrix.shape),
+			"indptr": blocks.add(matrix.indptr, index_dtype),
+			"indices": blocks.add(matrix.indices, index_dtype),
+			"values": blocks.add(matrix.data, PRECISIONS['float32']),
+		}
+
+	matrix = np.asarray(matrix)
+	if matrix.ndim != 2:
+		raise ValueError(f'Score matrix must have 2 dimensions, not {matrix.ndim}')
+
+	return {"format": "dense", "values": blocks.add(matrix, dtype)}
+
+
+def read(path):
+	"""Reads the binary container ``path``. The ``data`` of each alignment is
+	a :class:`numpy.ndarray` or :class:`scipy.sparse.csr_matrix` backed by a
+	read-only memory map of the file.
+
+	:param path: The file path.
+	:type path: str
+	:returns: The alignment output.
+	:rtype: dict
+	:raises: ValueError when ``path`` is not a binary output of a known version.
+	"""
+	with open(path, 'rb') as fp:
+		header = fp.read(HEADER.size)
+		if len(header) < HEADER.size or not header.startswith(MAGIC):
+			raise ValueError(f'{path} is not a binary alignment output')
+
+		_, version, manifest_len, data_offset = HEADER.unpack(header)
+		if version != FORMAT_VERSION:
+			raise ValueError(f'{path} has format version {version}, expected {FORMAT_VERSION}')
+
+		output = json.loads(fp.read(manifest_len).decode('utf-8'))
+
+	if os.path.getsize(path) > data_offset:
+		blocks = np.memmap(path, dtype=np.uint8, mode='r', offset=data_offset)
+	else:
+		blocks = np.zeros(0, dtype=np.uint8)
+
+	for alignment in output["alignments"]:
+		if alignment.get("data") is not None:
+			alignment["data"] = _read_matrix(blocks, alignment["data"])
+
+	return output
+
+
+def _read_block(blocks, desc):
+	"""Returns the array of a block description as a view of ``blocks``."""
+	dtype = np.dtype(desc["dtype"])
+	nbytes = int(np.prod(desc["shape"], dtype=np.int64)) * dtype.itemsize
+	start = desc["offset"]
+
+	return blocks[start:start + nbytes].view(dtype).reshape(desc["shape"])
+
+
+def _read_matrix(blocks, data):
+	"""Returns the score matrix of an alignment ``data`` description."""
+	if data["format"] == "csr":
+		return sparse.csr_matrix((
+			_read_block(blocks, data["values"]),
+			_read_block(blocks, data["indices"]),
+			_read_block(blocks, data["indptr"]),
+		), shape=data["shape"], copy=False)
+
+	return _read_block(blocks, data["values"])
+
+
+def read_json(path):
+	"""Reads the JSON output ``path``. The ``data`` of each alignment is
+	converted to a :class:`numpy.ndarray` or, when stored in CSR format, to a
+	:class:`scipy.sparse.csr_matrix`.
+
+	:param path: The file path.
+	:type path: str
+	:returns: The alignment output.
+	:rtype: dict
+	"""
+	with open(path, 'r') as fp:
+		output = json.load(fp)
+
+	for alignment in output["alignments"]:
+		data = alignment.get("data")
+
+		if isinstance(data, dict):
+			alignment["data"] = sparse.csr_matrix(
+				(data["values"], data["indices"], data["indptr"]), shape=data["shape"])
+		elif data is not None:
+			alignment["data"] = np.array(data, dtype=np.float64)
+
+	return output
+
+
+def write_json(path, output, cls=None):
+	"""Writes ``output`` to ``path`` as JSON.
+
+	:param path: The output file path.
+	:type path: str
+	:param output: The alignment output.
+	:type output: dict
+	:param cls: The JSON encoder class, which must serialize score matrices.
+	:type cls: type
+	"""
+	with open(path, 'w+') as fp:
+		json.dump(output, fp, cls=cls)
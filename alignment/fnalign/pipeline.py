@@ -0,0 +1,362 @@
+"""This module contains a scheduler for the steps of an alignment run. Each
+:class:`Step` is either a technique that adds scores to an
+:class:`fnalign.models.Alignment` or a shared resource that techniques use,
+such as an embedding or FE vectors. Steps declare the names they require and
+produce, and a :class:`Pipeline` orders them by those names:
+
+* Base inputs are names of data a database has, such as frame ids that match
+  BFN's. They are given to :func:`Pipeline.run` for each database.
+* Steps whose requirements are neither base inputs nor produced by other
+  steps that run are skipped, and so are the steps that depend on them.
+* Each step runs once, after all steps it depends on, in a pool of threads.
+  Steps that don't depend on each other run at the same time.
+
+A step may raise :class:`MissingInput` when data it needs turns out not to
+exist, e.g., an embedding file, which skips it and its dependents as well.
+
+When :func:`Pipeline.run` is given a :class:`fnalign.results.ResultCache`,
+the results of steps created with ``cache=True`` are read from it when their
+key exists, and written to it otherwise. Steps are then only run when their
+result is not cached or a step that runs depends on them, so embeddings
+needed only by cached techniques are never loaded.
+
+>>> pipeline = Pipeline([
+... 	Step("wordnet", lambda a, r: wordnet.set_resources(a)),
+... 	Step("lu_wordnet", lambda a, r: wordnet.lu_matching(a), requires=["wordnet"]),
+... 	Step("id_matching", lambda a, r: attribute.id_matching(a), requires=["frame_ids"]),
+... ])
+>>> pipeline.run(alignment, inputs=[])  # id_matching is skipped
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import os
+import time
+import logging
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+class MissingInput(Exception):
+	"""Raised by a step when data it requires does not exist."""
+	pass
+
+
+class Step():
+	"""A step of an alignment run.
+
+	:param name: The step name, which is also the name of its result.
+	:type name: str
+	:param func: The function that runs the step. It receives the alignment and
+		a dictionary with the result of each step required by this one, and
+		returns the step result.
+	:type func: Callable[[:class:`fnalign.models.Alignment`, dict], Any]
+	:param requires: Names of the base inputs and step results required.
+	:type requires: Iterable[str]
+	:param produces: Other names this step makes available, such as the ids of
+		the scores it adds.
+	:type produces: Iterable[str]
+	:param params: The parameters given to the technique, part of its cache key.
+	:type params: dict
+	:param cache: Whether the result of this step should be cached.
+	:type cache: bool
+	:param resources: The keys of :attr:`fnalign.models.Alignment.resources`
+		set by this step, which are cached with its scores.
+	:type resources: Iterable[str]
+	:param fingerprint: A function of the alignment that returns a digest of
+		data this step reads besides the FrameNets, e.g., an embedding file. It
+		may raise :class:`MissingInput`.
+	:type fingerprint: Callable[[:class:`fnalign.models.Alignment`], str]
+	"""
+
+	def __init__(self, name, func, requires=(), produces=(), params=None, cache=False,
+		resources=(), fingerprint=None):
+		self.name = name
+		self.func = func
+		self.requires = frozenset(requires)
+		self.produces = frozenset([name, *produces])
+		self.params = params or {}
+		self.cache = cache
+		self.resources = tuple(resources)
+		self.fingerprint = fingerprint
+
+	def __repr__(self):
+		return f'Step({self.name!r})'
+
+
+class ScoreRecorder():
+	"""Records the scores each step adds to ``alignment`` while steps run in
+	threads. Inside the context, :func:`fnalign.models.Alignment.add_scores`
+	of ``alignment`` is replaced by a function that also keeps the added score
+	in :attr:`scores` under the step running in the calling thread.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`fnalign.models.Alignment`
+	"""
+
+	def __init__(self, alignment):
+		self.alignment = alignment
+		self.scores = defaultdict(list)
+		self._lock = threading.Lock()
+		self._local = threading.local()
+
+	def __enter__(self):
+		add_scores = self.alignment.add_scores
+
+		def record(*args, **kwargs):
+			# Scores are appended one at a time so that the last one is this call's
+			with self._lock:
+				add_scores(*args, **kwargs)
+				self.scores[getattr(self._local, 'step', None)].append(self.alignment.scores[-1])
+
+		self.alignment.add_scores = record
+		return self
+
+	def __exit__(self, *exc_info):
+		del self.alignment.add_scores
+
+	@contextmanager
+	def step(self, step):
+		"""Records the scores added by the current thread as added by ``step``."""
+		self._local.step = step
+		try:
+			yield
+		finally:
+			self._local.step = None
+
+
+class Pipeline():
+	"""A set of :class:`Step` objects run in dependency order.
+
+	:param steps: The steps, in the order their scores are kept.
+	:type steps: list[:class:`Step`]
+	:raises: ValueError when two steps produce the same name.
+	"""
+
+	def __init__(self, steps):
+		self.steps = list(steps)
+		self.producers = {}
+
+		for step in self.steps:
+			for name in step.produces:
+				if name in self.producers:
+					raise ValueError(f'"{name}" is produced by {self.producers[name]} and {step}')
+				self.producers[name] = step
+
+	def plan(self, inputs):
+		"""Returns the steps that can run with base ``inputs`` and the missing
+		requirements of the others.
+
+		:param inputs: The available base inputs.
+		:type inputs: Iterable[str]
+		:returns: The steps to run, in an order where each one comes after its
+			dependencies, and a mapping of each skipped step name to its missing
+			requirements.
+		:rtype: tuple(list[:class:`Step`], dict[str, set[str]])
+		"""
+		available = set(inputs)
+		planned = []
+		remaining = list(self.steps)
+
+		# Steps are added once their requirements are met until none is
+		while True:
+			ready = [step for step in remaining if step.requires <= available]
+			if not ready:
+				break
+			for step in ready:
+				planned.append(step)
+				remaining.remove(step)
+				available |= step.produces
+
+		return planned, {step.name: set(step.requires - available) for step in remaining}
+
+	def dependencies(self, step, inputs):
+		"""Returns the steps that produce requirements of ``step`` which are not
+		base ``inputs``.
+		"""
+		return {
+			self.producers[name] for name in step.requires
+			if name not in inputs and name in self.producers
+		}
+
+	def keys(self, alignment, planned, deps, inputs, cache):
+		"""Computes the cache key of each planned step from its own data and the
+		keys of its dependencies. Steps whose fingerprint raises
+		:class:`MissingInput`, and their dependents, have no key.
+
+		:returns: The key of each step, or None.
+		:rtype: dict[:class:`Step`, str]
+		"""
+		fingerprints = [alignment.en_fn.fingerprint(), alignment.l2_fn.fingerprint()]
+		keys = {}
+
+		for step in planned:
+			dep_keys = [keys[dep] for dep in sorted(deps[step], key=lambda d: d.name)]
+
+			try:
+				own = [step.fingerprint(alignment)] if step.fingerprint is not None else []
+			except MissingInput:
+				own = None
+
+			if own is None or None in dep_keys:
+				keys[step] = None
+			else:
+				base = sorted(step.requires & inputs)
+				keys[step] = cache.key(step.name, step.params, step.func, fingerprints + base + own + dep_keys)
+
+		return keys
+
+	@staticmethod
+	def needed(planned, deps, cached):
+		"""Returns the planned steps that must run when the results of steps named
+		in ``cached`` are read from cache. Steps only needed by cached ones don't
+		run.
+		"""
+		needed = set()
+		for step in reversed(planned):
+			dependents = [s for s in planned if step in deps[s]]
+			if step.name not in cached and (
+				step.cache or not dependents or any(s in needed for s in dependents)):
+				needed.add(step)
+		return needed
+
+	def cached(self, alignment, inputs, cache):
+		"""Returns the names of the steps that can run with base ``inputs`` but
+		would not, because their results, or those of all steps that need them,
+		are in ``cache``.
+
+		:param alignment: An :class:`Alignment` instance.
+		:type alignment: :class:`fnalign.models.Alignment`
+		:param inputs: The available base inputs.
+		:type inputs: Iterable[str]
+		:param cache: The cache of step results.
+		:type cache: :class:`fnalign.results.ResultCache`
+		:rtype: set[str]
+		"""
+		inputs = set(inputs)
+		planned, _ = self.plan(inputs)
+		deps = {step: self.dependencies(step, inputs) for step in planned}
+		keys = self.keys(alignment, planned, deps, inputs, cache)
+
+		cached = {
+			step.name for step in planned
+			if step.cache and keys[step] and os.path.exists(cache.file(keys[step]))
+		}
+		needed = self.needed(planned, deps, cached)
+
+		return {step.name for step in planned if step not in needed}
+
+	def run(self, alignment, inputs, workers=None, cache=None):
+		"""Runs the steps that can run with base ``inputs`` on ``alignment``. The
+		scores added by steps are ordered as the steps that produce them.
+
+		:param alignment: An :class:`Alignment` instance.
+		:type alignment: :class:`fnalign.models.Alignment`
+		:param inputs: The available base inputs.
+		:type inputs: Iterable[str]
+		:param workers: Number of threads, the number of CPUs by default.
+		:type workers: int
+		:param cache: The cache of step results.
+		:type cache: :class:`fnalign.results.ResultCache`
+		:returns: The result of each step that ran or was read from cache.
+		:rtype: dict[str, Any]
+		:raises: The exception raised by any step, other than
+			:class:`MissingInput`, after the running ones are finished.
+		"""
+		logger = logging.getLogger('alignment')
+		inputs = set(inputs)
+		planned, skipped = self.plan(inputs)
+
+		for name, missing in skipped.items():
+			logger.info(f'{name} skipped, missing {", ".join(sorted(missing))}')
+
+		deps = {step: self.dependencies(step, inputs) for step in planned}
+		first_score = len(alignment.scores)
+		recorder = ScoreRecorder(alignment)
+		results = {}
+		failed = set()
+		running = {}
+		error = None
+		keys = {}
+
+		# Scores restored from cache and added by steps are recorded
+		with recorder:
+			if cache is not None:
+				keys = self.keys(alignment, planned, deps, inputs, cache)
+
+				for step in planned:
+					entry = cache.read(keys[step]) if step.cache and keys[step] else None
+					if entry is not None:
+						with recorder.step(step):
+							results[step.name] = cache.restore(alignment, entry)
+						logger.info(f'{step.name} read from cache')
+
+				needed = self.needed(planned, deps, results)
+			else:
+				needed = set(planned)
+
+			def call(step):
+				start_time = time.time()
+				requires = {name: results[name] for name in step.requires if name in results}
+				with recorder.step(step):
+					value = step.func(alignment, requires)
+				logger.info(f'{step.name} finished --- {time.time() - start_time:.2f} seconds ---')
+
+				if cache is not None and step.cache and keys[step]:
+					cache.write(
+						keys[step], value,
+						list(recorder.scores[step]),
+						{k: alignment.resources[k] for k in step.resources if k in alignment.resources})
+
+				return value
+
+			with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+				pending = [step for step in planned if step in needed]
+
+				while pending or running:
+					if error is None:
+						blocked = [s for s in pending if deps[s] & failed]
+						while blocked:
+							for step in blocked:
+								pending.remove(step)
+								failed.add(step)
+								names = ", ".join(sorted(d.name for d in deps[step] & failed))
+								logger.info(f'{step.name} skipped, {names} did not run')
+							blocked = [s for s in pending if deps[s] & failed]
+
+						for step in [s for s in pending if all(d.name in results for d in deps[s])]:
+							pending.remove(step)
+							running[pool.submit(call, step)] = step
+					else:
+						pending = []
+
+					if not running:
+						break
+
+					done, _ = wait(running, return_when=FIRST_COMPLETED)
+
+					for future in done:
+						step = running.pop(future)
+						try:
+							results[step.name] = future.result()
+						except MissingInput as e:
+							failed.add(step)
+							logger.info(f'{step.name} skipped, {e}')
+						except Exception as e:
+							failed.add(step)
+							error = error or e
+
+		if error is not None:
+			raise error
+
+		# Threads add scores as they finish, so they are sorted by the position of
+		# the step that added them
+		order = {}
+		for i, step in enumerate(self.steps):
+			order.update((id(score), i) for score in recorder.scores[step])
+		alignment.scores[first_score:] = sorted(
+			alignment.scores[first_score:], key=lambda score: order.get(id(score), len(self.steps)))
+
+		return results
@@ -0,0 +1,440 @@
+"""This module contains a planner that estimates the runtime and peak memory
+of alignment techniques before they run, so that jobs that would exceed a
+budget are refused instead of failing hours later.
+
+Each technique has a cost model in :data:`MODELS` that counts, from the frame,
+LU and FE counts of an :class:`fnalign.models.Alignment` and the size of the
+embeddings, the amount of work of each kind it does:
+
+* ``cell``: numpy element-wise operations on score matrices.
+* ``item``: Python-level operations, such as adding an item to a set.
+* ``flop``: floating-point operations of matrix products.
+* ``scan``: vector values read by brute-force nearest neighbor searches.
+* ``word``: words looked up in an embedding when inferring a text vector.
+* ``parse``: values parsed from embedding text files.
+* ``wordnet``: WordNet synset lookups.
+
+:func:`calibrate` measures the seconds each unit of work takes on this machine
+with a micro-benchmark, and :func:`estimate` multiplies both. Models also give
+the bytes a technique holds at its peak, and whether it keeps them after it
+finishes, as embeddings do.
+
+>>> constants = calibrate()
+>>> plan = estimate(alignment, ["core_fe_matching", "lu_muse"], constants,
+... 	embeddings={"muse": (200000, 300)})
+>>> print_plan(plan)
+>>> check_budget(plan, max_seconds=3600, max_memory=8 * 2**30)
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import time
+from collections import Counter
+import numpy as np
+
+# Seconds per WordNet lookup used when the WordNet corpus is not available
+DEFAULT_WORDNET_LOOKUP = 2e-4
+
+# Average number of synsets of a LU, used before WordNet resources exist
+SYNSETS_PER_LU = 3
+
+# Dimension of embeddings whose size is not given to estimate()
+DEFAULT_DIMS = {"muse": 300, "bert": 768}
+
+# Python operations to normalize a frame name and collect its trigrams, about
+# two per character of a 20 characters name
+NAME_ITEMS = 40
+
+# Bytes of each LU synset in the WordNet mappings. The synset name is in a set
+# of lu_to_syn, syn_to_lu and frm_to_syn, at about 70 bytes per set entry.
+SYNSET_BYTES = 200
+
+# Fraction of frame pairs, and of english LU and l2 frame pairs, that share a
+# synset, used before WordNet resources exist. Resources give exact counts.
+SYNSET_PAIR_DENSITY = 0.01
+
+
+class BudgetExceeded(Exception):
+	"""Raised by :func:`check_budget` when a plan exceeds the budget."""
+	pass
+
+
+def _best_time(func, repeat):
+	best = None
+	for _ in range(repeat):
+		start_time = time.perf_counter()
+		func()
+		elapsed = time.perf_counter() - start_time
+		best = elapsed if best is None else min(best, elapsed)
+	return best
+
+
+def calibrate(repeat=3):
+	"""Measures the seconds per unit of each kind of work on this machine. It
+	takes about a second.
+
+	:param repeat: Number of runs of each measure, the best one is used.
+	:type repeat: int
+	:returns: The seconds per unit of each kind of work.
+	:rtype: dict[str, float]
+	"""
+	rng = np.random.RandomState(0)
+	constants = {}
+
+	cells = rng.random_sample((1000, 1000))
+	counts = rng.randint(0, 3, size=(1000, 1000))
+	constants["cell"] = _best_time(
+		lambda: np.divide(counts, cells, out=np.zeros(cells.shape), where=counts != 0),
+		repeat) / cells.size
+
+	items = [(i % 5000, f'item{i % 20000}') for i in range(200000)]
+
+	def index_items():
+		index = {}
+		for key, value in items:
+			index.setdefault(key, set()).add(value)
+
+	constants["item"] = _best_time(index_items, repeat) / len(items)
+
+	a = rng.standard_normal((1024, 300)).astype(np.float32)
+	b = rng.standard_normal((300, 4096)).astype(np.float32)
+	constants["flop"] = _best_time(lambda: a @ b, repeat) / (2 * 1024 * 300 * 4096)
+
+	vecs = rng.standard_normal((50000, 300)).astype(np.float32)
+	queries = rng.standard_normal((20, 300)).astype(np.float32)
+	constants["scan"] = _best_time(lambda: [vecs @ q for q in queries], repeat) / (len(queries) * vecs.size)
+
+	words = {f'w{i}': i for i in range(10000)}
+	texts = [' '.join(f'w{(i * 7 + j) % 12000}' for j in range(10)) for i in range(1000)]
+
+	def infer():
+		for text in texts:
+			ids = [words[w] for w in text.split() if w in words]
+			np.mean(vecs[ids], axis=0)
+
+	constants["word"] = _best_time(infer, repeat) / (len(texts) * 10)
+
+	line = ' '.join(f'{x:.5f}' for x in rng.standard_normal(300))
+	constants["parse"] = _best_time(
+		lambda: [np.array(line.split(' '), dtype=np.float32) for _ in range(200)],
+		repeat) / (200 * 300)
+
+	try:
+		from nltk.corpus import wordnet as wn
+		lemmas = ['run', 'house', 'give', 'quickly', 'red', 'animal', 'tell', 'water']
+		constants["wordnet"] = _best_time(lambda: [wn.synsets(l) for l in lemmas], repeat) / len(lemmas)
+	except (ImportError, LookupError):
+		constants["wordnet"] = DEFAULT_WORDNET_LOOKUP
+
+	return constants
+
+
+class Stats():
+	"""The counts used by cost models, taken from an alignment.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`fnalign.models.Alignment`
+	:param embeddings: The number of vectors and dimension of the embeddings,
+		by name ("muse" or "bert"). A number of vectors of None means one vector
+		per LU.
+	:type embeddings: dict[str, tuple(int, int)]
+	"""
+
+	def __init__(self, alignment, embeddings=None):
+		self.n_en, self.n_l2 = alignment.shape
+		self.cells = self.n_en * self.n_l2
+
+		en_frames, l2_frames = list(alignment.en_frm["obj"]), list(alignment.l2_frm["obj"])
+		self.lus_en = sum(len(frm.lus) for frm in en_frames)
+		self.lus_l2 = sum(len(frm.lus) for frm in l2_frames)
+		self.fes_en = sum(len(frm.fes) for frm in en_frames)
+		self.fes_l2 = sum(len(frm.fes) for frm in l2_frames)
+
+		# FEs are compared by english name when they have one, as in FE matching
+		en_core = Counter(fe.name_en or fe.name for frm in en_frames for fe in frm.core_fes())
+		l2_core = Counter(fe.name_en or fe.name for frm in l2_frames for fe in frm.core_fes())
+		self.core_en, self.core_l2 = sum(en_core.values()), sum(l2_core.values())
+		# Pairs of core FEs with the same name, compared by exact FE matching
+		self.core_name_pairs = sum(count * l2_core[name] for name, count in en_core.items())
+		en_names = Counter(fe.name_en or fe.name for frm in en_frames for fe in frm.fes)
+		l2_names = Counter(fe.name_en or fe.name for frm in l2_frames for fe in frm.fes)
+		self.name_pairs = sum(count * l2_names[name] for name, count in en_names.items())
+
+		self.def_words = sum(_words(frm.definition) for frm in en_frames + l2_frames)
+		self.fe_def_words = sum(
+			_words(fe.definition) + _words(fe.name)
+			for frm in en_frames + l2_frames for fe in frm.core_fes())
+
+		lu_to_syn = alignment.resources.get("lu_to_syn")
+		frm_to_syn = alignment.resources.get("frm_to_syn")
+		if lu_to_syn and frm_to_syn:
+			self.synsets = sum(len(s) for s in lu_to_syn.values())
+			# Pairs sharing each synset, i.e., the work of sparse intersection products
+			en_syn = Counter(syn for frm in en_frames for syn in frm_to_syn.get(frm.gid, ()))
+			l2_syn = Counter(syn for frm in l2_frames for syn in frm_to_syn.get(frm.gid, ()))
+			en_lu_syn = Counter(
+				syn for frm in en_frames for lu in frm.lus for syn in lu_to_syn.get(lu.gid, ()))
+			self.synset_pairs = sum(count * l2_syn[syn] for syn, count in en_syn.items())
+			self.lu_synset_pairs = sum(count * l2_syn[syn] for syn, count in en_lu_syn.items())
+		else:
+			self.synsets = (self.lus_en + self.lus_l2) * SYNSETS_PER_LU
+			self.synset_pairs = int(SYNSET_PAIR_DENSITY * self.cells)
+			self.lu_synset_pairs = int(SYNSET_PAIR_DENSITY * self.lus_en * self.n_l2)
+
+		self.embeddings = {}
+		for name, dim in DEFAULT_DIMS.items():
+			size, dim = (embeddings or {}).get(name, (None, dim))
+			self.embeddings[name] = (size if size is not None else self.lus_l2, dim)
+
+
+def _words(text):
+	return len(text.split()) if text else 0
+
+
+def _hash_join(s, l2_values=1):
+	frames = s.n_en + l2_values * s.n_l2
+	# Values are read into arrays by frame_values, then indexed and looked up
+	return {"item": 8 * frames}, 100 * frames, False
+
+
+def _fe_matching(s, core):
+	fes = s.core_en + s.core_l2 if core else s.fes_en + s.fes_l2
+	# Intersections are the product of sparse incidence matrices
+	pairs = s.core_name_pairs if core else s.name_pairs
+	# The product costs less per pair than the divisions of its non-zeros
+	nonzero = min(pairs, s.cells)
+	return {"item": 2 * fes, "cell": pairs // 2 + 4 * nonzero}, 3 * 16 * nonzero, False
+
+
+def _embedding(s, name, lang):
+	size, dim = s.embeddings[name]
+	if name == "bert":
+		size = s.lus_en if lang == "en" else s.lus_l2
+	# Vectors are normalized into a copy
+	return {"parse": size * dim, "item": 2 * size}, 2 * 4 * size * dim, True
+
+
+def _lu_neighbors(s, name, K=5):
+	size, dim = s.embeddings[name]
+	index = size + (s.lus_l2 if name == "muse" else 0)
+	units = {
+		"scan": s.lus_en * index * dim,
+		"word": 2 * (s.lus_en + s.lus_l2),
+		"item": s.lus_en * K * 4,
+		"cell": 4 * s.cells,
+	}
+	return units, 4 * index * dim + 3 * 8 * s.cells, False
+
+
+def _frame_vectors(s, name, words):
+	dim = s.embeddings[name][1]
+	units = {"word": words, "flop": 2 * s.cells * dim, "cell": 4 * s.cells}
+	return units, 8 * (s.n_en + s.n_l2) * dim + 3 * 8 * s.cells, False
+
+
+def _fe_vectors(s):
+	dim = s.embeddings["muse"][1]
+	return {"word": s.fe_def_words}, 2 * 8 * (s.core_en + s.core_l2) * dim, True
+
+
+def _muse_fe_match(s):
+	dim = s.embeddings["muse"][1]
+	units = {"flop": 4 * s.core_en * s.core_l2 * dim + 2 * s.core_en * s.core_l2 * s.n_l2, "cell": 4 * s.cells}
+	# FE similarities are computed in blocks of FE_BLOCK_SIZE pairs
+	return units, 3 * 8 * min(s.core_en * s.core_l2, 2**22) + 2 * 8 * s.cells, False
+
+
+def _muse_exact_fe_match(s):
+	dim = s.embeddings["muse"][1]
+	units = {"flop": 2 * s.core_name_pairs * dim, "item": 2 * (s.core_en + s.core_l2), "cell": 8 * s.cells}
+	return units, 4 * 8 * s.cells, False
+
+
+def _synset_overlap(s, pairs, cells, items):
+	# Intersections are a sparse product with an entry per pair of rows sharing
+	# a synset, which has at most ``cells`` non-zeros. Building the incidence
+	# matrices takes ``items`` operations per LU synset.
+	units = {"item": items * s.synsets, "cell": 4 * pairs}
+	return units, 3 * 16 * min(pairs, cells) + 10 * items * s.synsets, False
+
+
+# Cost models by technique step name, as in main.PIPELINE. Each one returns the
+# units of work of each kind, the peak bytes and whether they are kept.
+MODELS = {
+	"id_matching": _hash_join,
+	"name_matching": lambda s: _hash_join(s, 2),
+	# Shared trigrams of pairs are counted by a sparse product
+	"fuzzy_name_matching": lambda s: (
+		{"item": NAME_ITEMS * (s.n_en + 2 * s.n_l2), "cell": 2 * s.cells}, 2 * 16 * s.cells, False),
+	"core_fe_matching": lambda s: _fe_matching(s, True),
+	"all_fe_matching": lambda s: _fe_matching(s, False),
+	"wordnet": lambda s: (
+		{"wordnet": s.lus_en + s.lus_l2, "item": 4 * s.synsets},
+		SYNSET_BYTES * s.synsets, True),
+	# LUs are grouped by english frame and l2 synsets are merged per frame
+	"lu_wordnet": lambda s: _synset_overlap(s, s.lu_synset_pairs, s.lus_en * s.n_l2, 8),
+	"synset": lambda s: _synset_overlap(s, s.synset_pairs, s.cells, 4),
+	"muse_en": lambda s: _embedding(s, "muse", "en"),
+	"muse_l2": lambda s: _embedding(s, "muse", "l2"),
+	"fe_vecs": _fe_vectors,
+	"muse_fe_match": _muse_fe_match,
+	"muse_exact_fe_match": _muse_exact_fe_match,
+	"muse_mixed_fe_match": lambda s: ({"cell": 2 * s.cells}, 2 * 8 * s.cells, False),
+	"lu_muse": lambda s: _lu_neighbors(s, "muse"),
+	"lu_mean_muse": lambda s: _frame_vectors(s, "muse", 2 * (s.lus_en + s.lus_l2)),
+	"frame_def_muse": lambda s: _frame_vectors(s, "muse", s.def_words),
+	"bert_en": lambda s: _embedding(s, "bert", "en"),
+	"bert_l2": lambda s: _embedding(s, "bert", "l2"),
+	"lu_bert": lambda s: _lu_neighbors(s, "bert"),
+	"lu_mean_bert": lambda s: _frame_vectors(s, "bert", 0),
+}
+
+
+class Estimate():
+	"""The estimated cost of a technique.
+
+	:param name: The technique name.
+	:type name: str
+	:param seconds: The estimated runtime, or None when the technique has no
+		cost model.
+	:type seconds: float
+	:param memory: The estimated peak memory in bytes.
+	:type memory: int
+	:param kept: Whether the memory is kept after the technique finishes.
+	:type kept: bool
+	:param cached: Whether the result is read from cache, so it costs nothing.
+	:type cached: bool
+	"""
+
+	def __init__(self, name, seconds=None, memory=0, kept=False, cached=False):
+		self.name = name
+		self.seconds = seconds
+		self.memory = memory
+		self.kept = kept
+		self.cached = cached
+
+	def __repr__(self):
+		return f'Estimate({self.name!r}, seconds={self.seconds}, memory={self.memory})'
+
+
+class Plan():
+	"""The estimates of all techniques of a run.
+
+	:param estimates: The estimate of each technique.
+	:type estimates: list[:class:`Estimate`]
+	:param threads: Number of techniques run at once.
+	:type threads: int
+	"""
+
+	def __init__(self, estimates, threads=1):
+		self.estimates = estimates
+		self.threads = threads
+
+	@property
+	def seconds(self):
+		"""The estimated total runtime if techniques ran one after another."""
+		return sum(e.seconds or 0 for e in self.estimates if not e.cached)
+
+	@property
+	def memory(self):
+		"""The estimated peak memory: all memory that is kept, such as
+		embeddings, plus the largest peaks of ``threads`` other techniques.
+		"""
+		active = [e for e in self.estimates if not e.cached]
+		kept = sum(e.memory for e in active if e.kept)
+		peaks = sorted((e.memory for e in active if not e.kept), reverse=True)
+		return kept + sum(peaks[:max(1, self.threads)])
+
+
+def estimate(alignment, techniques, constants, embeddings=None, cached=(), threads=1):
+	"""Estimates the runtime and memory of ``techniques`` on ``alignment``.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`fnalign.models.Alignment`
+	:param techniques: The technique names, as in :data:`MODELS`.
+	:type techniques: list[str]
+	:param constants: The seconds per unit of work, as returned by
+		:func:`calibrate`.
+	:type constants: dict[str, float]
+	:param embeddings: The number of vectors and dimension of the embeddings,
+		as in :class:`Stats`.
+	:type embeddings: dict[str, tuple(int, int)]
+	:param cached: Names of techniques whose results are cached.
+	:type cached: Iterable[str]
+	:param threads: Number of techniques run at once.
+	:type threads: int
+	:rtype: :class:`Plan`
+	"""
+	stats = Stats(alignment, embeddings)
+	cached = set(cached)
+	estimates = []
+
+	for name in techniques:
+		if name not in MODELS:
+			estimates.append(Estimate(name, cached=name in cached))
+			continue
+
+		units, memory, kept = MODELS[name](stats)
+		seconds = sum(count * constants[kind] for kind, count in units.items())
+		estimates.append(Estimate(name, seconds, int(memory), kept, name in cached))
+
+	return Plan(estimates, threads)
+
+
+def _format_seconds(seconds):
+	if seconds is None:
+		return "?"
+	if seconds < 60:
+		return f'{seconds:.1f} s'
+	if seconds < 3600:
+		return f'{seconds / 60:.1f} min'
+	return f'{seconds / 3600:.1f} h'
+
+
+def format_plan(plan, title=None):
+	"""Formats ``plan`` as a table with a line per technique and the totals.
+
+	:param plan: The plan.
+	:type plan: :class:`Plan`
+	:param title: A title line, e.g., the database name.
+	:type title: str
+	:rtype: str
+	"""
+	lines = [title] if title else []
+	lines.append(f'{"technique":<24}{"time":>12}{"memory (MB)":>14}')
+
+	for e in plan.estimates:
+		seconds = "cached" if e.cached else _format_seconds(e.seconds)
+		memory = "-" if e.cached or e.seconds is None else f'{e.memory / 2**20:.0f}'
+		lines.append(f'{e.name:<24}{seconds:>12}{memory:>14}')
+
+	lines.append(f'{"total":<24}{_format_seconds(plan.seconds):>12}{plan.memory / 2**20:>14.0f}')
+
+	return '\n'.join(lines)
+
+
+def print_plan(plan, title=None):
+	"""Prints ``plan`` as formatted by :func:`format_plan`."""
+	print(format_plan(plan, title))
+
+
+def check_budget(plan, max_seconds=None, max_memory=None):
+	"""Checks that ``plan`` fits in the budget.
+
+	:param plan: The plan.
+	:type plan: :class:`Plan`
+	:param max_seconds: Maximum total runtime.
+	:type max_seconds: float
+	:param max_memory: Maximum peak memory in bytes.
+	:type max_memory: int
+	:raises: :class:`BudgetExceeded` when an estimate is over the budget.
+	"""
+	if max_seconds is not None and plan.seconds > max_seconds:
+		raise BudgetExceeded(
+			f'Estimated time of {_format_seconds(plan.seconds)} exceeds '
+			f'the budget of {_format_seconds(max_seconds)}')
+
+	if max_memory is not None and plan.memory > max_memory:
+		raise BudgetExceeded(
+			f'Estimated memory of {plan.memory / 2**20:.0f} MB exceeds '
+			f'the budget of {max_memory / 2**20:.0f} MB')
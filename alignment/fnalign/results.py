@@ -0,0 +1,319 @@
+"""This module contains a content-addressed cache of the results of alignment
+techniques, used by :func:`fnalign.pipeline.Pipeline.run`. Each result is
+stored in a file named after a key that digests everything the result
+depends on:
+
+* The technique name and parameters.
+* The code of the technique, i.e., the source of its function and of every
+  project function and class it references, recursively, and of the
+  :data:`SHARED_MODULES` (see :func:`code_digest`). Other techniques are not
+  part of the key, so changing one technique only runs that one again.
+* The fingerprints of both FrameNets (see
+  :func:`fnalign.models.FrameNet.fingerprint`).
+* The keys of the steps it depends on, and so the digests of the contents of
+  the embeddings they load (see :func:`file_fingerprint`).
+
+Changing any of those changes the key, so outdated results are never read and
+don't need to be invalidated. Entries have the scores and resources a
+technique added to the :class:`fnalign.models.Alignment`, which are added
+back on a hit.
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import os
+import types
+import pickle
+import hashlib
+import inspect
+import importlib
+from scipy import sparse
+
+RESULTS_VERSION = 2
+RESULTS_DIR = os.path.join("data", "cache", "results")
+
+# Digests of file contents by path, size and modification time
+FINGERPRINTS_VERSION = 1
+FINGERPRINTS_PATH = os.path.join(RESULTS_DIR, "fingerprints.pkl")
+FINGERPRINT_CHUNK = 2**20
+
+# Functions and classes in files under this folder are part of code digests
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules whose code techniques reach through objects, e.g., methods of
+# Alignment, which can't be followed from their references. Their source is
+# part of every code digest.
+SHARED_MODULES = ("fnalign.models", "fnalign.annotations", "fnalign.alignment.matrix")
+
+_fingerprints = None
+_shared_digest = None
+
+
+def get_fingerprints():
+	"""Returns the file digests, reading them from :data:`FINGERPRINTS_PATH` on
+	the first call.
+
+	:returns: A mapping of (path, size, modification time) to digests.
+	:rtype: dict[tuple, str]
+	"""
+	global _fingerprints
+
+	if _fingerprints is None:
+		try:
+			with open(FINGERPRINTS_PATH, 'rb') as fp:
+				version, _fingerprints = pickle.load(fp)
+			if version != FINGERPRINTS_VERSION:
+				_fingerprints = {}
+		except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+			_fingerprints = {}
+
+	return _fingerprints
+
+
+def save_fingerprints():
+	"""Writes the file digests to :data:`FINGERPRINTS_PATH`."""
+	os.makedirs(os.path.dirname(FINGERPRINTS_PATH), exist_ok=True)
+	tmp_path = f'{FINGERPRINTS_PATH}.{os.getpid()}.tmp'
+
+	with open(tmp_path, 'wb') as fp:
+		pickle.dump((FINGERPRINTS_VERSION, get_fingerprints()), fp, pickle.HIGHEST_PROTOCOL)
+
+	os.replace(tmp_path, FINGERPRINTS_PATH)
+
+
+def file_fingerprint(path):
+	"""Computes a digest of the contents of ``path``, so that the same file
+	gives the same digest after it is touched, copied or downloaded again.
+	Hashing embeddings takes a while, so digests are kept in
+	:data:`FINGERPRINTS_PATH` by the path, size and modification time of the
+	file and the contents are only read again when one of those changes.
+
+	:param path: The file path.
+	:type path: str
+	:returns: The hexadecimal digest.
+	:rtype: str
+	"""
+	stat = os.stat(path)
+	path = os.path.abspath(path)
+	stamp = (path, stat.st_size, stat.st_mtime_ns)
+	fingerprints = get_fingerprints()
+
+	if stamp not in fingerprints:
+		digest = hashlib.sha1()
+		with open(path, 'rb') as fp:
+			for chunk in iter(lambda: fp.read(FINGERPRINT_CHUNK), b''):
+				digest.update(chunk)
+
+		# Digests of older versions of the file are never read again
+		for old in [old for old in fingerprints if old[0] == path]:
+			del fingerprints[old]
+
+		fingerprints[stamp] = digest.hexdigest()
+		save_fingerprints()
+
+	return fingerprints[stamp]
+
+
+def shared_digest():
+	"""Computes a digest of the source of :data:`SHARED_MODULES`, once per
+	process.
+
+	:returns: The hexadecimal digest.
+	:rtype: str
+	"""
+	global _shared_digest
+
+	if _shared_digest is None:
+		digest = hashlib.sha1()
+
+		for name in SHARED_MODULES:
+			digest.update(f'{name}\0'.encode())
+			digest.update(inspect.getsource(importlib.import_module(name)).encode())
+
+		_shared_digest = digest.hexdigest()
+
+	return _shared_digest
+
+
+def _in_project(path):
+	"""Returns whether the file ``path`` is in the project."""
+	return path is not None and os.path.abspath(path).startswith(PROJECT_DIR + os.sep)
+
+
+def _is_project(obj):
+	"""Returns whether ``obj`` is a function or class defined in the project."""
+	if not (inspect.isfunction(obj) or inspect.isclass(obj)):
+		return False
+
+	try:
+		return _in_project(inspect.getsourcefile(obj))
+	except TypeError:
+		return False
+
+
+def _code_names(code):
+	"""Yields the global and attribute names used by ``code`` and the code
+	objects it contains, such as lambdas and comprehensions.
+	"""
+	yield from code.co_names
+	for const in code.co_consts:
+		if isinstance(const, types.CodeType):
+			yield from _code_names(const)
+
+
+def _references(obj):
+	"""Returns the project functions and classes referenced by ``obj``.
+	Attributes of project modules are resolved by name, so a reference to
+	``vector.fe_matching`` yields ``fe_matching`` from the ``vector`` module.
+	"""
+	if inspect.isclass(obj):
+		return [value for value in vars(obj).values() if _is_project(value)]
+
+	names = list(dict.fromkeys(_code_names(obj.__code__)))
+	refs = []
+
+	for name in names:
+		value = obj.__globals__.get(name)
+
+		if isinstance(value, types.ModuleType) and _in_project(getattr(value, '__file__', None)):
+			refs.extend(getattr(value, attr) for attr in names if _is_project(getattr(value, attr, None)))
+		elif _is_project(value):
+			refs.append(value)
+
+	return refs
+
+
+def code_digest(func):
+	"""Computes a digest of the source of ``func`` and of the project functions
+	and classes it references, recursively, and of :func:`shared_digest`.
+	Other functions of the same modules are not part of the digest.
+
+	:param func: A function.
+	:type func: Callable
+	:returns: The hexadecimal digest.
+	:rtype: str
+	"""
+	digest = hashlib.sha1(shared_digest().encode())
+	seen = set()
+	pending = [func]
+
+	while pending:
+		obj = pending.pop(0)
+		if obj in seen:
+			continue
+		seen.add(obj)
+
+		try:
+			source = inspect.getsource(obj)
+		except (OSError, TypeError):
+			source = obj.__qualname__
+
+		digest.update(source.encode())
+		pending.extend(_references(obj))
+
+	return digest.hexdigest()
+
+
+class ResultCache():
+	"""A folder of technique results addressed by their keys.
+
+	:param path: The cache folder.
+	:type path: str
+	"""
+
+	def __init__(self, path=RESULTS_DIR):
+		self.path = path
+		self._code_digests = {}
+
+	def code_digest(self, func):
+		"""Returns :func:`code_digest` of ``func``, computed once per function."""
+		if func not in self._code_digests:
+			self._code_digests[func] = code_digest(func)
+		return self._code_digests[func]
+
+	def key(self, name, params, func, fingerprints):
+		"""Computes the key of a result.
+
+		:param name: The technique name.
+		:type name: str
+		:param params: The technique parameters. Their ``repr`` must be
+			deterministic.
+		:type params: dict
+		:param func: The technique function.
+		:type func: Callable
+		:param fingerprints: Digests of all data the result depends on.
+		:type fingerprints: Iterable[str]
+		:returns: The hexadecimal key.
+		:rtype: str
+		"""
+		digest = hashlib.sha1(f'{RESULTS_VERSION}\0{name}\0{params!r}\0'.encode())
+		digest.update(self.code_digest(func).encode())
+
+		for fingerprint in fingerprints:
+			digest.update(f'\0{fingerprint}'.encode())
+
+		return digest.hexdigest()
+
+	def file(self, key):
+		return os.path.join(self.path, key[:2], f'{key}.pkl')
+
+	def read(self, key):
+		"""Reads the entry of ``key``.
+
+		:param key: The result key.
+		:type key: str
+		:returns: The entry written by :func:`write` or None if there's none.
+		:rtype: dict
+		"""
+		try:
+			with open(self.file(key), 'rb') as fp:
+				return pickle.load(fp)
+		except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError):
+			return None
+
+	def write(self, key, value, scores, resources):
+		"""Writes an entry for ``key``.
+
+		:param key: The result key.
+		:type key: str
+		:param value: The value returned by the technique.
+		:param scores: The scores the technique added, as in
+			:attr:`fnalign.models.Alignment.scores`.
+		:type scores: list[dict]
+		:param resources: The resources the technique added.
+		:type resources: dict
+		"""
+		path = self.file(key)
+		os.makedirs(os.path.dirname(path), exist_ok=True)
+		tmp_path = f'{path}.{os.getpid()}.tmp'
+
+		entry = {
+			"value": value,
+			# The DataFrame of dense scores is built again by add_scores
+			"scores": [{k: v for k, v in score.items() if k != "df"} for score in scores],
+			"resources": resources,
+		}
+
+		with open(tmp_path, 'wb') as fp:
+			pickle.dump(entry, fp, pickle.HIGHEST_PROTOCOL)
+
+		os.replace(tmp_path, path)
+
+	@staticmethod
+	def restore(alignment, entry):
+		"""Adds the scores and resources of ``entry`` to ``alignment``.
+
+		:param alignment: An :class:`Alignment` instance.
+		:type alignment: :class:`fnalign.models.Alignment`
+		:param entry: An entry returned by :func:`read`.
+		:type entry: dict
+		:returns: The value returned by the technique.
+		"""
+		for score in entry["scores"]:
+			score = score.copy()
+			aid, atype, matrix = score.pop("id"), score.pop("type"), score.pop("matrix")
+			alignment.add_scores(aid, atype, matrix, as_sparse=sparse.issparse(matrix), **score)
+
+		alignment.resources.update(entry["resources"])
+
+		return entry["value"]
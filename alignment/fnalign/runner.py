@@ -0,0 +1,164 @@
+"""This module contains the driver that runs independent jobs, such as the
+alignment of each l2 database against BFN, in parallel worker processes.
+
+Workers are forked, so everything the parent loaded before calling
+:func:`run_parallel` (BFN, the english embeddings) is shared with them
+copy-on-write instead of being pickled or loaded again. Each job runs in its
+own process, which exits when the job is done and gives its memory back.
+Objects that exist when workers are started are moved out of the garbage
+collector's reach with :func:`gc.freeze`, so that collections in workers
+don't write to, and thereby copy, the shared pages.
+
+At most ``workers`` jobs run at once. With a ``memory_budget``, a job is only
+started when the private memory of running workers, i.e., the memory they
+don't share with the parent, plus an estimate for the new job fits in the
+budget. The estimate is the largest private memory seen of any worker so
+far, and workers are started one per :data:`POLL_INTERVAL` so that each one
+is measured before the next is started. Private memory is read from
+``/proc``, so the budget is only enforced on Linux and ignored where it can't
+be read.
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import gc
+import os
+import time
+import queue
+import logging
+import traceback
+import multiprocessing as mp
+
+# Seconds between checks of running workers
+POLL_INTERVAL = 0.5
+
+
+def private_memory(pid):
+	"""Returns the memory in bytes of process ``pid`` that is not shared with
+	other processes, or None when it can't be read.
+
+	:param pid: The process id.
+	:type pid: int
+	:rtype: int
+	"""
+	try:
+		with open(f'/proc/{pid}/smaps_rollup') as fp:
+			return sum(
+				int(line.split()[1]) * 1024
+				for line in fp if line.startswith(('Private_Clean:', 'Private_Dirty:'))
+			)
+	except (OSError, ValueError, IndexError):
+		return None
+
+
+def _run_job(func, index, job, results):
+	"""Runs ``func(*job)`` in a worker and puts its result in ``results``."""
+	start_time = time.time()
+
+	try:
+		result = {"output": func(*job), "error": None}
+	except Exception:
+		result = {"output": None, "error": traceback.format_exc()}
+
+	result["seconds"] = time.time() - start_time
+	results.put((index, result))
+
+
+def run_parallel(func, jobs, workers=None, memory_budget=None):
+	"""Runs ``func(*job)`` for each job of ``jobs``, each one in a forked worker
+	process, and returns their results in the same order as ``jobs``.
+
+	Each result is a dictionary with the ``output`` returned by ``func``, the
+	``error`` traceback when it raised an exception or the worker died, the
+	wall time in ``seconds`` and the largest ``memory`` in bytes seen of the
+	worker (0 when it couldn't be read). A failed job doesn't stop the others.
+
+	:param func: The job function. It must be defined at module level and its
+		output must be picklable.
+	:type func: Callable
+	:param jobs: The arguments of each job.
+	:type jobs: list[tuple]
+	:param workers: Maximum number of jobs run at once, the number of CPUs by
+		default.
+	:type workers: int
+	:param memory_budget: Maximum private memory in bytes of all running
+		workers. The first job is always started, and the budget is ignored
+		when private memory can't be read.
+	:type memory_budget: int
+	:returns: The result of each job.
+	:rtype: list[dict]
+	"""
+	logger = logging.getLogger('alignment')
+	workers = workers or os.cpu_count()
+
+	# Without a readable private memory, the estimate of jobs would stay 0
+	if memory_budget is not None and private_memory(os.getpid()) is None:
+		logger.warning('Private memory of processes can\'t be read, the memory budget is ignored')
+		memory_budget = None
+
+	gc.freeze()
+
+	try:
+		return _run_workers(func, jobs, workers, memory_budget, logger)
+	finally:
+		gc.unfreeze()
+
+
+def _run_workers(func, jobs, workers, memory_budget, logger):
+	"""Starts and polls the workers of :func:`run_parallel`."""
+	ctx = mp.get_context('fork')
+	results = ctx.Queue()
+	pending = list(enumerate(jobs))
+	running = {}
+	memory = [0 for _ in jobs]
+	output = [None for _ in jobs]
+
+	def fits():
+		if memory_budget is None or not running:
+			return True
+		# Nothing is started until a worker's memory was seen
+		estimate = max(memory)
+		return estimate > 0 and sum(memory[i] for i in running) + estimate <= memory_budget
+
+	while pending or running:
+		while pending and len(running) < workers and fits():
+			index, job = pending.pop(0)
+			process = ctx.Process(target=_run_job, args=(func, index, job, results))
+			process.start()
+			running[index] = process
+			logger.info(f'Job {job} started in process {process.pid}')
+
+			# With a budget, the memory of each new worker is seen before the next
+			if memory_budget is not None:
+				break
+
+		try:
+			index, result = results.get(timeout=POLL_INTERVAL)
+		except queue.Empty:
+			index, result = None, None
+
+		for i, process in list(running.items()):
+			current = private_memory(process.pid)
+			if current is not None:
+				memory[i] = max(memory[i], current)
+
+			# Workers that died, e.g. killed for lack of memory, never put a result
+			if i != index and process.exitcode not in (None, 0):
+				running.pop(i)
+				output[i] = {
+					"output": None,
+					"error": f'Worker exited with code {process.exitcode}',
+					"seconds": None,
+				}
+
+		if index in running:
+			running.pop(index).join()
+			output[index] = result
+
+		for i in range(len(jobs)):
+			if output[i] is not None and "memory" not in output[i]:
+				output[i]["memory"] = memory[i]
+				if output[i]["error"]:
+					logger.error(f'Job {jobs[i]} failed:\n{output[i]["error"]}')
+
+	return output
@@ -0,0 +1,277 @@
+"""This module contains the sources loaders read database files from. A
+database is either unpacked in a directory or kept in its original release
+archive (.zip, .tar, .tar.gz, .tgz, .tar.bz2 or .tar.xz) next to where the
+directory would be, e.g. "data/bfn.zip" instead of "data/bfn".
+
+Loaders always refer to files by their path inside the database directory,
+such as "data/bfn/lu/lu10.xml", and sources resolve these paths to files or
+archive members. Archive sources keep an index of members, so any member is
+read without scanning the archive:
+
+* Zip archives are indexed by their own central directory.
+* Tar archives are indexed once and the index is stored in the cache folder.
+  Compressed tar archives can't be read at random positions, so they are
+  decompressed once to the cache folder as well.
+
+.. moduleauthor:: Arthur Lorenzi Almeida <lorenzi.arthur@gmail.com>
+"""
+
+import io
+import os
+import bz2
+import gzip
+import lzma
+import pickle
+import shutil
+import tarfile
+import zipfile
+from collections import defaultdict
+
+ARCHIVE_EXTENSIONS = ['.zip', '.tar', '.tar.gz', '.tgz', '.tar.bz2', '.tar.xz']
+DECOMPRESSORS = {'.gz': gzip.open, '.tgz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+INDEX_VERSION = 1
+
+
+def open_source(base_path, cache_dir):
+	"""Returns the source of the database at ``base_path``: the directory itself
+	if it exists or an archive with the same path and one of
+	:data:`ARCHIVE_EXTENSIONS`. When neither exists, a directory source is
+	returned, so that reading fails as usual.
+
+	:param base_path: The database directory path.
+	:type base_path: str
+	:param cache_dir: The folder where archive indexes are stored.
+	:type cache_dir: str
+	:returns: The database source.
+	:rtype: :class:`DirectorySource`
+	"""
+	if not os.path.isdir(base_path):
+		for ext in ARCHIVE_EXTENSIONS:
+			if os.path.isfile(base_path + ext):
+				if ext == '.zip':
+					return ZipSource(base_path, base_path + ext)
+				return TarSource(base_path, base_path + ext, cache_dir)
+
+	return DirectorySource(base_path)
+
+
+class DirectorySource():
+	"""A database unpacked in the directory ``base_path``. Paths are read from
+	the file system.
+	"""
+
+	def __init__(self, base_path):
+		self.base_path = base_path
+
+	def listdir(self, path):
+		"""Returns the sorted names of the entries of directory ``path``.
+
+		:param path: The directory path.
+		:type path: str
+		:rtype: list[str]
+		"""
+		return sorted(os.listdir(path))
+
+	def isdir(self, path):
+		return os.path.isdir(path)
+
+	def open(self, path):
+		"""Opens the file ``path`` for binary reading.
+
+		:param path: The file path.
+		:type path: str
+		:returns: A binary file object.
+		:raises: FileNotFoundError
+		"""
+		return open(path, 'rb')
+
+	def stat(self, path):
+		"""Returns a pair of values that change whenever the file ``path``
+		changes.
+
+		:param path: The file path.
+		:type path: str
+		:rtype: tuple(int, int)
+		"""
+		stat = os.stat(path)
+		return stat.st_size, stat.st_mtime_ns
+
+
+class ArchiveSource(DirectorySource):
+	"""Base class of sources that read members of the archive ``archive_path``.
+	The database directory is the shallowest folder of the archive with a
+	"frame" folder or a "data.xml" file, so release archives with a top level
+	folder are read as they are. Open archive handles are never shared between
+	processes or pickled.
+	"""
+
+	def __init__(self, base_path, archive_path):
+		super().__init__(base_path)
+		self.archive_path = archive_path
+		self.members = None
+		self.dirs = None
+		self._handle = None
+		self._pid = None
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		state['_handle'] = None
+		state['_pid'] = None
+		return state
+
+	def handle(self):
+		"""Returns the archive handle of the current process."""
+		if self._handle is None or self._pid != os.getpid():
+			self._handle = self.open_archive()
+			self._pid = os.getpid()
+		return self._handle
+
+	def index(self):
+		"""Builds :attr:`members`, which maps each member path relative to the
+		database directory to its data, and :attr:`dirs`, the entries of each
+		directory.
+		"""
+		if self.members is not None:
+			return
+
+		members = self.read_members()
+		roots = []
+
+		for name in members:
+			parts = name.split('/')
+			if parts[-1] == 'data.xml':
+				roots.append(parts[:-1])
+			if 'frame' in parts[:-1]:
+				roots.append(parts[:parts.index('frame')])
+
+		root = min(roots, key=len, default=[])
+		prefix = ''.join(f'{part}/' for part in root)
+
+		if prefix:
+			members = {name[len(prefix):]: data for name, data in members.items() if name.startswith(prefix)}
+
+		self.members = members
+		dirs = defaultdict(set)
+
+		for name in members:
+			parts = name.split('/')
+			for i in range(len(parts)):
+				dirs['/'.join(parts[:i])].add(parts[i])
+
+		self.dirs = {d: sorted(entries) for d, entries in dirs.items()}
+
+	def member(self, path):
+		"""Returns the member name of ``path``."""
+		rel = os.path.relpath(path, self.base_path)
+		return '' if rel == '.' else rel.replace(os.sep, '/')
+
+	def listdir(self, path):
+		self.index()
+		try:
+			return list(self.dirs[self.member(path)])
+		except KeyError:
+			raise FileNotFoundError(f'No such directory in {self.archive_path}: {path}')
+
+	def isdir(self, path):
+		self.index()
+		return self.member(path) in self.dirs
+
+	def open(self, path):
+		self.index()
+		try:
+			data = self.members[self.member(path)]
+		except KeyError:
+			raise FileNotFoundError(f'No such member in {self.archive_path}: {path}')
+		return self.open_member(data)
+
+	def stat(self, path):
+		self.index()
+		try:
+			return self.member_stat(self.members[self.member(path)])
+		except KeyError:
+			raise FileNotFoundError(f'No such member in {self.archive_path}: {path}')
+
+
+class ZipSource(ArchiveSource):
+	"""A database in a zip archive."""
+
+	def open_archive(self):
+		return zipfile.ZipFile(self.archive_path)
+
+	def read_members(self):
+		return {
+			info.filename: info
+			for info in self.handle().infolist() if not info.is_dir()
+		}
+
+	def open_member(self, info):
+		return self.handle().open(info)
+
+	def member_stat(self, info):
+		return info.file_size, info.CRC
+
+
+class TarSource(ArchiveSource):
+	"""A database in a tar archive, optionally compressed. The member index,
+	with the offset and size of each member, is stored in ``cache_dir``.
+	Compressed archives are decompressed to ``cache_dir`` and members are read
+	from there.
+	"""
+
+	def __init__(self, base_path, archive_path, cache_dir):
+		super().__init__(base_path, archive_path)
+		self.cache_dir = cache_dir
+		self.tar_path = archive_path
+
+	def open_archive(self):
+		return open(self.tar_path, 'rb')
+
+	def read_members(self):
+		name = os.path.basename(self.archive_path)
+		index_path = os.path.join(self.cache_dir, f'{name}.index')
+		stat = os.stat(self.archive_path)
+		key = (INDEX_VERSION, stat.st_size, stat.st_mtime_ns)
+		decompress = DECOMPRESSORS.get(os.path.splitext(self.archive_path)[1])
+		compressed = decompress is not None
+
+		if compressed:
+			self.tar_path = os.path.join(self.cache_dir, f'{name}.tar')
+
+		try:
+			with open(index_path, 'rb') as fp:
+				index_key, members = pickle.load(fp)
+			if index_key == key and (not compressed or os.path.isfile(self.tar_path)):
+				return members
+		except (OSError, EOFError, ValueError, pickle.UnpicklingError):
+			pass
+
+		os.makedirs(self.cache_dir, exist_ok=True)
+
+		if compressed:
+			tmp_path = f'{self.tar_path}.{os.getpid()}.tmp'
+			with decompress(self.archive_path, 'rb') as src, open(tmp_path, 'wb') as fp:
+				shutil.copyfileobj(src, fp, 1 << 20)
+			os.replace(tmp_path, self.tar_path)
+
+		with tarfile.open(self.tar_path) as tar:
+			members = {
+				info.name: (info.offset_data, info.size, info.mtime)
+				for info in tar if info.isfile()
+			}
+
+		tmp_path = f'{index_path}.{os.getpid()}.tmp'
+		with open(tmp_path, 'wb') as fp:
+			pickle.dump((key, members), fp, pickle.HIGHEST_PROTOCOL)
+		os.replace(tmp_path, index_path)
+
+		return members
+
+	def open_member(self, data):
+		offset, size, _ = data
+		fp = self.handle()
+		fp.seek(offset)
+		return io.BytesIO(fp.read(size))
+
+	def member_stat(self, data):
+		_, size, mtime = data
+		return size, mtime
@@ -1,6 +1,7 @@
 import os
 import time
 import logging
+import argparse
 
 global_time = time.time()
 
@@ -14,9 +15,79 @@ from fnalign.models import Alignment
 from fnalign.alignment import attribute, vector, wordnet
 from fnalign.embeddings import MuseWordEmbedding, LUEmbedding
 from fnalign.evaluation import gold_scores
+from fnalign.runner import run_parallel
+from fnalign.pipeline import Pipeline, Step, MissingInput
+from fnalign.results import ResultCache, file_fingerprint
+from fnalign import planner
 
 MUSE_NMAX=200000
 MUSE_EMBS = {}
+# K and threshold of LU neighborhoods
+LU_SCORING_CONFIGS = [(5, 0.3)]
+LOAD_WORKERS = os.cpu_count()
+
+CONFIGS = [
+	('chinesefn', 'zh'),
+	('japanesefn', 'ja'),
+	('frenchfn', 'fr'),
+	('spanishfn', 'es'),
+	('fnbrasil', 'pt'),
+	('swedishfn', 'sv'),
+	('salsa', 'de'),
+	('dutchfn', 'nl'),
+]
+
+# Base inputs of PIPELINE steps, i.e., data that a database has
+INPUTS = {"frame_ids", "frame_names", "core_fes", "fe_definitions", "muse", "bert"}
+
+DB_INPUTS = {
+	'chinesefn': INPUTS - {"frame_ids", "core_fes", "fe_definitions", "bert"},
+	'japanesefn': INPUTS - {"muse"},
+	'frenchfn': INPUTS,
+	'spanishfn': INPUTS,
+	# FEs named in both english and l2
+	'fnbrasil': INPUTS - {"frame_names"} | {"mixed_fe_langs"},
+	'swedishfn': INPUTS - {"frame_ids", "fe_definitions"},
+	'salsa': INPUTS | {"mixed_fe_langs"},
+	'dutchfn': INPUTS,
+}
+
+# BFN, loaded once and shared with every alignment
+EN_FN = None
+
+# Seconds per unit of work measured by planner.calibrate(), when jobs are planned
+COSTS = None
+
+# Maximum estimated seconds and bytes of an alignment job, see planner.check_budget
+BUDGET = {"max_seconds": None, "max_memory": None}
+
+# Number of vectors and dimension of embeddings, see planner.Stats
+EMBEDDINGS = {"muse": (MUSE_NMAX, 300), "bert": (None, 768)}
+
+def muse_path(lang):
+	"""Returns the path of the MUSE embedding file of ``lang``.
+
+	:raises: :class:`MissingInput` when the file does not exist.
+	"""
+	path = os.path.join('data', 'muse', f'wiki.{lang}.align.vec')
+	if not os.path.exists(path):
+		raise MissingInput(f'{path} not found')
+	return path
+
+def lu_emb_path(db_name, en=False):
+	"""Returns the path of the BERT LU embedding file of ``db_name``, or of the
+	english embedding aligned to it when ``en`` is True.
+
+	:raises: :class:`MissingInput` when the file does not exist.
+	"""
+	if en:
+		path = os.path.join('data', 'bert', f'{db_name}_en_lu_embs.json')
+	else:
+		path = os.path.join('data', 'bert', f'{db_name}_lu_embs.json')
+
+	if not os.path.exists(path):
+		raise MissingInput(f'{path} not found')
+	return path
 
 def get_muse_emb(lang, cache=False):
 	"""Instantiates a new :class:`MuseWordEmbedding` with language ``lang`` when needed,
@@ -28,14 +99,13 @@ def get_muse_emb(lang, cache=False):
 	:type cache: bool
 	:returns: An :class:`MuseWordEmbedding` object for ``lang``.
 	:rtype: :class:`MuseWordEmbedding`
+	:raises: :class:`MissingInput` when the embedding file does not exist.
 	"""
 	if cache and lang in MUSE_EMBS:
 		return MUSE_EMBS[lang]
 
-	path = os.path.join('data', 'muse', f'wiki.{lang}.align.vec')
-
 	emb = MuseWordEmbedding(lang, 300)
-	emb.load_from_file(path, nmax=MUSE_NMAX)
+	emb.load_from_file(muse_path(lang), nmax=MUSE_NMAX)
 
 	if cache:
 		MUSE_EMBS[lang] = emb
@@ -54,82 +124,217 @@ def get_lu_emb(db_name, lang, en=False):
 	:type en: bool
 	:returns: An :class:`LUEmbedding` object for ``lang``.
 	:rtype: :class:`LUEmbedding`
+	:raises: :class:`MissingInput` when the embedding file does not exist.
 	"""
-	if en:
-		path = os.path.join('data', 'bert', f'{db_name}_en_lu_embs.json')
-	else:
-		path = os.path.join('data', 'bert', f'{db_name}_lu_embs.json')
-
 	emb = LUEmbedding(lang, 768)
-	emb.load_from_file(path)
+	emb.load_from_file(lu_emb_path(db_name, en))
 
 	return emb
 
 
-if __name__ == "__main__":
-	configs = [
-		('chinesefn', 'zh'),
-		('japanesefn', 'ja'),
-		('frenchfn', 'fr'),
-		('spanishfn', 'es'),
-		('fnbrasil', 'pt'),
-		('swedishfn', 'sv'),
-		('salsa', 'de'),
-		('dutchfn', 'nl'),
-	]
-
-	en_fn = load("bfn", "en")
-
-	for db_name, lang in configs:
-		start_time = time.time()
-
-		l2_fn = load(db_name, lang)
-		alignment = Alignment(en_fn, l2_fn)
+MUSE = ["muse_en", "muse_l2"]
+BERT = ["bert_en", "bert_l2"]
+LU_SCORING = {"scoring_configs": LU_SCORING_CONFIGS}
+FUZZY_NAMES = {"min_similarity": 0.8}
+
+# Techniques and the resources they share. Scores are kept in this order.
+PIPELINE = Pipeline([
+	Step("id_matching", lambda a, r: attribute.id_matching(a), requires=["frame_ids"], cache=True),
+	Step("name_matching", lambda a, r: attribute.name_matching(a), requires=["frame_names"], cache=True),
+	Step(
+		"fuzzy_name_matching", lambda a, r: attribute.fuzzy_name_matching(a, **FUZZY_NAMES),
+		requires=["frame_names"], params=FUZZY_NAMES, cache=True),
+	Step("core_fe_matching", lambda a, r: attribute.fe_matching(a), requires=["core_fes"], cache=True),
+	Step("all_fe_matching", lambda a, r: attribute.fe_matching(a, core_only=False), cache=True),
+
+	Step(
+		"wordnet", lambda a, r: wordnet.set_resources(a), cache=True,
+		resources=["lu_to_syn", "syn_to_lu", "frm_to_syn", "syn_data"]),
+	Step("lu_wordnet", lambda a, r: wordnet.lu_matching(a), requires=["wordnet"], cache=True),
+	Step(
+		"synset", lambda a, r: wordnet.synset_matching(a), requires=["wordnet"],
+		produces=["synset_inv"], cache=True),
+
+	# MUSE techniques
+	Step(
+		"muse_en", lambda a, r: get_muse_emb("en", cache=True), requires=["muse"],
+		params={"nmax": MUSE_NMAX},
+		fingerprint=lambda a: file_fingerprint(muse_path("en"))),
+	Step(
+		"muse_l2", lambda a, r: get_muse_emb(a.l2_fn.lang), requires=["muse"],
+		params={"nmax": MUSE_NMAX},
+		fingerprint=lambda a: file_fingerprint(muse_path(a.l2_fn.lang))),
+	Step(
+		"fe_vecs", lambda a, r: vector.set_fe_vecs(a, r["muse_en"], r["muse_l2"], name_vecs=True),
+		requires=[*MUSE, "fe_definitions"], cache=True, resources=["fe_def_vecs", "fe_name_vecs"]),
+	Step(
+		"muse_fe_match", lambda a, r: vector.fe_matching(a, r["muse_en"], r["muse_l2"]),
+		requires=[*MUSE, "fe_vecs"], cache=True),
+	Step(
+		"muse_exact_fe_match", lambda a, r: vector.fe_exact_matching(a, r["muse_en"], r["muse_l2"]),
+		requires=[*MUSE, "fe_vecs"], cache=True),
+	Step(
+		"muse_mixed_fe_match", lambda a, r: vector.fe_mixed_matching(a),
+		requires=["muse_fe_match", "muse_exact_fe_match", "mixed_fe_langs"], cache=True),
+	Step(
+		"lu_muse", lambda a, r: vector.lu_muse_matching(a, r["muse_en"], r["muse_l2"], **LU_SCORING),
+		requires=MUSE, params=LU_SCORING, cache=True, resources=["lu_vec_nn_muse", "id2word_muse"]),
+	Step(
+		"lu_mean_muse", lambda a, r: vector.lu_mean_matching(a, r["muse_en"], r["muse_l2"]),
+		requires=MUSE, cache=True),
+	Step(
+		"frame_def_muse", lambda a, r: vector.def_matching(a, r["muse_en"], r["muse_l2"]),
+		requires=MUSE, cache=True),
+
+	# BERT techniques
+	Step(
+		"bert_en", lambda a, r: get_lu_emb(a.l2_fn.name, a.l2_fn.lang, en=True), requires=["bert"],
+		fingerprint=lambda a: file_fingerprint(lu_emb_path(a.l2_fn.name, en=True))),
+	Step(
+		"bert_l2", lambda a, r: get_lu_emb(a.l2_fn.name, a.l2_fn.lang), requires=["bert"],
+		fingerprint=lambda a: file_fingerprint(lu_emb_path(a.l2_fn.name))),
+	Step(
+		"lu_bert", lambda a, r: vector.lu_bert_matching(a, r["bert_en"], r["bert_l2"], **LU_SCORING),
+		requires=BERT, params=LU_SCORING, cache=True, resources=["lu_vec_nn_bert", "id2word_bert"]),
+	Step(
+		"lu_mean_bert", lambda a, r: vector.lu_mean_matching(a, r["bert_en"], r["bert_l2"], 'bert'),
+		requires=BERT, cache=True),
+])
+
+
+def plan(alignment, inputs, threads=None, cache=True):
+	"""Estimates the cost of running :data:`PIPELINE` on ``alignment`` with
+	the :data:`COSTS` calibration, prints it and checks it against
+	:data:`BUDGET`.
+
+	:param alignment: An :class:`Alignment` instance.
+	:type alignment: :class:`Alignment`
+	:param inputs: The base inputs of the database.
+	:type inputs: Iterable[str]
+	:param threads: Number of techniques run at once.
+	:type threads: int
+	:param cache: Whether technique results are read from cache.
+	:type cache: bool
+	:returns: The plan.
+	:rtype: :class:`planner.Plan`
+	:raises: :class:`planner.BudgetExceeded` when the plan exceeds the budget.
+	"""
+	planned, _ = PIPELINE.plan(inputs)
+	cached = PIPELINE.cached(alignment, inputs, ResultCache()) if cache else set()
 
-		if db_name not in ["chinesefn", "swedishfn"]:
-			attribute.id_matching(alignment)
+	job_plan = planner.estimate(
+		alignment, [step.name for step in planned], COSTS, embeddings=EMBEDDINGS,
+		cached=cached, threads=threads or os.cpu_count())
+	planner.print_plan(job_plan, title=f'{alignment.l2_fn.name} ({alignment.l2_fn.lang})')
+	planner.check_budget(job_plan, **BUDGET)
 
-		if db_name != "fnbrasil":
-			attribute.name_matching(alignment)
+	return job_plan
 
-		if db_name != "chinesefn":
-			attribute.fe_matching(alignment)
 
-		attribute.fe_matching(alignment, core_only=False)
+def align(db_name, lang, load_workers=LOAD_WORKERS, threads=None, cache=True):
+	"""Aligns :data:`EN_FN` with the FrameNet ``db_name`` running the steps of
+	:data:`PIPELINE` that ``db_name`` has inputs for, and dumps the result.
+	With ``cache``, technique results are read from and written to a
+	:class:`ResultCache`. When :data:`COSTS` is set, the job is planned first
+	and refused if it exceeds :data:`BUDGET`.
 
-		wordnet.lu_matching(alignment)
-		wordnet.synset_matching(alignment)
+	:param db_name: FrameNet database name.
+	:type db_name: str
+	:param lang: Language of the database.
+	:type lang: str
+	:param load_workers: Number of processes used to parse XML files.
+	:type load_workers: int
+	:param threads: Number of techniques run at once.
+	:type threads: int
+	:param cache: Whether technique results should be cached.
+	:type cache: bool
+	:returns: The path of the alignment output.
+	:rtype: str
+	:raises: :class:`planner.BudgetExceeded` when the job exceeds the budget.
+	"""
+	start_time = time.time()
 
-		# MUSE techniques
-		if db_name != "japanesefn":
-			en_emb = get_muse_emb("en", cache=True)
-			l2_emb = get_muse_emb(lang)
+	l2_fn = load(db_name, lang, workers=load_workers, lazy_annotations=True)
+	alignment = Alignment(EN_FN, l2_fn)
+	inputs = DB_INPUTS.get(db_name, INPUTS)
 
-			if db_name not in ["chinesefn", "swedishfn"]:
-				vector.fe_matching(alignment, en_emb, l2_emb)
-				vector.fe_exact_matching(alignment, en_emb, l2_emb)
-				
-			if db_name in ["fnbrasil", "salsa"]:
-				vector.fe_mixed_matching(alignment)
+	if COSTS is not None:
+		plan(alignment, inputs, threads, cache)
 
-			vector.lu_muse_matching(alignment, en_emb, l2_emb, scoring_configs=[(5, 0.3)])
-			vector.lu_mean_matching(alignment, en_emb, l2_emb)
-			vector.def_matching(alignment, en_emb, l2_emb)
+	PIPELINE.run(alignment, inputs, workers=threads, cache=ResultCache() if cache else None)
 
+	# gold_scores(alignment)
 
-		# BERT techniques
-		if db_name != "chinesefn":
-			en_emb = get_lu_emb(db_name, lang, en=True)
-			l2_emb = get_lu_emb(db_name, lang)
+	# path = alignment.dump(ignore_scores=set(["lu_muse"]))
+	path = alignment.dump()
 
-			vector.lu_bert_matching(alignment, en_emb, l2_emb, scoring_configs=[(5, 0.3)])
-			vector.lu_mean_matching(alignment, en_emb, l2_emb, 'bert')
+	logger.info(l2_fn.lang + " finished --- %s seconds ---" % (time.time() - start_time))
 
-		# gold_scores(alignment)
+	return path
 
-		# alignment.dump(ignore_scores=set(["lu_muse"]))
-		alignment.dump()
 
-		logger.info(l2_fn.lang + " finished --- %s seconds ---" % (time.time() - start_time))
+if __name__ == "__main__":
+	parser = argparse.ArgumentParser(description="Aligns BFN with every FrameNet database.")
+	parser.add_argument('--jobs', type=int, default=len(CONFIGS),
+		help="Number of databases aligned at once, each in its own process.")
+	parser.add_argument('--memory-budget', type=float,
+		help="Maximum memory in GB used by alignment processes besides what they share.")
+	parser.add_argument('--db', nargs='+', choices=[db_name for db_name, _ in CONFIGS],
+		help="Databases to be aligned, all by default.")
+	parser.add_argument('--threads', type=int,
+		help="Number of techniques run at once for each database.")
+	parser.add_argument('--no-cache', action='store_true',
+		help="Compute all techniques again instead of reading cached results.")
+	parser.add_argument('--plan', action='store_true',
+		help="Print the estimated time and memory of each database's techniques and exit.")
+	parser.add_argument('--max-hours', type=float,
+		help="Refuse to align databases estimated to take longer than this.")
+	parser.add_argument('--max-memory', type=float,
+		help="Refuse to align databases estimated to use more memory in GB than this.")
+	args = parser.parse_args()
+
+	configs = [(db_name, lang) for db_name, lang in CONFIGS if not args.db or db_name in args.db]
+
+	if args.plan or args.max_hours or args.max_memory:
+		# Calibrated once, before workers are forked
+		COSTS = planner.calibrate()
+		BUDGET["max_seconds"] = args.max_hours * 3600 if args.max_hours else None
+		BUDGET["max_memory"] = args.max_memory * 2**30 if args.max_memory else None
+
+	EN_FN = load("bfn", "en", workers=LOAD_WORKERS, lazy_annotations=True)
+
+	if args.plan:
+		for db_name, lang in configs:
+			alignment = Alignment(EN_FN, load(db_name, lang, workers=LOAD_WORKERS, lazy_annotations=True))
+			try:
+				plan(alignment, DB_INPUTS.get(db_name, INPUTS), args.threads, not args.no_cache)
+			except planner.BudgetExceeded as e:
+				logger.error(f'{db_name} would be refused: {e}')
+	elif args.jobs > 1:
+		# Loaded before forking so that workers share it
+		if any("muse" in DB_INPUTS.get(db_name, INPUTS) for db_name, _ in configs):
+			try:
+				get_muse_emb("en", cache=True)
+			except MissingInput as e:
+				logger.info(f'MUSE techniques will be skipped, {e}')
+
+		load_workers = max(1, LOAD_WORKERS // min(args.jobs, len(configs)))
+		memory_budget = args.memory_budget * 2**30 if args.memory_budget else None
+		results = run_parallel(
+			align,
+			[(db_name, lang, load_workers, args.threads, not args.no_cache) for db_name, lang in configs],
+			workers=args.jobs,
+			memory_budget=memory_budget)
+
+		for (db_name, _), result in zip(configs, results):
+			status = result["output"] or "failed"
+			seconds = f'{result["seconds"]:.1f}' if result["seconds"] is not None else "-"
+			logger.info(f'{db_name}: {status} --- {seconds} seconds, {result["memory"] / 2**20:.0f} MB ---')
+	else:
+		for db_name, lang in configs:
+			try:
+				align(db_name, lang, threads=args.threads, cache=not args.no_cache)
+			except planner.BudgetExceeded as e:
+				logger.error(f'{db_name} refused: {e}')
 
-	logger.info("Process finished --- %s seconds ---" % (time.time() - global_time))
\ No newline at end of file
+	logger.info("Process finished --- %s seconds ---" % (time.time() - global_time))
@@ -0,0 +1,72 @@
+import sys
+import importlib
+
+from fnalign import results
+from fnalign.results import ResultCache
+
+TECHNIQUES = '''
+def matches(values):
+	return [v for v in values if v]
+
+
+def first_matching(values):
+	return matches(values)
+
+
+def second_matching(values):
+	return len(values)
+'''
+
+
+techniques = None
+
+
+def step_keys():
+	# Steps reference techniques through a module global, as in main.py
+	cache = ResultCache()
+	return {
+		"first": cache.key("first", {}, lambda a, r: techniques.first_matching(a), []),
+		"second": cache.key("second", {}, lambda a, r: techniques.second_matching(a), []),
+	}
+
+
+def test_key_changes_only_for_edited_technique(tmp_path, monkeypatch):
+	global techniques
+	monkeypatch.setattr(results, "PROJECT_DIR", str(tmp_path))
+	monkeypatch.syspath_prepend(str(tmp_path))
+	monkeypatch.setattr(sys, "dont_write_bytecode", True)
+
+	path = tmp_path / "techniques.py"
+	path.write_text(TECHNIQUES)
+	techniques = importlib.import_module("techniques")
+	before = step_keys()
+
+	path.write_text(TECHNIQUES.replace("return len(values)", "return len(values) + 1"))
+	techniques = importlib.reload(techniques)
+	after = step_keys()
+
+	assert before["first"] == after["first"]
+	assert before["second"] != after["second"]
+
+	# Helpers are followed, so editing one changes the key of its users
+	path.write_text(TECHNIQUES.replace("if v]", "if v is not None]"))
+	techniques = importlib.reload(techniques)
+	edited = step_keys()
+
+	assert edited["first"] != after["first"]
+	sys.modules.pop("techniques")
+
+
+def test_file_fingerprint_depends_on_contents(tmp_path, monkeypatch):
+	monkeypatch.setattr(results, "FINGERPRINTS_PATH", str(tmp_path / "fingerprints.pkl"))
+	monkeypatch.setattr(results, "_fingerprints", None)
+
+	first, second = tmp_path / "first.vec", tmp_path / "second.vec"
+	first.write_text("en 0.1 0.2\n")
+	second.write_text("en 0.1 0.2\n")
+	digest = results.file_fingerprint(str(first))
+
+	assert results.file_fingerprint(str(second)) == digest
+
+	first.write_text("en 0.1 0.3\n")
+	assert results.file_fingerprint(str(first)) != digest
@@ -58,6 +58,37 @@ const LU_SCORING_TYPES = new Set([
  */
 const oneMoment = () => new Promise(resolve => setTimeout(resolve))
 
+/**
+ * Yields the row, column and value of each score in a score matrix, which is
+ * either an array of rows, a flat array of values with the matrix shape or a
+ * sparse matrix in CSR format. Zeros of sparse matrices are not yielded.
+ *
+ * @method
+ * @param {Array|Object} scores alignment score matrix.
+ */
+function* scoreEntries(scores) {
+	if (scores.format === 'dense') {
+		const [n, m] = scores.shape
+		for (let i = 0; i < n; ++i) {
+			for (let j = 0; j < m; ++j) {
+				yield [i, j, scores.values[i * m + j]]
+			}
+		}
+	} else if (scores.format === 'csr') {
+		for (let i = 0; i < scores.indptr.length - 1; ++i) {
+			for (let k = scores.indptr[i]; k < scores.indptr[i + 1]; ++k) {
+				yield [i, scores.indices[k], scores.values[k]]
+			}
+		}
+	} else {
+		for (let i = 0; i < scores.length; ++i) {
+			for (let j = 0; j < scores[i].length; ++j) {
+				yield [i, j, scores[i][j]]
+			}
+		}
+	}
+}
+
 /**
  * Computes the diagram edges based on the alignment scores.
  * 
@@ -75,20 +106,16 @@ const loadEdges = async (data) => {
 		let edgeArray = []
 	
 		if (scores) {
-			for (let i = 0; i < scores.length; ++i) {
-				for (let j = 0; j < scores[i].length; ++j) {
-					let value = scores[i][j]
-	
-					if (value > 0) {
-						edgeArray.push([data.indices[0][i], data.indices[1][j], value])
-					}
+			for (const [i, j, value] of scoreEntries(scores)) {
+				if (value > 0) {
+					edgeArray.push([data.indices[0][i], data.indices[1][j], value])
+				}
 
-					if (++iter % 1000 === 0) {
-						let now = performance.now()
-						if (now - then > 100) {
-							await oneMoment()
-							then = performance.now()
-						}
+				if (++iter % 1000 === 0) {
+					let now = performance.now()
+					if (now - then > 100) {
+						await oneMoment()
+						then = performance.now()
 					}
 				}
 			}
@@ -1,18 +1,101 @@
 const workerCode = () => {
+	// Binary alignment outputs (see fnalign/output.py) start with "FNALIGN\0"
+	const MAGIC = [70, 78, 65, 76, 73, 71, 78, 0]
+	const HEADER_SIZE = 28
+
+	const isBinary = (buffer) => {
+		const bytes = new Uint8Array(buffer, 0, Math.min(buffer.byteLength, MAGIC.length))
+		return bytes.length === MAGIC.length && MAGIC.every((b, i) => bytes[i] === b)
+	}
+
+	const float16ToFloat32 = (half) => {
+		const values = new Float32Array(half.length)
+		for (let i = 0; i < half.length; ++i) {
+			const h = half[i]
+			const sign = h & 0x8000 ? -1 : 1
+			const exp = (h >> 10) & 0x1f
+			const frac = h & 0x3ff
+			if (exp === 0) {
+				values[i] = sign * Math.pow(2, -14) * (frac / 1024)
+			} else if (exp === 0x1f) {
+				values[i] = frac ? NaN : sign * Infinity
+			} else {
+				values[i] = sign * Math.pow(2, exp - 15) * (1 + frac / 1024)
+			}
+		}
+		return values
+	}
+
+	const readBlock = (buffer, dataOffset, block) => {
+		const offset = dataOffset + block.offset
+		const length = block.shape.reduce((a, b) => a * b, 1)
+
+		switch (block.dtype) {
+			case '<f4': return new Float32Array(buffer, offset, length)
+			case '<f2': return float16ToFloat32(new Uint16Array(buffer, offset, length))
+			case '<i4': return new Int32Array(buffer, offset, length)
+			case '<i8': return Float64Array.from(new BigInt64Array(buffer, offset, length), Number)
+			default: throw new Error(`Unknown block type ${block.dtype}`)
+		}
+	}
+
+	// Score blocks are returned as typed arrays, dense scores as a flat array of
+	// values with their shape
+	const parseBinary = (buffer) => {
+		const view = new DataView(buffer)
+		const version = view.getUint32(8, true)
+		const manifestLength = Number(view.getBigUint64(12, true))
+		const dataOffset = Number(view.getBigUint64(20, true))
+
+		if (version !== 1) {
+			throw new Error(`Unknown binary alignment version ${version}`)
+		}
+
+		const manifest = new TextDecoder().decode(new Uint8Array(buffer, HEADER_SIZE, manifestLength))
+		const data = JSON.parse(manifest)
+
+		for (const alignment of data.alignments) {
+			const scores = alignment.data
+
+			if (!scores) {
+				continue
+			} else if (scores.format === 'csr') {
+				alignment.data = {
+					format: 'csr',
+					shape: scores.shape,
+					indptr: readBlock(buffer, dataOffset, scores.indptr),
+					indices: readBlock(buffer, dataOffset, scores.indices),
+					values: readBlock(buffer, dataOffset, scores.values),
+				}
+			} else {
+				alignment.data = {
+					format: 'dense',
+					shape: scores.values.shape,
+					values: readBlock(buffer, dataOffset, scores.values),
+				}
+			}
+		}
+
+		return data
+	}
+
 	// eslint-disable-next-line no-restricted-globals
 	self.onmessage = function(message) {
 		const reader = new FileReader();
-	
+
 		reader.addEventListener('load', load => {
 			try {
-				const data = JSON.parse(load.target.result)
+				const buffer = load.target.result
+				const data = isBinary(buffer)
+					? parseBinary(buffer)
+					: JSON.parse(new TextDecoder().decode(buffer))
 				postMessage(data)
 			} catch (exception) {
 				postMessage(exception)
 			}
 		});
-	
-		reader.readAsBinaryString(message.data);
+
+		reader.readAsArrayBuffer(message.data);
 	}
 }
 
@@ -22,4 +105,4 @@ code = code.substring(code.indexOf("{")+1, code.lastIndexOf("}"));
 const blob = new Blob([code], {type: "application/javascript"});
 const workerScript = URL.createObjectURL(blob);
 
-module.exports = workerScript;
\ No newline at end of file
+module.exports = workerScript;